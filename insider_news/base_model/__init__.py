@@ -1,4 +1,4 @@
 # base_model package
-from .scraper import Scraper
+from .scraper import Scraper, load_known_sources
 
-__all__ = ["Scraper"]
\ No newline at end of file
+__all__ = ["Scraper", "load_known_sources"]
\ No newline at end of file
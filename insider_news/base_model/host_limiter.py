@@ -0,0 +1,52 @@
+from contextlib   import contextmanager
+from urllib.parse import urlsplit
+
+import threading
+import time
+
+
+class HostLimiter:
+  """
+  Per-host politeness for concurrent scrapers: at most `max_connections` requests
+  in flight per host, and requests to the same host start at least `min_delay`
+  seconds apart. Thread safe, shared by every scraper running in parallel.
+  """
+
+  def __init__(self, max_connections: int = 2, min_delay: float = 1.0, delays: dict = None):
+    self.max_connections = max_connections
+    self.min_delay = min_delay
+    # Per-host overrides of min_delay, e.g. {'ima-api.org': 5.0}
+    self.delays = delays or {}
+    self._lock = threading.Lock()
+    self._semaphores = {}
+    self._next_start = {}
+
+  def _semaphore(self, host: str) -> threading.BoundedSemaphore:
+    with self._lock:
+      if host not in self._semaphores:
+        self._semaphores[host] = threading.BoundedSemaphore(self.max_connections)
+      return self._semaphores[host]
+
+  def _reserve_start(self, host: str) -> float:
+    # Book the next start slot for this host and return how long to wait for it
+    with self._lock:
+      now = time.monotonic()
+      start = max(now, self._next_start.get(host, now))
+      self._next_start[host] = start + self.delays.get(host, self.min_delay)
+      return start - now
+
+  @contextmanager
+  def slot(self, url: str):
+    host = urlsplit(url).netloc.lower()
+    semaphore = self._semaphore(host)
+    semaphore.acquire()
+    try:
+      wait = self._reserve_start(host)
+      if wait > 0:
+        time.sleep(wait)
+      yield
+    finally:
+      semaphore.release()
+
+
+HOST_LIMITER = HostLimiter(delays={'ima-api.org': 3.0})
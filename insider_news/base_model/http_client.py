@@ -0,0 +1,138 @@
+from collections      import OrderedDict
+from requests.adapters import HTTPAdapter
+from urllib3.util      import Retry
+
+import copy
+import requests
+import threading
+
+
+# Connection pools kept per host, and connections kept alive per pool
+POOL_CONNECTIONS = 32
+POOL_MAXSIZE = 8
+
+DEFAULT_TIMEOUT = 30
+
+# Number of responses kept for conditional GET (ETag / Last-Modified)
+CONDITIONAL_CACHE_SIZE = 512
+
+try:
+  import brotli  # noqa: F401  (lets urllib3 decode 'br' responses)
+  ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+  ACCEPT_ENCODING = 'gzip, deflate'
+
+
+class ConditionalCache:
+  """
+  Small LRU of responses that carried an ETag or Last-Modified header, so the
+  next GET of the same URL can be sent as a conditional request and a
+  304 Not Modified answer is served from memory instead of being downloaded again.
+  """
+
+  def __init__(self, max_entries: int = CONDITIONAL_CACHE_SIZE):
+    self.max_entries = max_entries
+    self._lock = threading.Lock()
+    self._responses = OrderedDict()
+
+  def headers_for(self, key) -> dict:
+    with self._lock:
+      response = self._responses.get(key)
+    if response is None:
+      return {}
+
+    headers = {}
+    if response.headers.get('ETag'):
+      headers['If-None-Match'] = response.headers['ETag']
+    if response.headers.get('Last-Modified'):
+      headers['If-Modified-Since'] = response.headers['Last-Modified']
+    return headers
+
+  def get(self, key):
+    with self._lock:
+      if key not in self._responses:
+        return None
+      self._responses.move_to_end(key)
+      return copy.copy(self._responses[key])
+
+  def store(self, key, response):
+    if not (response.headers.get('ETag') or response.headers.get('Last-Modified')):
+      return
+    # Read the body now so the cached copy does not depend on the connection
+    response.content
+    with self._lock:
+      self._responses[key] = response
+      self._responses.move_to_end(key)
+      while len(self._responses) > self.max_entries:
+        self._responses.popitem(last=False)
+
+
+class HttpClient:
+  """
+  Shared HTTP layer for every news scraper: one keep-alive requests.Session per
+  proxy (each with its own per-host connection pools), compressed transfers,
+  retries on transient errors and conditional GET caching.
+  Thread safe, so scrapers running in parallel reuse the same connections.
+  """
+
+  def __init__(self, headers: dict = None, timeout: float = DEFAULT_TIMEOUT):
+    self.headers = headers or {}
+    self.timeout = timeout
+    self.cache = ConditionalCache()
+    self._lock = threading.Lock()
+    self._sessions = {}
+
+  def session(self, proxy: str = None) -> requests.Session:
+    # Sessions are reused per proxy so switching proxies never reuses the wrong connections
+    with self._lock:
+      if proxy not in self._sessions:
+        self._sessions[proxy] = self._build_session(proxy)
+      return self._sessions[proxy]
+
+  def _build_session(self, proxy: str = None) -> requests.Session:
+    session = requests.Session()
+    retries = Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 503, 504), allowed_methods=('GET',))
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=retries)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update(self.headers)
+    session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+    if proxy:
+      session.proxies.update({'http': proxy, 'https': proxy})
+    return session
+
+  def get(self, url: str, proxy: str = None, headers: dict = None, **kwargs) -> requests.Response:
+    """
+    GET a URL through the pooled session of `proxy`.
+    If the URL was fetched before with an ETag or Last-Modified header, the request
+    is conditional and a 304 answer returns the previously downloaded response.
+
+    Args:
+      url: The URL to fetch
+      proxy: Proxy URL, or None for a direct connection
+      headers: Extra request headers
+      **kwargs: Passed on to requests (e.g. verify)
+
+    Returns:
+      requests.Response: The response (the cached one on 304 Not Modified)
+    """
+    key = (proxy, url)
+    request_headers = {**self.cache.headers_for(key), **(headers or {})}
+    kwargs.setdefault('timeout', self.timeout)
+
+    response = self.session(proxy).get(url, headers=request_headers, **kwargs)
+    if response.status_code == 304:
+      cached = self.cache.get(key)
+      if cached is not None:
+        return cached
+
+    if response.ok:
+      self.cache.store(key, response)
+    return response
+
+  def post(self, url: str, proxy: str = None, **kwargs) -> requests.Response:
+    kwargs.setdefault('timeout', self.timeout)
+    return self.session(proxy).post(url, **kwargs)
+
+
+HTTP_CLIENT = HttpClient()
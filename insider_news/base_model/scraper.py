@@ -1,13 +1,18 @@
-from bs4    import BeautifulSoup
-from dotenv import load_dotenv
+from bs4                import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from dotenv             import load_dotenv
+from .host_limiter      import HOST_LIMITER
+from .http_client       import HTTP_CLIENT
 
-import requests
 import json
 import csv
 import ssl
-import urllib.request
+import sqlite3
 import os
 import pandas as pd
+import queue
+import threading
+import time
 
 
 # Determine the base directory where the .env file is located
@@ -19,47 +24,144 @@ load_dotenv(os.path.join(project_root, '.env'))
 
 ssl._create_default_https_context = ssl._create_unverified_context
 
+ARCHIVE_CSV_PATH = os.path.join('insider_news', 'data', 'archive', 'mining_news_all_archived.csv')
+
+# Article bodies fetched in parallel per listing page (the host limiter still applies)
+BODY_FETCH_WORKERS = 4
+
+# Wall-clock budget for one scraper in ScraperCollection.run_all, in seconds
+SCRAPER_TIMEOUT = 30 * 60
+
+_SOURCES_LOCK = threading.Lock()
+
+
+def normalize_source(url: str) -> str:
+  # Same normalization the pipeline applies before storing `source`
+  return url.strip().lower() if url else ''
+
+
+def load_known_sources(db_path: str = 'db.sqlite', archive_path: str = ARCHIVE_CSV_PATH) -> set:
+  """
+  Load every article URL already stored in mining_news or in the CSV archive, 
+  so scrapers can skip them before fetching the body or paying for an LLM score.
+
+  Args:
+    db_path: Path to the SQLite database
+    archive_path: Path to the archived mining_news CSV
+
+  Returns:
+    set: Normalized source URLs
+  """
+  known_sources = set()
+
+  if os.path.exists(db_path):
+    try:
+      conn = sqlite3.connect(db_path)
+      rows = conn.execute("SELECT source FROM mining_news WHERE source IS NOT NULL;").fetchall()
+      conn.close()
+      known_sources.update(normalize_source(row[0]) for row in rows)
+    except sqlite3.Error as error:
+      print(f"Error loading known sources from {db_path}: {error}")
+
+  if os.path.exists(archive_path):
+    try:
+      archive_df = pd.read_csv(archive_path, usecols=['source'])
+      known_sources.update(normalize_source(source) for source in archive_df['source'].dropna())
+    except Exception as error:
+      print(f"Error loading known sources from {archive_path}: {error}")
+
+  print(f"Loaded {len(known_sources)} known article sources")
+  return known_sources
+
+
 class Scraper:
   soup: BeautifulSoup
   articles: list
   proxy: str | None
+  known_sources: set
+  claimed_sources: set
+  stop_event: threading.Event
 
   def __init__(self):
     self.articles = []
+    self.known_sources = set()
+    self.claimed_sources = set()
+    self.stop_event = threading.Event()
 
-  # Fetch news using requests but no proxy
+  # Share the set of already stored sources (see load_known_sources)
+  def set_known_sources(self, known_sources: set):
+    self.known_sources = known_sources
+    self.claimed_sources = set()
+
+  # Event set by ScraperCollection when the scraper ran out of time
+  def set_stop_event(self, stop_event: threading.Event):
+    self.stop_event = stop_event
+
+  # Checked by extract_news_pages between pages
+  def should_stop(self) -> bool:
+    return self.stop_event.is_set()
+
+  # True the first time a source is seen, False if it is stored already or was seen earlier in this run.
+  # A stopped scraper no longer claims sources, so its late results cannot hide them from the next run.
+  def is_new_source(self, url: str) -> bool:
+    source = normalize_source(url)
+    with _SOURCES_LOCK:
+      if self.should_stop():
+        return False
+      if source in self.known_sources:
+        print(f"Skipping known article: {url}")
+        return False
+      self.known_sources.add(source)
+      self.claimed_sources.add(source)
+    return True
+
+  # Give back the sources claimed by a scraper whose articles were discarded
+  def release_sources(self):
+    with _SOURCES_LOCK:
+      self.known_sources.difference_update(self.claimed_sources)
+      self.claimed_sources = set()
+
+  # Fetch article bodies in parallel, at most BODY_FETCH_WORKERS at a time and politely per host
+  def fetch_article_bodies(self, urls: list, fetch_body) -> list:
+    def fetch(url):
+      with HOST_LIMITER.slot(url):
+        return fetch_body(url)
+
+    if not urls:
+      return []
+    with ThreadPoolExecutor(max_workers=BODY_FETCH_WORKERS) as executor:
+      return list(executor.map(fetch, urls))
+
+  # Fetch news through the pooled HTTP client but no proxy
   def fetch_news(self, url):
     try:
-      response = requests.get(url)
+      with HOST_LIMITER.slot(url):
+        response = HTTP_CLIENT.get(url)
       self.soup = BeautifulSoup(response.content, 'html.parser')
       return self.soup
     except Exception as error:
       print(f"Error fetching the URL: {error}")
       return BeautifulSoup()
     
-  # Fetch news using urllib.request with proxy
+  # Fetch news through the pooled HTTP client with proxy
   def fetch_news_with_proxy(self, url):
     try:
       self.proxy = os.environ.get("PROXY")
 
-      proxy_support = urllib.request.ProxyHandler({'http': self.proxy,'https': self.proxy})
-      opener = urllib.request.build_opener(proxy_support)
-      urllib.request.install_opener(opener)
+      with HOST_LIMITER.slot(url):
+        response = HTTP_CLIENT.get(url, proxy=self.proxy, verify=False)
 
-      with urllib.request.urlopen(url) as response:
-        data = response.read()
-        data = data.decode('utf-8')
-
-      self.soup = BeautifulSoup(data, 'html.parser')
+      self.soup = BeautifulSoup(response.content, 'html.parser')
       return self.soup
     except Exception as error:
       print(f"Error fetching the URL: {error}")
       return BeautifulSoup()
   
-  # Fetch news using requests post
+  # Fetch news using a post through the pooled HTTP client
   def fetch_news_with_post(self, url: str, payload: dict):
     try:
-      response = requests.post(url, data=payload)
+      with HOST_LIMITER.slot(url):
+        response = HTTP_CLIENT.post(url, data=payload)
       data = response.json()
       html_content = data.get('html_items')
       self.soup = BeautifulSoup(html_content, 'html.parser')
@@ -111,14 +213,50 @@ class ScraperCollection:
   def add_scraper(self, scraper):
     self.scrapers.append(scraper)
   
-  def run_all(self, num_page):
-    for scraper in self.scrapers:
+  # Run every scraper in its own thread and yield (scraper name, articles) as each one finishes.
+  # Scrapers still running after `timeout` seconds are told to stop after their current page,
+  # give back the sources they claimed and are reported; their articles are discarded, like
+  # those of a scraper that failed.
+  def iter_results(self, num_page, known_sources: set = None, timeout: float = SCRAPER_TIMEOUT):
+    known_sources = known_sources if known_sources is not None else set()
+    results = queue.Queue()
+    stop_event = threading.Event()
+
+    def run(scraper):
       try:
-        articles = scraper.extract_news_pages(num_page)
-        self.articles = [*self.articles, *articles]
+        results.put((scraper, scraper.extract_news_pages(num_page), None))
       except Exception as e:
-        print(f"Error in scraper {scraper.__class__.__name__}: {e}")
+        results.put((scraper, [], e))
+
+    for scraper in self.scrapers:
+      scraper.set_known_sources(known_sources)
+      scraper.set_stop_event(stop_event)
+      threading.Thread(target=run, args=(scraper,), daemon=True).start()
+
+    pending = set(self.scrapers)
+    deadline = time.monotonic() + timeout
+    while pending:
+      try:
+        scraper, articles, error = results.get(timeout=max(0, deadline - time.monotonic()))
+      except queue.Empty:
+        stop_event.set()
+        for scraper in pending:
+          scraper.release_sources()
+          print(f"Timeout in scraper {scraper.__class__.__name__} after {timeout}s, skipping")
+        return
+
+      pending.discard(scraper)
+      name = scraper.__class__.__name__
+      if error:
+        scraper.release_sources()
+        print(f"Error in scraper {name}: {error}")
         continue
+      print(f"Scraper {name} finished with {len(articles)} articles")
+      yield name, articles
+
+  def run_all(self, num_page, known_sources: set = None, timeout: float = SCRAPER_TIMEOUT):
+    for _, articles in self.iter_results(num_page, known_sources, timeout):
+      self.articles.extend(articles)
     return self.articles
   
   # Writer methods
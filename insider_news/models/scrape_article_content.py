@@ -1,9 +1,9 @@
-from bs4        import BeautifulSoup
-from goose3     import Goose
-from requests   import Response, Session
+from bs4                                  import BeautifulSoup
+from goose3                               import Goose
+from insider_news.base_model.http_client  import HttpClient
 
-import requests
 import os
+import threading
 import cloudscraper
 
 
@@ -22,9 +22,57 @@ HEADERS = {
 }
 
 
+# Pooled keep-alive sessions shared by every article fetch (see HttpClient)
+ARTICLE_CLIENT = HttpClient(headers=HEADERS)
+
+# Goose and cloudscraper instances are not thread safe, so each fetch thread keeps its own
+_local = threading.local()
+
+
+def get_goose() -> Goose:
+    if not hasattr(_local, "goose"):
+        _local.goose = Goose({"browser_user_agent": USER_AGENT})
+    return _local.goose
+
+
+def get_cloudscraper():
+    if not hasattr(_local, "cloudscraper"):
+        _local.cloudscraper = cloudscraper.create_scraper()
+    return _local.cloudscraper
+
+
+def extract_with_soup(html: str | bytes, url: str) -> str:
+    """
+    Extracts the article text from known content containers of the page.
+
+    Args:
+        html (str | bytes): The page HTML.
+        url (str): The URL of the page, for logging.
+
+    Returns:
+        str: The article text, or an empty string if no container was found.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+
+    content = soup.find("div", class_="content")
+    if content and content.get_text(strip=True):
+        print(f"[SUCCESS] Article inferenced from url {url} using soup")
+        return content.get_text(strip=True)
+
+    # Fallback for ruang energi news 
+    content = soup.find("div", class_="elementor-widget-theme-post-content")
+    if content and content.get_text(strip=True):
+        print(f"[SUCCESS] Article inferenced from url {url} using soup (.elementor-widget-theme-post-content)")
+        return content.get_text(separator=" ", strip=True)
+
+    return ""
+
+
 def get_article_body(url: str) -> str:
     """ 
     Extracts the body of an article from a given URL using Goose3.
+    Pages are downloaded once through pooled keep-alive sessions (proxy first, then
+    cloudscraper, then direct) and the same HTML is reused by the soup fallback.
 
     Args:
         url (str): The URL of the article to be extracted.
@@ -35,37 +83,20 @@ def get_article_body(url: str) -> str:
     # First attempt try to get full article with goose3 proxy and soup as fallback
     try:
         proxy = os.environ.get("PROXY_KEY")
-        proxy_support = {"http": proxy, "https": proxy}
+        response = ARTICLE_CLIENT.get(url, proxy=proxy)
+        response.raise_for_status()
 
-        session = Session()
-        session.proxies.update(proxy_support)
-        session.headers.update(HEADERS)
-
-        # g = Goose({'http_proxies': proxy_support, 'https_proxies': proxy_support})
-        g = Goose({"http_session": session})
-        article = g.extract(url=url)
+        article = get_goose().extract(url=url, raw_html=response.text)
         print(f"[SUCCESS] Article from url {url} inferenced")
 
         if article.cleaned_text:
             return article.cleaned_text
         else:
-            # If fail, get the HTML and extract the text
+            # If fail, extract the text from the same HTML
             print("[REQUEST FAIL] Goose3 returned empty string, trying with soup")
-            response: Response = requests.get(url)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, "html.parser")
-
-            content = soup.find("div", class_="content")
-            if content and content.get_text(strip=True):
-                print(f"[SUCCESS] Article inferenced from url {url} using soup")
-                return content.get_text(strip=True)
-
-            # Fallback for ruang energi news 
-            content = soup.find("div", class_="elementor-widget-theme-post-content")
-            if content and content.get_text(strip=True):
-                print(f"[SUCCESS] Article inferenced from url {url} using soup (.elementor-widget-theme-post-content)")
-                return content.get_text(separator=" ", strip=True)
+            content = extract_with_soup(response.content, url)
+            if content:
+                return content
         
     except Exception as error:
         print(
@@ -76,10 +107,8 @@ def get_article_body(url: str) -> str:
     try:
         print("[FALLBACK] Attempt 2: Trying with cloudscraper...")
 
-        scraper = cloudscraper.create_scraper() 
-        g = Goose({'browser_user_agent': USER_AGENT, 'http_session': scraper})
-
-        article = g.extract(url=url)
+        response = get_cloudscraper().get(url, timeout=ARTICLE_CLIENT.timeout)
+        article = get_goose().extract(url=url, raw_html=response.text)
         print(article)
         if article.cleaned_text:
             print(f"[SUCCESS] Extracted using cloudscraper for url {url}.")
@@ -93,8 +122,8 @@ def get_article_body(url: str) -> str:
     try:
         print("[FALLBACK] Attempt 3: Trying with no PROXY...")
 
-        g = Goose()
-        article = g.extract(url=url)
+        response = ARTICLE_CLIENT.get(url)
+        article = get_goose().extract(url=url, raw_html=response.text)
         print(article)
         print(f"[SUCCESS] Article inferenced from url {url} with no PROXY")
         return article.cleaned_text
@@ -102,4 +131,4 @@ def get_article_body(url: str) -> str:
     except Exception as error:
         print(f"[ERROR] Goose3 with no PROXY failed with error: {error}")
     
-    return ""
\ No newline at end of file
+    return ""
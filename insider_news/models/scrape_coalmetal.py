@@ -1,6 +1,4 @@
 from selenium                           import webdriver
-from selenium.webdriver.chrome.service  import Service
-from webdriver_manager.chrome           import ChromeDriverManager
 from bs4                                import BeautifulSoup
 from urllib.parse                       import urljoin
 from sumy.summarizers.lex_rank          import LexRankSummarizer
@@ -12,14 +10,14 @@ from selenium.webdriver.support.ui      import WebDriverWait
 from selenium.webdriver.support         import expected_conditions as EC
 from selenium.common.exceptions         import TimeoutException
 from datetime                           import datetime, timedelta
+from concurrent.futures                 import ThreadPoolExecutor
 
-from scrapper.esdm_minerba                          import COMMODITY_MAP
-from insider_news.preprocessing_llm.scoring_engine  import get_scoring_news
+from scripts.browser_pool                           import create_driver, get_browser_pool, wait_for_dom_ready
+from insider_news.preprocessing_llm.scoring_engine  import score_articles
+from insider_news.base_model.commodity_tagger       import tag_article_commodities
 
 import pandas as pd
 import logging
-import time
-import re 
 import nltk 
 import dateparser
 
@@ -43,6 +41,13 @@ LOGGER.info("Init Global Variable")
 BASE_URL = "https://coalmetal.asia"
 START_URL = f"{BASE_URL}/search/indonesia" 
 
+# Article pages are ready once both the title and the content container are present;
+# the title renders first, so waiting on it alone can parse a page without its body
+ARTICLE_READY = EC.all_of(
+    EC.presence_of_element_located((By.CSS_SELECTOR, "p[class~='lg:text-4xl']")),
+    EC.presence_of_element_located((By.CSS_SELECTOR, "div[class~='lg:content']")),
+)
+
 
 def get_driver(headless: bool = True) -> webdriver.Chrome:
     """ 
@@ -54,19 +59,12 @@ def get_driver(headless: bool = True) -> webdriver.Chrome:
     Returns:
         webdriver.Chrome: An instance of the Chrome WebDriver.
     """
-    options = webdriver.ChromeOptions()
-    if headless:
-        options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-    return driver
+    return create_driver(headless)
 
 
 def bypass_first_visit(url: str, timeout: float = 20.0) -> str:
     """
-    Initializes a Selenium WebDriver, handles pop-ups, waits for content,
+    Loads the page in a pooled Selenium WebDriver, handles pop-ups, waits for content,
     and returns the page source.
 
     Args:
@@ -76,36 +74,40 @@ def bypass_first_visit(url: str, timeout: float = 20.0) -> str:
     Returns:
         str or None: The HTML content of the page if successful, otherwise None.
     """
-    driver = get_driver()
-    
     # Default return value
     html_content = None  
 
     try:
-        driver.get(url)
-        # Handle Notification Pop-up
-        try:
-            LOGGER.info("Looking for notification pop-up...")
-            # Using wait for the optional pop-up
-            thanks_button = WebDriverWait(driver, timeout).until(
-                EC.element_to_be_clickable((By.XPATH, "//p[text()='Thanks']"))
+        # The browser stays warm in the pool for the article pages
+        with get_browser_pool().browser() as driver:
+            driver.get(url)
+            wait_for_dom_ready(driver, timeout)
+
+            # Handle Notification Pop-up
+            try:
+                LOGGER.info("Looking for notification pop-up...")
+                # Using wait for the optional pop-up
+                thanks_button = WebDriverWait(driver, timeout).until(
+                    EC.element_to_be_clickable((By.XPATH, "//p[text()='Thanks']"))
+                )
+                LOGGER.info("Pop-up found. Clicking 'Thanks' to dismiss.")
+                thanks_button.click()
+                WebDriverWait(driver, timeout).until(
+                    EC.invisibility_of_element_located((By.XPATH, "//p[text()='Thanks']"))
+                )
+            except TimeoutException:
+                # means the pop-up didn't appear.
+                LOGGER.warning("No pop-up found, continuing...")
+
+            # Wait for the main article container to load
+            LOGGER.info(f"Waiting for article container (max {timeout} seconds)...")
+            WebDriverWait(driver, timeout).until(
+                EC.presence_of_element_located((By.CLASS_NAME, "grid-cols-2"))
             )
-            LOGGER.info("Pop-up found. Clicking 'Thanks' to dismiss.")
-            thanks_button.click()
-            time.sleep(timeout)
-        except TimeoutException:
-            # means the pop-up didn't appear.
-            LOGGER.warning("No pop-up found, continuing...")
-
-        # Wait for the main article container to load
-        LOGGER.info(f"Waiting for article container (max {timeout} seconds)...")
-        WebDriverWait(driver, timeout).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "grid-cols-2"))
-        )
-        LOGGER.info("Article container found.")
-        
-        # Get the page source
-        html_content = driver.page_source
+            LOGGER.info("Article container found.")
+            
+            # Get the page source
+            html_content = driver.page_source
         
     except TimeoutException:
         # If the main content doesn't load in time
@@ -114,33 +116,45 @@ def bypass_first_visit(url: str, timeout: float = 20.0) -> str:
     except Exception as error:
         # Catch any other unexpected errors
         LOGGER.error(f"An unexpected error occurred for URL {url}: {error}")
-
-    finally:
-        # Close the browser to prevent memory leaks
-        driver.quit()
         
     return html_content
 
 
-def bypass_article_content(url: str, wait: float = 6.0) -> str:
+def bypass_article_content(url: str, timeout: float = 20.0) -> str:
     """ 
-    Waits for the article content to load using Selenium and returns the HTML content.
+    Loads the article in a pooled Selenium WebDriver and returns the HTML content
+    as soon as the title and the content container are present.
 
     Args:
         url (str): The URL of the article to scrape.
-        wait (float): The number of seconds to wait for the content to load.
+        timeout (float): The maximum number of seconds to wait for the content to load.
     
     Returns:
         str: The HTML content of the article page.
     """
-    driver = get_driver()
+    return get_browser_pool().get_page_source(url, ready=ARTICLE_READY, timeout=timeout)
 
-    # Navigate to the article URL
-    driver.get(url)
-    time.sleep(wait)
-    html_content = driver.page_source
-    driver.quit()
-    return html_content
+
+def fetch_article_pages(article_links: list[str]) -> list[str | None]:
+    """ 
+    Loads the article pages in parallel, one per pooled browser.
+
+    Args:
+        article_links (list[str]): A list of article URLs to load.
+
+    Returns:
+        list[str | None]: The HTML of each article, None where loading failed.
+    """
+    def fetch(article_url: str) -> str | None:
+        try:
+            return bypass_article_content(article_url)
+        except Exception as error:
+            LOGGER.error(f"Failed to load article {article_url}. Reason: {error}")
+            return None
+
+    pool = get_browser_pool()
+    with ThreadPoolExecutor(max_workers=pool.size) as executor:
+        return list(executor.map(fetch, article_links))
 
 
 def get_article_links(initial_run: bool = True) -> list[str]:
@@ -214,56 +228,6 @@ def get_article_links(initial_run: bool = True) -> list[str]:
     return links
 
 
-def extract_commodities(title: str, body: str) -> list[str]:
-    """
-    Extract all commodity types from title and body text
-
-    Args:
-        title (str): The title of the article.
-        body (str): The body text of the article.
-
-    Returns:
-        list[str]: A list of commodities found in the text.
-    """
-    # Combine title and body for searching
-    text_to_search = f"{title} {body}".lower()
-    found_commodities = []
-    
-    # Check for each commodity type
-    for commodity_key, commodity_value in COMMODITY_MAP.items(): 
-        # Check for exact commodity match (case insensitive)
-        if re.search(rf'\b{re.escape(commodity_key.lower())}\b', text_to_search):
-            found_commodities.append(commodity_value)
-    
-    # Return list of commodities found, or empty list if none found
-    return found_commodities
-
-
-def run_extract_commodities(title: str, body: str, full_body: str = None) -> list[str]:
-    """  
-    Runs the commodity extraction process on the article title, body text, and full article content.
-    
-    Args:
-        title (str): The title of the article.
-        body (str): The body text of the article.
-        full_body (str): The full body text of the article.
-    
-    Returns:
-        list[str]: A list of commodities found in the article.
-    """ 
-    text = f"{title} {body}".lower()
-    result = any(key.lower() in text or value.lower() in text for key, value in COMMODITY_MAP.items())
-        
-    # Always check title + summary first
-    quick_matches = extract_commodities(title, body)
-    
-    # If no matches but seems commodity-related, check full body
-    if not quick_matches and full_body and result:
-        return extract_commodities(title, full_body)
-    
-    return quick_matches
-
-
 def get_summarize_article(text: str, sentences_count: int = 2) -> str:
     """  
     Summarizes the given text using LexRank summarization.
@@ -332,11 +296,15 @@ def get_article_contents(article_links: list[str]) -> list[dict]:
     """
     all_articles_data = []
 
-    for idx, article_url in enumerate(article_links):
+    LOGGER.info(f"Loading {len(article_links)} articles...")
+    html_pages = fetch_article_pages(article_links)
+
+    for idx, (article_url, html_content) in enumerate(zip(article_links, html_pages)):
+        if html_content is None:
+            continue
         try:
-            LOGGER.info(f"Loading article {idx+1}/{len(article_links)}: {article_url}")
+            LOGGER.info(f"Parsing article {idx+1}/{len(article_links)}: {article_url}")
         
-            html_content = bypass_article_content(article_url)
             html_parsed = BeautifulSoup(html_content, 'html.parser')
 
             # Extract title
@@ -373,42 +341,59 @@ def get_article_contents(article_links: list[str]) -> list[dict]:
             summarize_article = get_summarize_article(article_text)
             
             # Get commodity terms on article
-            commodities = run_extract_commodities(title, summarize_article, article_text)
+            commodities = tag_article_commodities(title, summarize_article, article_text)
             
-            # Get scoring system
-            scoring_result = get_scoring_news(title, summarize_article, cleaned_date)
-            scoring_result = scoring_result.get('news_score')
-            manual_score = manual_scoring_time(cleaned_date)
-            final_score = scoring_result + manual_score
-
-            # Output
             all_articles_data.append({
                 "title": title,
                 "body": summarize_article,
                 "source": article_url,
                 "timestamp": cleaned_date,
                 "commodities": commodities, 
-                "score": final_score
             })
 
         except Exception as error:
             LOGGER.error(f"Failed to process article {article_url}. Reason: {error}")
             continue
 
-    return all_articles_data
+    # Score every article in one concurrent batch (title + LexRank summary)
+    scoring_results = score_articles([
+        {"title": article["title"], "content": article["body"], "source": article["source"]}
+        for article in all_articles_data
+    ])
 
+    scored_articles = []
+    for article, scoring_result in zip(all_articles_data, scoring_results):
+        try:
+            scoring_result = scoring_result.get('news_score')
+            manual_score = manual_scoring_time(article["timestamp"])
+            article["score"] = scoring_result + manual_score
+            scored_articles.append(article)
 
-def run_coalmetal_scraping(initial_run: bool, limit_articles: int) -> pd.DataFrame:
+        except Exception as error:
+            LOGGER.error(f"Failed to score article {article['source']}. Reason: {error}")
+            continue
+
+    return scored_articles
+
+
+def run_coalmetal_scraping(initial_run: bool, limit_articles: int, known_sources: set = None) -> pd.DataFrame:
     """  
     Runs the scraping process for CoalMetal articles and returns a DataFrame.
 
     Args:
         limit_article (int): The maximum number of articles to scrape.
+        known_sources (set): Normalized URLs already stored, skipped before any browser visit.
     
     Returns:
         pd.DataFrame: A DataFrame containing the scraped article data.
     """
     all_links = get_article_links(initial_run)
+
+    if known_sources:
+        new_links = [link for link in all_links if link.strip().lower() not in known_sources]
+        LOGGER.info(f"Skipping {len(all_links) - len(new_links)} already stored articles.")
+        all_links = new_links
+
     scraped = get_article_contents(all_links[:limit_articles])
     df = pd.DataFrame(scraped)
     return df 
@@ -1,14 +1,12 @@
 from datetime       import datetime, timedelta
 
 from insider_news.base_model.scraper                import Scraper
-from insider_news.preprocessing_llm.summary_engine  import get_summary
-from insider_news.preprocessing_llm.scoring_engine  import get_scoring_news
+from insider_news.preprocessing_llm.extraction_engine import extract_articles
+from insider_news.preprocessing_llm.relevance_filter  import get_relevance_filter
 from .scrape_article_content                        import get_article_body
-from .scrape_coalmetal                              import run_extract_commodities
+from insider_news.base_model.commodity_tagger       import tag_article_commodities
 
 import argparse
-import time 
-import random
 
 
 class IMANewsScraper(Scraper):
@@ -17,12 +15,13 @@ class IMANewsScraper(Scraper):
         article_containers = soup.select("div.ue-grid-item")
         print(f"Found {len(article_containers)} articles on this page IMA news")
 
+        candidates = []
         for article in article_containers:
             # Get source
             source = article.get('data-link')
-            # Get raw title
-            # title_tag = article.select_one("h4.elementor-heading-title")
-            # title = title_tag.get_text(strip=True) if title_tag else "Title not found"
+            # Get raw title, only used for scoring (the summary provides the final title)
+            title_tag = article.select_one("h4.elementor-heading-title")
+            title = title_tag.get_text(strip=True) if title_tag else "Title not found"
             
             # Get date and standardize
             time_tag = article.select_one("time")
@@ -32,35 +31,57 @@ class IMANewsScraper(Scraper):
                 print('[IMA NEWS] Failed parse date for url: {source} Skipping')
                 continue
 
-            # Get article content  
-            article_content = get_article_body(source)
-            sleep_time = random.uniform(1, 3)
-            time.sleep(sleep_time)
-            
+            # Skip articles already stored before fetching the body
+            if not self.is_new_source(source):
+                continue
+
+            candidates.append({
+                'title': title,
+                'source': source,
+                'timestamp': final_date,
+            })
+
+        # Fetch the bodies of the new articles in parallel
+        contents = self.fetch_article_bodies([c['source'] for c in candidates], get_article_body)
+        for candidate, content in zip(candidates, contents):
+            candidate['content'] = content
+
+        # Articles the local relevance model rates as irrelevant never reach the LLM
+        relevance_filter = get_relevance_filter()
+        candidates = relevance_filter.filter(candidates, 'IMA')
+
+        # Score, title, summarize and tag every article of the page in one concurrent batch
+        extractions = extract_articles(candidates)
+        relevance_filter.record(candidates, extractions)
+
+        for candidate, extraction in zip(candidates, extractions):
+            if not extraction:
+                print(f"Skipping article due to failed scoring: {candidate['source']}")
+                continue
+
             # Skip articles with low score
-            score = get_scoring_news(title, article_content)
-            score = score.get('news_score')
-            manual_score = self.manual_scoring_time(final_date)
+            score = extraction.get('news_score')
+            manual_score = self.manual_scoring_time(candidate['timestamp'])
             final_score = score + manual_score
             if final_score < 65:
                 print(f"Skipping article due to low score: {final_score}")
                 continue
             
-            # Get summary
-            raw_summary = get_summary(article_content, source)
-            title = raw_summary.get('title')
-            body = raw_summary.get('body')
+            # Title and summary come from the same call as the score
+            title = extraction.get('title')
+            body = extraction.get('body')
 
             #Get commodities from article
-            commodities = run_extract_commodities(title, body, article_content)
+            commodities = tag_article_commodities(title, body, candidate['content'])
+            commodities += extraction.get('commodities', [])
             commodities = self.handling_duplicate_commodities(commodities)
 
-            if source and title and timestamp:
+            if candidate['source'] and title and candidate['timestamp']:
                 self.articles.append({
                     'title': title,
                     'body': body,
-                    'source': source,
-                    'timestamp': final_date,
+                    'source': candidate['source'],
+                    'timestamp': candidate['timestamp'],
                     'commodities': commodities
                 })
 
@@ -130,11 +151,13 @@ class IMANewsScraper(Scraper):
 
         for ima_payload_post in ima_payload_list:
             for page in range(1, num_pages +1):
+                if self.should_stop():
+                    return self.articles
                 payload = ima_payload_post.copy()
                 payload['ucpage'] = page
 
                 self.extract_news(ima_url, payload)
-                time.sleep(5)
+                self.stop_event.wait(5)
 
         return self.articles
     
@@ -1,11 +1,12 @@
 from datetime import datetime, timedelta
 
 from insider_news.base_model                        import Scraper
-from insider_news.preprocessing_llm.scoring_engine  import get_scoring_news
+from insider_news.base_model.commodity_tagger       import CommodityTagger
+from insider_news.preprocessing_llm.scoring_engine  import score_articles
+from insider_news.preprocessing_llm.relevance_filter import get_relevance_filter
 from .scrape_article_content                        import get_article_body
 
 import dateparser
-import re
 import argparse
 
 
@@ -23,30 +24,17 @@ COMMODITY_TYPE = {
     "Granite",
     "Non-Metallic Mineral"
 }
+COMMODITY_TYPE_TAGGER = CommodityTagger({commodity: commodity for commodity in sorted(COMMODITY_TYPE)})
 
 
 class MiningScraper(Scraper):
-    def extract_commodities(self, title, body):
-        """Extract all commodity types from title and body text"""
-        # Combine title and body for searching
-        text_to_search = f"{title} {body}".lower()
-        found_commodities = []
-        
-        # Check for each commodity type
-        for commodity in COMMODITY_TYPE:
-            # Check for exact commodity match (case insensitive)
-            if re.search(rf'\b{re.escape(commodity.lower())}\b', text_to_search):
-                found_commodities.append(commodity)
-        
-        # Return list of commodities found, or empty list if none found
-        return found_commodities
-
     def extract_news(self, url: str):
         soup = self.fetch_news(url)
         # Scrape articles with class 'post'
         article_containers = soup.find_all("article", class_="post")
         print(f"Found {len(article_containers)} articles on this page mining.com")
 
+        candidates = []
         for item in article_containers:
             # Title and source (URL)
             h2 = item.find("h2")
@@ -60,10 +48,11 @@ class MiningScraper(Scraper):
             if not title or not source:
                 print(f"Skipping article due to missing title or source")
                 continue
-                
-            # Extract article content
-            article = get_article_body(source)
 
+            # Skip articles already stored before fetching the body
+            if not self.is_new_source(source):
+                continue
+                
             # Body (summary)
             post_info = item.find("p", class_="post-info")
             body = post_info.get_text(strip=True) if post_info else ""
@@ -91,25 +80,49 @@ class MiningScraper(Scraper):
             else:
                 timestamp = None
             
+            candidates.append({
+                "title": title,
+                "body": body,
+                "source": source,
+                "timestamp": timestamp,
+            })
+
+        # Fetch the bodies of the new articles in parallel
+        contents = self.fetch_article_bodies([c["source"] for c in candidates], get_article_body)
+        for candidate, content in zip(candidates, contents):
+            candidate["content"] = content
+
+        # Articles the local relevance model rates as irrelevant never reach the LLM
+        relevance_filter = get_relevance_filter()
+        candidates = relevance_filter.filter(candidates, "mining.com")
+
+        # Score every article of the page in one concurrent batch
+        scores = score_articles(candidates)
+        relevance_filter.record(candidates, scores)
+
+        for candidate, score in zip(candidates, scores):
+            if not score:
+                print(f"Skipping article due to failed scoring: {candidate['source']}")
+                continue
+
             # Skip articles with low score
-            score = get_scoring_news(title, article)
             score = score.get('news_score')
-            manual_score = self.manual_scoring_time(timestamp)
+            manual_score = self.manual_scoring_time(candidate["timestamp"])
             final_score = score + manual_score
             if final_score < 65:
                 print(f"Skipping article due to low score: {final_score}")
                 continue
 
             # Extract all commodity types
-            commodities = self.extract_commodities(title, body)
+            commodities = COMMODITY_TYPE_TAGGER.tag(f"{candidate['title']} {candidate['body']}")
             commodities = self.handling_duplicate_commodities(commodities)
 
             self.articles.append(
                 {
-                    "title": title, 
-                    "body": body, 
-                    "source": source, 
-                    "timestamp": timestamp,
+                    "title": candidate["title"], 
+                    "body": candidate["body"], 
+                    "source": candidate["source"], 
+                    "timestamp": candidate["timestamp"],
                     "commodities": commodities  # Changed to plural and returns list
                 }
             )
@@ -151,6 +164,8 @@ class MiningScraper(Scraper):
     
     def extract_news_pages(self, num_pages):
         for page in range(1, num_pages + 1):
+            if self.should_stop():
+                break
             self.extract_news(self.get_page(page))
         return self.articles
 
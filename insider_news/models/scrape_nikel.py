@@ -2,13 +2,11 @@ from datetime import datetime, timedelta
 
 from insider_news.base_model.scraper                import Scraper
 from .scrape_article_content                        import get_article_body
-from .scrape_coalmetal                              import run_extract_commodities
-from insider_news.preprocessing_llm.summary_engine  import get_summary
-from insider_news.preprocessing_llm.scoring_engine  import get_scoring_news
+from insider_news.base_model.commodity_tagger       import tag_article_commodities
+from insider_news.preprocessing_llm.extraction_engine import extract_articles
+from insider_news.preprocessing_llm.relevance_filter  import get_relevance_filter
 
 import argparse
-import time 
-import random
 
 
 class NikelCoIdScraper(Scraper):
@@ -17,6 +15,7 @@ class NikelCoIdScraper(Scraper):
         article_containers = soup.select("div.td_module_10")
         print(f"Found {len(article_containers)} articles on this page nikel.co.id.")
 
+        candidates = []
         for article in article_containers:
             title_tag = article.select_one("h3.entry-title a")
             date_tag = article.select_one("time.entry-date")
@@ -33,37 +32,59 @@ class NikelCoIdScraper(Scraper):
                     print('[NIKEL NEWS] Failed parse date for url: {source} Skipping')
                     continue
                 
-                # Get article content 
-                article = get_article_body(source)
-                sleep_time = random.uniform(1, 3)
-                time.sleep(sleep_time)
-
-                # Skip articles with low score
-                score = get_scoring_news(title, article)
-                score = score.get('news_score')
-                manual_score = self.manual_scoring_time(final_date)
-                final_score = score + manual_score
-                if final_score < 65:
-                    print(f"Skipping article due to low score: {final_score}")
+                # Skip articles already stored before fetching the body
+                if not self.is_new_source(source):
                     continue
 
-                # Get summary 
-                raw_summary = get_summary(article, source)
-                title = raw_summary.get('title')
-                body = raw_summary.get('body')
-
-                # Get commodities 
-                commodities = run_extract_commodities(title, body, article)
-                commodities = self.handling_duplicate_commodities(commodities)
-
-                article_data = {
+                candidates.append({
                     'title': title,
-                    'body': body,
                     'source': source,
                     'timestamp': final_date,
-                    'commodities': commodities
-                }
-                self.articles.append(article_data)
+                })
+
+        # Fetch the bodies of the new articles in parallel
+        contents = self.fetch_article_bodies([c['source'] for c in candidates], get_article_body)
+        for candidate, content in zip(candidates, contents):
+            candidate['content'] = content
+
+        # Articles the local relevance model rates as irrelevant never reach the LLM
+        relevance_filter = get_relevance_filter()
+        candidates = relevance_filter.filter(candidates, 'nikel.co.id')
+
+        # Score, title, summarize and tag every article of the page in one concurrent batch
+        extractions = extract_articles(candidates)
+        relevance_filter.record(candidates, extractions)
+
+        for candidate, extraction in zip(candidates, extractions):
+            if not extraction:
+                print(f"Skipping article due to failed scoring: {candidate['source']}")
+                continue
+
+            # Skip articles with low score
+            score = extraction.get('news_score')
+            manual_score = self.manual_scoring_time(candidate['timestamp'])
+            final_score = score + manual_score
+            if final_score < 65:
+                print(f"Skipping article due to low score: {final_score}")
+                continue
+
+            # Title and summary come from the same call as the score
+            title = extraction.get('title')
+            body = extraction.get('body')
+
+            # Get commodities 
+            commodities = tag_article_commodities(title, body, candidate['content'])
+            commodities += extraction.get('commodities', [])
+            commodities = self.handling_duplicate_commodities(commodities)
+
+            article_data = {
+                'title': title,
+                'body': body,
+                'source': candidate['source'],
+                'timestamp': candidate['timestamp'],
+                'commodities': commodities
+            }
+            self.articles.append(article_data)
         
         return self.articles
 
@@ -113,8 +134,10 @@ class NikelCoIdScraper(Scraper):
     
     def extract_news_pages(self, num_pages):
         for page in range(1, num_pages+1):
+            if self.should_stop():
+                break
             self.extract_news(self.get_page(page))
-            time.sleep(3)
+            self.stop_event.wait(3)
         return self.articles
    
     def get_page(self, page_num):
@@ -0,0 +1,256 @@
+from pydantic                       import Field, BaseModel
+from langchain_core.output_parsers  import JsonOutputParser
+from langchain.prompts              import PromptTemplate
+from langchain_core.runnables       import RunnableParallel
+from operator                       import itemgetter
+
+from scrapper.esdm_minerba  import COMMODITY_MAP
+from .llm_cache             import get_llm_cache, get_model_name, hash_text
+from .rate_limit            import run_coroutine
+from .router                import LLMRouter, get_router
+from .prompt_builder        import fit_article, log_prompt_tokens, static_tokens
+from .scoring_engine        import CRITERIA
+
+import asyncio
+
+
+# Canonical commodity names the model may answer with, and every accepted spelling of them
+COMMODITIES = sorted(set(COMMODITY_MAP.values()))
+COMMODITY_ALIASES = {
+    **{key.lower(): value for key, value in COMMODITY_MAP.items()},
+    **{value.lower(): value for value in COMMODITY_MAP.values()},
+}
+
+# Static parts first and the article last, so that calls share a cacheable prompt prefix
+EXTRACTION_TEMPLATE = """
+    You are a mining expert journalist and an expert at scoring industry mining articles.
+    From the article at the end, produce in a single answer:
+    - news_score: the score of the article based only on 'Criteria Scoring'.
+    - title: a one sentence title that is not misleading and gives general understanding of the article.
+    - body: a concise, maximum 2 sentences summary highlighting main points, key events, and mining metrics
+      (production volumes, capex, reserves, grades, shipments, smelter/plant status, permits, ESG incidents).
+    - commodities: the commodities the article is about, only from this list: {commodities}.
+      Return an empty list when none of them applies.
+
+    Criteria Scoring:
+    {criteria}
+
+    Ensure the answer is generated in the following JSON format:
+    {format_instructions}
+
+    Article Title:
+    {article_title}
+
+    Article Content:
+    {article_content}
+    """
+
+
+class ArticleExtraction(BaseModel):
+    news_score: int = Field(description="Scoring system of a news based only on provided criteria")
+    title: str = Field(description="One sentence title of the article")
+    body: str = Field(description="Two sentences summary of the article")
+    commodities: list[str] = Field(description="Commodities the article is about, from the provided list")
+
+
+# Output parser, prompt and input mapping are the same for every article
+EXTRACTION_PARSER = JsonOutputParser(pydantic_object=ArticleExtraction)
+EXTRACTION_PROMPT = PromptTemplate(
+    template=EXTRACTION_TEMPLATE,
+    input_variables=[
+        "article_title",
+        "article_content",
+        "criteria",
+    ],
+    partial_variables={
+        "commodities": ", ".join(COMMODITIES),
+        "format_instructions": EXTRACTION_PARSER.get_format_instructions(),
+    },
+)
+RUNNABLE_EXTRACTION_SYSTEM = RunnableParallel(
+    {
+        "article_title": itemgetter("article_title"),
+        "article_content": itemgetter("article_content"),
+        "criteria": itemgetter("criteria"),
+    }
+)
+
+# Compiled extraction chains, keyed by id() of the LLM they wrap
+_EXTRACTION_CHAINS = {}
+
+
+def get_extraction_chain(llm):
+    """
+    Build the extraction chain for an LLM on first use and reuse it afterwards.
+
+    Args:
+        llm: A LangChain chat model.
+
+    Returns:
+        Runnable: The extraction chain (inputs -> prompt -> llm -> JSON parser).
+    """
+    cached = _EXTRACTION_CHAINS.get(id(llm))
+    if cached is None:
+        chain = (
+            RUNNABLE_EXTRACTION_SYSTEM
+            | EXTRACTION_PROMPT
+            | llm
+            | EXTRACTION_PARSER
+        )
+        # Keep a reference to the llm so its id() is never reused
+        cached = (llm, chain)
+        _EXTRACTION_CHAINS[id(llm)] = cached
+    return cached[1]
+
+
+def get_prompt_version(criteria: str = CRITERIA) -> str:
+    """
+    Version of the extraction prompt, used in the cache key. Editing the template,
+    the criteria, the commodity list or the output format yields a new version.
+
+    Args:
+        criteria (str): Scoring criteria to evaluate the article.
+
+    Returns:
+        str: Hex digest identifying the prompt.
+    """
+    return hash_text(
+        EXTRACTION_TEMPLATE, criteria, ", ".join(COMMODITIES),
+        EXTRACTION_PARSER.get_format_instructions()
+    )
+
+
+def canonical_commodities(values) -> list[str]:
+    """
+    Map the commodities answered by the model to canonical names, dropping unknown ones.
+
+    Args:
+        values (list | Any): Commodities from the model response.
+
+    Returns:
+        list[str]: Canonical commodity names, without duplicates, in answer order.
+    """
+    if not isinstance(values, list):
+        return []
+    found = []
+    for value in values:
+        canonical = COMMODITY_ALIASES.get(str(value).strip().lower())
+        if canonical and canonical not in found:
+            found.append(canonical)
+    return found
+
+
+def is_complete(response) -> bool:
+    """Whether a response has a score, a title and a summary."""
+    return (
+        isinstance(response, dict)
+        and isinstance(response.get('news_score'), (int, float))
+        and bool(response.get('title'))
+        and bool(response.get('body'))
+    )
+
+
+async def aextract_article(article: dict,
+                           router: LLMRouter,
+                           criteria: str = CRITERIA,
+                           cache=None) -> dict | None:
+    """
+    Score, title, summarize and tag one article with a single LLM call on the
+    healthiest endpoint, failing over until one returns a complete answer. Bodies over the token
+    budget are reduced to their most salient paragraphs. A cached answer for the
+    same URL, content and prompt version is returned without any LLM call.
+
+    Args:
+        article (dict): Article with 'title', 'content' and optionally 'source' keys.
+        router (LLMRouter): Router choosing the endpoint of each call.
+        criteria (str): Scoring criteria to evaluate the article.
+        cache (LLMCache): Persistent result cache, None to disable it.
+
+    Returns:
+        dict | None: The parsed ArticleExtraction response (commodities canonicalized),
+            or None if every endpoint failed.
+    """
+    content = fit_article(article.get('content'), criteria)
+    content_hash = hash_text(article.get('title'), content)
+    prompt_version = get_prompt_version(criteria)
+    if cache:
+        cached = cache.get('extraction', article.get('source'), content_hash, prompt_version)
+        if cached:
+            print(f'[CACHE] Extraction for url: {article.get("source")}')
+            return cached
+
+    prefix_tokens = static_tokens(
+        EXTRACTION_TEMPLATE, criteria, ", ".join(COMMODITIES), EXTRACTION_PARSER.get_format_instructions()
+    )
+    log_prompt_tokens('extraction', article.get('source'), prefix_tokens, article.get('title'), content)
+    response, llm = await router.ainvoke(
+        get_extraction_chain,
+        {
+            'article_title': article.get('title'),
+            'article_content': content,
+            'criteria': criteria,
+        },
+        is_complete,
+        article.get('source') or article.get('title'),
+    )
+    if response is None:
+        return None
+
+    response['commodities'] = canonical_commodities(response.get('commodities'))
+    print(f'[SUCCES] Extraction for url: {article.get("source")}')
+    if cache:
+        cache.set(
+            'extraction', article.get('source'), content_hash, prompt_version,
+            get_model_name(llm), response
+        )
+    return response
+
+
+async def aextract_articles(articles: list[dict],
+                            criteria: str = CRITERIA,
+                            endpoints: list = None,
+                            use_cache: bool = True) -> list[dict | None]:
+    """
+    Extract many articles concurrently, fanning out across every model and API key
+    of the LLMCollection within each key's concurrency and rate limits.
+
+    Args:
+        articles (list[dict]): Articles with 'title', 'content' and optionally 'source' keys.
+        criteria (str): Scoring criteria to evaluate the articles.
+        endpoints (list): (key_id, llm, KeyLimiter) tuples, routed by a dedicated LLMRouter.
+            Defaults to the shared router over the LLMCollection.
+        use_cache (bool): Consult and fill the persistent LLM cache.
+
+    Returns:
+        list[dict | None]: One ArticleExtraction response per article, in input order
+            (None where every endpoint failed).
+    """
+    router = LLMRouter(endpoints) if endpoints else get_router()
+    cache = get_llm_cache() if use_cache else None
+    return await asyncio.gather(*(
+        aextract_article(article, router, criteria, cache)
+        for article in articles
+    ))
+
+
+def extract_articles(articles: list[dict],
+                     criteria: str = CRITERIA,
+                     endpoints: list = None,
+                     use_cache: bool = True) -> list[dict | None]:
+    """
+    Synchronous entry point of aextract_articles() for the scrapers: one LLM call per
+    article returns its score, title, two-sentence summary and commodities, instead
+    of a scoring call followed by a summary call.
+
+    Args:
+        articles (list[dict]): Articles with 'title', 'content' and optionally 'source' keys.
+        criteria (str): Scoring criteria to evaluate the articles.
+        endpoints (list): (key_id, llm, KeyLimiter) tuples. Defaults to the LLMCollection.
+        use_cache (bool): Consult and fill the persistent LLM cache.
+
+    Returns:
+        list[dict | None]: One ArticleExtraction response per article, in input order.
+    """
+    if not articles:
+        return []
+    return run_coroutine(aextract_articles(articles, criteria, endpoints, use_cache))
@@ -0,0 +1,190 @@
+from datetime     import datetime, timedelta, timezone
+from urllib.parse import urlsplit, urlunsplit
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+
+# Same database as mining_news, so the cache is committed with it by the workflows
+CACHE_DB_PATH = os.getenv("LLM_CACHE_DB", "db.sqlite")
+CACHE_TTL_DAYS = 60
+CACHE_MAX_ENTRIES = 20000
+
+
+def normalize_url(url: str | None) -> str:
+    """
+    Normalize an article URL so trivial variations share one cache entry.
+
+    Args:
+        url (str | None): The article URL.
+
+    Returns:
+        str: URL with lowercased scheme and host, without fragment and trailing slash
+             ('' if missing). Path and query keep their case, since servers may not.
+    """
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/")
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+
+def hash_text(*texts: str | None) -> str:
+    """
+    Hash one or more texts into a short hex digest.
+
+    Args:
+        *texts (str | None): Texts to hash, None is treated as ''.
+
+    Returns:
+        str: Hex digest.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for text in texts:
+        digest.update((text or "").encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def get_model_name(llm) -> str:
+    """
+    Get a readable model name from a LangChain chat model.
+
+    Args:
+        llm: A LangChain chat model.
+
+    Returns:
+        str: The model name, or the class name if it has none.
+    """
+    return getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+
+
+class LLMCache:
+    """
+    @brief Persistent SQLite cache of LLM results (scores, summaries).
+    Entries are keyed by (kind, normalized URL, content hash, prompt version, model).
+    The prompt version is a hash of the prompt template and criteria, so editing
+    either invalidates old entries automatically. Entries expire after `ttl_days`
+    and the table is trimmed to the `max_entries` most recently used.
+    """
+
+    def __init__(self, db_path: str = CACHE_DB_PATH,
+                 ttl_days: int = CACHE_TTL_DAYS,
+                 max_entries: int = CACHE_MAX_ENTRIES):
+        """
+        @brief Opens (and creates if needed) the cache table, then evicts stale entries.
+        @param db_path Path to the SQLite database.
+        @param ttl_days Days after which an entry is no longer used.
+        @param max_entries Maximum number of entries kept.
+        """
+        self.ttl_days = ttl_days
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    kind TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    last_used_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (kind, url, content_hash, prompt_version, model)
+                );
+                """
+            )
+        self.evict()
+
+    def _cutoff(self) -> str:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.ttl_days)
+        return cutoff.strftime("%Y-%m-%d %H:%M:%S")
+
+    def get(self, kind: str, url: str, content_hash: str, prompt_version: str) -> dict | None:
+        """
+        @brief Looks up a cached result produced by any model.
+        @param kind Result type, e.g. 'score' or 'summary'.
+        @param url Article URL (normalized internally).
+        @param content_hash Hash of the text sent to the LLM.
+        @param prompt_version Hash of the prompt template and criteria.
+        @return The cached result, or None on a miss.
+        """
+        url = normalize_url(url)
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT model, result FROM llm_cache
+                WHERE kind = ? AND url = ? AND content_hash = ? AND prompt_version = ?
+                  AND created_at >= ?
+                ORDER BY created_at DESC LIMIT 1;
+                """,
+                (kind, url, content_hash, prompt_version, self._cutoff()),
+            ).fetchone()
+            if row is None:
+                return None
+            with self._conn:
+                self._conn.execute(
+                    """
+                    UPDATE llm_cache SET last_used_at = CURRENT_TIMESTAMP
+                    WHERE kind = ? AND url = ? AND content_hash = ? AND prompt_version = ? AND model = ?;
+                    """,
+                    (kind, url, content_hash, prompt_version, row[0]),
+                )
+        return json.loads(row[1])
+
+    def set(self, kind: str, url: str, content_hash: str, prompt_version: str, model: str, result: dict):
+        """
+        @brief Stores a result.
+        @param kind Result type, e.g. 'score' or 'summary'.
+        @param url Article URL (normalized internally).
+        @param content_hash Hash of the text sent to the LLM.
+        @param prompt_version Hash of the prompt template and criteria.
+        @param model Name of the model that produced the result.
+        @param result The parsed LLM output.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO llm_cache
+                    (kind, url, content_hash, prompt_version, model, result)
+                VALUES (?, ?, ?, ?, ?, ?);
+                """,
+                (kind, normalize_url(url), content_hash, prompt_version, model, json.dumps(result)),
+            )
+
+    def evict(self):
+        """
+        @brief Deletes expired entries, then the least recently used ones above max_entries.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?;", (self._cutoff(),))
+            self._conn.execute(
+                """
+                DELETE FROM llm_cache WHERE rowid NOT IN (
+                    SELECT rowid FROM llm_cache ORDER BY last_used_at DESC LIMIT ?
+                );
+                """,
+                (self.max_entries,),
+            )
+
+
+_CACHE = None
+
+
+def get_llm_cache() -> LLMCache:
+    """
+    Get the process-wide LLMCache, opening it on first use.
+
+    Returns:
+        LLMCache: The shared cache.
+    """
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = LLMCache()
+    return _CACHE
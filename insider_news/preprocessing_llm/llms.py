@@ -1,6 +1,8 @@
 from langchain.chat_models import init_chat_model
 
 from dotenv import load_dotenv
+from .rate_limit import KeyLimiter
+
 import os 
 
 
@@ -12,10 +14,41 @@ GROQ_API_KEY2 = os.getenv("GROQ_API_KEY2")
 GROQ_API_KEY3 = os.getenv("GROQ_API_KEY3")
 
 
+# Request limits per API key: (requests per second, burst size, max in-flight requests)
+PROVIDER_LIMITS = {
+    "groq": (0.5, 5, 4),
+    "openai": (5.0, 10, 8),
+}
+
+# Seconds before a single LLM request is abandoned; failover is left to the LLMRouter,
+# so the clients themselves do not retry
+REQUEST_TIMEOUT = 60
+
+# (model, provider, api key id); the last one is the paid fallback
+LLM_SPECS = [
+    ("llama3-70b-8192", "groq", "GROQ_API_KEY1"),
+    ("llama-3.3-70b-versatile", "groq", "GROQ_API_KEY1"),
+    ("llama3-70b-8192", "groq", "GROQ_API_KEY2"),
+    ("llama-3.3-70b-versatile", "groq", "GROQ_API_KEY2"),
+    ("llama3-70b-8192", "groq", "GROQ_API_KEY3"),
+    ("llama-3.3-70b-versatile", "groq", "GROQ_API_KEY3"),
+    ("gpt-4.1-mini", "openai", "OPENAI_API_KEY"),
+]
+
+API_KEYS = {
+    "GROQ_API_KEY1": GROQ_API_KEY1,
+    "GROQ_API_KEY2": GROQ_API_KEY2,
+    "GROQ_API_KEY3": GROQ_API_KEY3,
+    "OPENAI_API_KEY": OPENAI_API_KEY,
+}
+
+
 class LLMCollection:
     """
     @brief Singleton class to manage a collection of LLM (Large Language Model) instances.
     This class ensures that only one instance of the LLMCollection exists and provides methods to add and retrieve LLM instances.
+    Every LLM is tagged with the id of the API key it uses, and every key has its own
+    KeyLimiter, so concurrent callers can spread load across keys without exceeding their limits.
     """
     _instance = None
 
@@ -26,65 +59,35 @@ class LLMCollection:
         """
         if cls._instance is None:
             cls._instance = super(LLMCollection, cls).__new__(cls)
-            cls._instance._llms = [
-                init_chat_model(
-                    "llama3-70b-8192",
-                    model_provider="groq",
-                    temperature=0.2,
-                    max_retries=3,
-                    api_key=GROQ_API_KEY1
-                ),
-                init_chat_model(
-                   "llama-3.3-70b-versatile",
-                    model_provider="groq",
-                    temperature=0.2,
-                    max_retries=3,
-                    api_key=GROQ_API_KEY1
-                ),
-                init_chat_model(
-                    "llama3-70b-8192",
-                    model_provider="groq",
-                    temperature=0.2,
-                    max_retries=3,
-                    api_key=GROQ_API_KEY2
-                ),
-                init_chat_model(
-                   "llama-3.3-70b-versatile",
-                    model_provider="groq",
-                    temperature=0.2,
-                    max_retries=3,
-                    api_key=GROQ_API_KEY2
-                ), 
-                init_chat_model(
-                    "llama3-70b-8192",
-                    model_provider="groq",
-                    temperature=0.2,
-                    max_retries=3,
-                    api_key=GROQ_API_KEY3
-                ),
-                init_chat_model(
-                   "llama-3.3-70b-versatile",
-                    model_provider="groq",
-                    temperature=0.2,
-                    max_retries=3,
-                    api_key=GROQ_API_KEY3
-                ), 
-                init_chat_model(
-                   "gpt-4.1-mini",
-                    model_provider="openai",
-                    temperature=0.2,
-                    max_retries=3,
-                    api_key=OPENAI_API_KEY
-                ), 
-            ]
+            cls._instance._llms = []
+            cls._instance._key_ids = []
+            cls._instance._limiters = {}
+            for model, provider, key_id in LLM_SPECS:
+                cls._instance.add_llm(
+                    init_chat_model(
+                        model,
+                        model_provider=provider,
+                        temperature=0.2,
+                        max_retries=0,
+                        timeout=REQUEST_TIMEOUT,
+                        api_key=API_KEYS[key_id]
+                    ),
+                    key_id=key_id,
+                    provider=provider,
+                )
         return cls._instance
 
-    def add_llm(self, llm):
+    def add_llm(self, llm, key_id: str = "default", provider: str = "groq"):
         """
         @brief Adds a new LLM instance to the collection.
         @param llm The LLM instance to be added to the collection.
+        @param key_id Id of the API key the LLM uses; LLMs sharing a key share its limits.
+        @param provider Provider name used to pick the default limits from PROVIDER_LIMITS.
         """
         self._llms.append(llm)
+        self._key_ids.append(key_id)
+        if key_id not in self._limiters:
+            self._limiters[key_id] = KeyLimiter(*PROVIDER_LIMITS.get(provider, PROVIDER_LIMITS["groq"]))
 
     def get_llms(self):
         """
@@ -92,3 +95,13 @@ class LLMCollection:
         @return A list of LLM instances.
         """
         return self._llms
+
+    def get_endpoints(self):
+        """
+        @brief Retrieves every LLM together with the limiter of its API key.
+        @return A list of (key_id, llm, KeyLimiter) tuples, the paid fallback last.
+        """
+        return [
+            (key_id, llm, self._limiters[key_id])
+            for key_id, llm in zip(self._key_ids, self._llms)
+        ]
@@ -0,0 +1,190 @@
+from scrapper.esdm_minerba import COMMODITY_MAP
+
+import functools
+import re
+
+
+# Tokens of article text sent per call; longer bodies are cut down to their most salient paragraphs
+ARTICLE_TOKEN_BUDGET = 1500
+# Smallest leftover budget worth filling with the start of a paragraph that does not fit
+MIN_CUT_TOKENS = 40
+
+# Tokenizer used for counting; any OpenAI encoding is close enough for Llama models too
+TIKTOKEN_ENCODING = "o200k_base"
+
+# Approximation used when tiktoken (or its encoding file) is not available
+APPROX_TOKEN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+APPROX_TOKENS_PER_WORD = 1.3
+
+PARAGRAPH_SPLIT = re.compile(r"\n\s*\n|\n")
+NUMBER = re.compile(r"\d[\d.,]*\s*(?:%|persen|percent|ton|tonnes|mt|kt|wmt|dmt|usd|us\$|rp|idr|billion|million|miliar|juta|triliun)?",
+                    re.IGNORECASE)
+QUOTED_KEYWORD = re.compile(r'"([^"]{3,60})"')
+
+
+@functools.lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(TIKTOKEN_ENCODING)
+    except Exception as error:
+        # tiktoken downloads its encoding files on first use, which may fail offline
+        print(f"[PROMPT] tiktoken unavailable ({error}), approximating token counts")
+        return None
+
+
+def count_tokens(text: str | None) -> int:
+    """
+    Count the tokens of a text with tiktoken, or a word-based approximation without it.
+
+    Args:
+        text (str | None): Text to count.
+
+    Returns:
+        int: Number of tokens.
+    """
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return int(len(APPROX_TOKEN.findall(text)) * APPROX_TOKENS_PER_WORD)
+
+
+@functools.lru_cache(maxsize=8)
+def salient_keywords(criteria: str) -> tuple[str, ...]:
+    """
+    Keywords that make a paragraph worth keeping: the quoted terms of the scoring
+    criteria and the commodity names.
+
+    Args:
+        criteria (str): Scoring criteria text.
+
+    Returns:
+        tuple[str, ...]: Lowercased keywords.
+    """
+    keywords = {keyword.lower() for keyword in QUOTED_KEYWORD.findall(criteria)}
+    keywords.update(key.lower() for key in COMMODITY_MAP)
+    keywords.update(value.lower() for value in COMMODITY_MAP.values())
+    return tuple(sorted(keywords))
+
+
+@functools.lru_cache(maxsize=8)
+def keyword_pattern(keywords: tuple[str, ...]) -> re.Pattern:
+    """One compiled alternation of the keywords, longest first."""
+    alternation = "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+    return re.compile(rf"\b(?:{alternation})\b", re.IGNORECASE)
+
+
+def paragraph_salience(paragraph: str, length: int, keywords: re.Pattern) -> float:
+    """
+    Salience of a paragraph: keyword hits and figures (volumes, prices, percentages),
+    damped by length so short dense paragraphs beat long generic ones.
+
+    Args:
+        paragraph (str): Paragraph text.
+        length (int): Tokens of the paragraph.
+        keywords (re.Pattern): Compiled keyword alternation.
+
+    Returns:
+        float: Salience score.
+    """
+    hits = len(keywords.findall(paragraph)) + len(NUMBER.findall(paragraph))
+    return hits / (length ** 0.5 or 1)
+
+
+def truncate_tokens(text: str, budget: int) -> str:
+    """
+    Cut a text to at most `budget` tokens.
+
+    Args:
+        text (str): Text to cut.
+        budget (int): Maximum number of tokens.
+
+    Returns:
+        str: The text, shortened if needed.
+    """
+    if budget <= 0:
+        return ""
+    encoding = _encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= budget else encoding.decode(tokens[:budget])
+    words = text.split(" ")
+    keep = int(budget / APPROX_TOKENS_PER_WORD)
+    return text if len(words) <= keep else " ".join(words[:keep])
+
+
+def fit_article(content: str | None, criteria: str, budget: int = ARTICLE_TOKEN_BUDGET) -> str:
+    """
+    Fit an article body into a token budget. Bodies within the budget are returned
+    unchanged. Otherwise the lead paragraph is kept, and the remaining budget goes
+    to the most salient paragraphs (criteria keywords, commodities, figures), which
+    keep their original order.
+
+    Args:
+        content (str | None): Article body.
+        criteria (str): Scoring criteria, source of the salience keywords.
+        budget (int): Maximum number of tokens of the returned body.
+
+    Returns:
+        str: The body to send to the LLM.
+    """
+    content = content or ""
+    if count_tokens(content) <= budget:
+        return content
+
+    paragraphs = [p.strip() for p in PARAGRAPH_SPLIT.split(content) if p.strip()]
+    lengths = [count_tokens(p) for p in paragraphs]
+    keywords = keyword_pattern(salient_keywords(criteria))
+
+    # The lead usually carries the who/what/when, always keep it (cut if it alone is too long)
+    selected = {0}
+    remaining = budget - lengths[0]
+    if remaining < 0:
+        return truncate_tokens(paragraphs[0], budget)
+
+    ranked = sorted(
+        range(1, len(paragraphs)),
+        key=lambda i: paragraph_salience(paragraphs[i], lengths[i], keywords),
+        reverse=True,
+    )
+    for i in ranked:
+        if lengths[i] <= remaining:
+            selected.add(i)
+            remaining -= lengths[i]
+
+    # Spend what is left on the beginning of the most salient paragraph that did not fit
+    cut = {}
+    skipped = [i for i in ranked if i not in selected]
+    if skipped and remaining >= MIN_CUT_TOKENS:
+        cut[skipped[0]] = truncate_tokens(paragraphs[skipped[0]], remaining)
+        selected.add(skipped[0])
+
+    return "\n\n".join(cut.get(i, paragraphs[i]) for i in sorted(selected))
+
+
+@functools.lru_cache(maxsize=16)
+def static_tokens(*parts: str) -> int:
+    """Token count of the static prompt parts (instructions, criteria, format), counted once."""
+    return sum(count_tokens(part) for part in parts)
+
+
+def log_prompt_tokens(kind: str, source: str | None, static: int, *texts: str | None) -> int:
+    """
+    Print the input tokens of one LLM call.
+
+    Args:
+        kind (str): Call type, e.g. 'score'.
+        source (str | None): Article URL or title, for the log line.
+        static (int): Tokens of the static prompt prefix.
+        *texts (str | None): Article-specific texts of the prompt.
+
+    Returns:
+        int: Total input tokens.
+    """
+    article = sum(count_tokens(text) for text in texts)
+    total = static + article
+    print(f"[TOKENS] {kind} {source}: {total} input tokens ({static} static prefix + {article} article)")
+    return total
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+import time
+
+
+_LOOP = None
+_LOOP_LOCK = threading.Lock()
+
+
+def run_coroutine(coro):
+    """
+    @brief Runs a coroutine on the shared LLM event loop and waits for its result.
+    The loop lives in a daemon thread, so every caller (including scrapers running in
+    parallel threads) shares it, and the per-key limits hold for the whole process.
+    @param coro The coroutine to run.
+    @return The coroutine's result.
+    """
+    global _LOOP
+    with _LOOP_LOCK:
+        if _LOOP is None:
+            _LOOP = asyncio.new_event_loop()
+            threading.Thread(target=_LOOP.run_forever, daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coro, _LOOP).result()
+
+
+class TokenBucket:
+    """
+    @brief Token-bucket rate limiter shared by every request made with one API key.
+    Tokens refill continuously at `rate` per second up to `capacity`, so short bursts are
+    allowed while the long-run request rate stays under the provider limit.
+    The state only depends on time.monotonic(), so one bucket can be reused across event loops.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        @brief Creates a bucket that starts full.
+        @param rate Tokens added per second.
+        @param capacity Maximum number of tokens (burst size).
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        """
+        @brief Waits until a token is available and takes it.
+        """
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class KeyLimiter:
+    """
+    @brief Per-API-key limits: a concurrency cap and a token-bucket request rate.
+    """
+
+    def __init__(self, rate: float, capacity: int, max_concurrency: int):
+        """
+        @brief Creates the limiter for one API key.
+        @param rate Requests per second allowed for the key.
+        @param capacity Burst size of the token bucket.
+        @param max_concurrency Maximum number of in-flight requests for the key.
+        """
+        self.bucket = TokenBucket(rate, capacity)
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        self._loop = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """
+        @brief Semaphore bound to the running event loop (recreated for each asyncio.run).
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        await self.bucket.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.semaphore.release()
+        return False
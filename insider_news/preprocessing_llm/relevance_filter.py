@@ -0,0 +1,498 @@
+from collections  import Counter
+from urllib.parse import urlsplit
+
+from scrapper.esdm_minerba  import COMMODITY_MAP
+from .llm_cache             import CACHE_DB_PATH, normalize_url
+from .prompt_builder        import QUOTED_KEYWORD, keyword_pattern
+from .scoring_engine        import CRITERIA
+
+import argparse
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+
+import numpy as np
+
+
+# Trained weights; committed with insider_news/data by the daily workflow
+MODEL_PATH = os.getenv(
+    "RELEVANCE_MODEL_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "relevance_model.json"),
+)
+
+# Final score (LLM score + up to 5 recency points) an article needs to land in mining_news
+ACCEPT_SCORE = 65
+MAX_TIME_SCORE = 5
+
+# Keyword hits in the title weigh more than hits in the body
+TITLE_WEIGHT = 2
+
+# Articles below the threshold are not sent to the LLM. Until a model is trained
+# nothing is skipped: accepted articles from energy sites can lack every keyword
+DEFAULT_THRESHOLD = 0.0
+# Logit margin kept under the least relevant accepted article when calibrating
+THRESHOLD_MARGIN = 1.0
+# Labeled articles needed before the trained model replaces the prior
+MIN_POSITIVES = 20
+MIN_NEGATIVES = 20
+# Accepted articles a site needs for its own threshold; other sites use the global one
+MIN_SOURCE_POSITIVES = 10
+
+# Share of below-threshold articles still sent to the LLM, so wrong skips get measured
+AUDIT_RATE = 0.1
+# The filter only logs what it would skip (shadow mode) until this many below-threshold
+# articles were scored, and while more of them than MAX_AUDIT_MISS_RATE were accepted
+MIN_AUDITED = 30
+MAX_AUDIT_MISS_RATE = 0.02
+
+L2_PENALTY = 0.01
+LEARNING_RATE = 0.5
+EPOCHS = 2000
+
+CRITERION_SECTION = re.compile(r"^\s*\d+\.\s+([^(\n]+?)\s*\(", re.MULTILINE)
+PARENTHESIZED = re.compile(r"\s*\(([^)]+)\)")
+
+# The sector criteria are about Indonesia, which the criteria keywords only name indirectly
+REGION_KEYWORDS = ("indonesia", "indonesian", "indonesia's")
+
+
+def criteria_keyword_groups(criteria: str = CRITERIA) -> dict[str, tuple[str, ...]]:
+    """
+    Keyword lists of the numbered scoring criteria. A keyword with a parenthesized
+    ticker or acronym, e.g. "Antam (ANTM)", yields both "antam" and "antm".
+
+    Args:
+        criteria (str): Scoring criteria text.
+
+    Returns:
+        dict[str, tuple[str, ...]]: Lowercased keywords by criterion name.
+    """
+    groups = {}
+    sections = list(CRITERION_SECTION.finditer(criteria))
+    for idx, section in enumerate(sections):
+        end = sections[idx + 1].start() if idx + 1 < len(sections) else len(criteria)
+        text = criteria[section.start():end]
+        if "Keywords:" not in text:
+            continue
+        # Only the keyword list, not the quoted examples of the score lines
+        text = text.split("Keywords:", 1)[1].split("Score", 1)[0]
+        keywords = set()
+        for keyword in QUOTED_KEYWORD.findall(text):
+            keywords.update(p.strip().lower() for p in PARENTHESIZED.findall(keyword))
+            keywords.add(PARENTHESIZED.sub("", keyword).strip().lower())
+        groups[section.group(1).strip()] = tuple(sorted(k for k in keywords if k))
+    return groups
+
+
+def build_feature_groups(criteria: str = CRITERIA) -> dict[str, tuple[str, ...]]:
+    """
+    Feature groups of the relevance model: one per criterion keyword list, the
+    commodity names of COMMODITY_MAP and the Indonesia markers.
+
+    Args:
+        criteria (str): Scoring criteria text.
+
+    Returns:
+        dict[str, tuple[str, ...]]: Lowercased keywords by feature name.
+    """
+    groups = criteria_keyword_groups(criteria)
+    groups["Commodities"] = tuple(sorted(
+        {key.lower() for key in COMMODITY_MAP} | {value.lower() for value in COMMODITY_MAP.values()}
+    ))
+    groups["Indonesia"] = REGION_KEYWORDS
+    return groups
+
+
+FEATURE_GROUPS = build_feature_groups()
+FEATURE_NAMES = list(FEATURE_GROUPS)
+KEYWORDS = tuple(sorted({k for keywords in FEATURE_GROUPS.values() for k in keywords}))
+KEYWORD_PATTERN = keyword_pattern(KEYWORDS)
+
+# Prior used until enough articles are labeled, for the logged probabilities: commodity,
+# sector, value chain and Indonesia hits matter, the generic writing-quality criteria barely do
+PRIOR_WEIGHTS = {
+    "Commodities": 2.0,
+    "Relevance to Indonesian Coal, Metal & Mineral Sectors": 2.0,
+    "Specific Commodity & Value Chain Focus": 1.5,
+    "Indonesia": 1.0,
+    "Source Credibility": 1.0,
+}
+PRIOR_GENERIC_WEIGHT = 0.02
+PRIOR_BIAS = -3.0
+
+
+def keyword_counts(title: str | None, content: str | None) -> Counter:
+    """
+    Count the criteria and commodity keywords of an article in one regex pass per field.
+
+    Args:
+        title (str | None): Article title, its hits count TITLE_WEIGHT times.
+        content (str | None): Article body.
+
+    Returns:
+        Counter: Hits by lowercased keyword.
+    """
+    counts = Counter(match.lower() for match in KEYWORD_PATTERN.findall(content or ""))
+    for match in KEYWORD_PATTERN.findall(title or ""):
+        counts[match.lower()] += TITLE_WEIGHT
+    return counts
+
+
+def sigmoid(x):
+    return 1 / (1 + np.exp(-x))
+
+
+def source_site(url: str | None) -> str:
+    """Host of an article URL without 'www.', the key of the per-site thresholds."""
+    return urlsplit(normalize_url(url)).netloc.removeprefix("www.")
+
+
+class RelevanceModel:
+    """
+    @brief Logistic regression over TF-IDF keyword features, one feature per keyword
+    group (criteria keyword lists, commodities, Indonesia markers).
+    Each feature is log(1 + sum of tf * idf) of the group's keywords. Thresholds are
+    calibrated per site under the least relevant article that ever reached mining_news,
+    so the filter only skips articles the LLM would have rejected anyway.
+    """
+
+    def __init__(self, weights: dict, bias: float, threshold: float, idf: dict | None = None,
+                 trained_on: int = 0, site_thresholds: dict | None = None):
+        """
+        @brief Creates a model.
+        @param weights Weight by feature name; missing features weigh 0.
+        @param bias Intercept.
+        @param threshold Probability under which an article is skipped.
+        @param idf Inverse document frequency by keyword; missing keywords use 1.
+        @param trained_on Number of labeled articles the model was fit on, 0 for the prior.
+        @param site_thresholds Threshold by site, for sites with enough accepted articles.
+        """
+        self.weights = np.array([weights.get(name, 0.0) for name in FEATURE_NAMES])
+        self.bias = bias
+        self.threshold = threshold
+        self.idf = idf or {}
+        self.trained_on = trained_on
+        self.site_thresholds = site_thresholds or {}
+
+    @classmethod
+    def prior(cls) -> "RelevanceModel":
+        """
+        @brief The hand-set model used until enough articles are labeled.
+        """
+        weights = {name: PRIOR_WEIGHTS.get(name, PRIOR_GENERIC_WEIGHT) for name in FEATURE_NAMES}
+        return cls(weights, PRIOR_BIAS, DEFAULT_THRESHOLD)
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH) -> "RelevanceModel":
+        """
+        @brief Loads trained weights, falling back to the prior when there are none.
+        @param path Path to the JSON model file.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return cls.prior()
+        return cls(
+            data["weights"], data["bias"], data["threshold"], data.get("idf"),
+            data.get("trained_on", 0), data.get("site_thresholds"),
+        )
+
+    def save(self, path: str = MODEL_PATH):
+        """
+        @brief Writes the model as JSON.
+        @param path Path to the JSON model file.
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({
+                "weights": dict(zip(FEATURE_NAMES, self.weights.round(6).tolist())),
+                "bias": round(float(self.bias), 6),
+                "threshold": round(float(self.threshold), 6),
+                "site_thresholds": {k: round(v, 6) for k, v in self.site_thresholds.items()},
+                "idf": {k: round(v, 6) for k, v in self.idf.items()},
+                "trained_on": self.trained_on,
+            }, file, indent=2)
+
+    def features(self, counts: Counter) -> np.ndarray:
+        """
+        @brief TF-IDF feature vector of an article.
+        @param counts Keyword hits, see keyword_counts().
+        """
+        return np.array([
+            np.log1p(sum(counts.get(k, 0) * self.idf.get(k, 1.0) for k in FEATURE_GROUPS[name]))
+            for name in FEATURE_NAMES
+        ])
+
+    def threshold_for(self, url: str | None) -> float:
+        """
+        @brief Skip threshold of the site an article comes from.
+        @param url Article URL.
+        """
+        return self.site_thresholds.get(source_site(url), self.threshold)
+
+    def probability(self, counts: Counter) -> float:
+        """
+        @brief Probability that the article reaches mining_news.
+        @param counts Keyword hits, see keyword_counts().
+        """
+        return float(sigmoid(self.features(counts) @ self.weights + self.bias))
+
+    @classmethod
+    def fit(cls, samples: list[tuple[str, Counter, bool]]) -> "RelevanceModel | None":
+        """
+        @brief Fits the model on labeled articles with class-balanced gradient descent,
+        then sets the thresholds under the lowest-scoring accepted article, overall and
+        per site.
+        @param samples (url, keyword counts, accepted) triples.
+        @return The trained model, or None if there are too few labeled articles.
+        """
+        labels = np.array([accepted for _, _, accepted in samples], dtype=float)
+        positives = int(labels.sum())
+        if positives < MIN_POSITIVES or len(labels) - positives < MIN_NEGATIVES:
+            return None
+
+        # Smoothed idf over the labeled articles
+        document_frequency = Counter(k for _, counts, _ in samples for k in counts)
+        idf = {
+            k: float(np.log((1 + len(samples)) / (1 + document_frequency[k])) + 1)
+            for k in KEYWORDS
+        }
+        model = cls({}, 0.0, DEFAULT_THRESHOLD, idf, len(samples))
+        x = np.array([model.features(counts) for _, counts, _ in samples])
+
+        # Both classes weigh the same whatever their size
+        sample_weight = np.where(labels == 1, 0.5 / positives, 0.5 / (len(labels) - positives))
+        weights, bias = np.zeros(x.shape[1]), 0.0
+        for _ in range(EPOCHS):
+            error = (sigmoid(x @ weights + bias) - labels) * sample_weight
+            weights -= LEARNING_RATE * (x.T @ error + L2_PENALTY * weights)
+            bias -= LEARNING_RATE * error.sum()
+
+        model.weights, model.bias = weights, bias
+
+        # Keep every article that was accepted so far, with a margin
+        def calibrate(mask) -> float:
+            lowest_logit = float((x[mask] @ weights + bias).min())
+            return min(float(sigmoid(lowest_logit - THRESHOLD_MARGIN)), 0.5)
+
+        positive = labels == 1
+        model.threshold = calibrate(positive)
+        sites = np.array([source_site(url) for url, _, _ in samples])
+        for site in set(sites[positive].tolist()):
+            site_positive = positive & (sites == site)
+            if site_positive.sum() >= MIN_SOURCE_POSITIVES:
+                model.site_thresholds[site] = calibrate(site_positive)
+        return model
+
+
+class RelevanceFilter:
+    """
+    @brief Local relevance stage run before LLM scoring.
+    Articles the model rates below its threshold are skipped (and logged) without an
+    LLM call. The LLM scores of the articles that were sent are stored as labeled
+    samples, so the model can be retrained on them with `--train`.
+    A random AUDIT_RATE share of below-threshold articles is scored anyway and stored
+    as audit samples, which measures how many skips would have lost an accepted
+    article. Until enough audits show a low miss rate, nothing is skipped: every
+    below-threshold article is audited instead (shadow mode).
+    """
+
+    def __init__(self, model: RelevanceModel | None = None, db_path: str = CACHE_DB_PATH):
+        """
+        @brief Creates the filter.
+        @param model Relevance model, defaults to the trained one (or the prior).
+        @param db_path SQLite database holding the labeled samples.
+        """
+        self.model = model or RelevanceModel.load()
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = None
+        # Normalized URLs of below-threshold articles sent to the LLM for auditing
+        self._audited = set()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            with self._conn:
+                self._conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS relevance_samples (
+                        url TEXT PRIMARY KEY,
+                        counts TEXT NOT NULL,
+                        score REAL NOT NULL,
+                        audit INTEGER NOT NULL DEFAULT 0,
+                        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                    );
+                    """
+                )
+                columns = {row[1] for row in self._conn.execute("PRAGMA table_info(relevance_samples);")}
+                if "audit" not in columns:
+                    self._conn.execute("ALTER TABLE relevance_samples ADD COLUMN audit INTEGER NOT NULL DEFAULT 0;")
+        return self._conn
+
+    def audit_stats(self) -> tuple[int, int]:
+        """
+        @brief Below-threshold articles scored so far, and how many of them would have been accepted.
+        """
+        with self._lock:
+            audited, missed = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(score + ? >= ?), 0) FROM relevance_samples WHERE audit = 1;",
+                (MAX_TIME_SCORE, ACCEPT_SCORE),
+            ).fetchone()
+        return audited, missed
+
+    def shadow_mode(self) -> bool:
+        """
+        @brief Whether skips are only logged, because too few audits were made or too many
+        of them would have been accepted.
+        """
+        audited, missed = self.audit_stats()
+        return audited < MIN_AUDITED or missed > MAX_AUDIT_MISS_RATE * audited
+
+    def filter(self, articles: list[dict], label: str = "") -> list[dict]:
+        """
+        @brief Drops the articles the model rates as irrelevant.
+        @param articles Articles with 'title', 'content' and 'source' keys.
+        @param label Scraper name for the logs.
+        @return The articles to send to the LLM, in input order.
+        """
+        shadow = self.shadow_mode() if articles else False
+        kept = []
+        for article in articles:
+            counts = keyword_counts(article.get('title'), article.get('content') or article.get('body'))
+            probability = self.model.probability(counts)
+            threshold = self.model.threshold_for(article.get('source'))
+            if probability < threshold:
+                if shadow or random.random() < AUDIT_RATE:
+                    print(
+                        f"[RELEVANCE] {label} Would skip (p={probability:.3f} < {threshold:.3f}), "
+                        f"auditing with the LLM{' (shadow mode)' if shadow else ''}: {article.get('source')}"
+                    )
+                    with self._lock:
+                        self._audited.add(normalize_url(article.get('source')))
+                    kept.append(article)
+                    continue
+                print(
+                    f"[RELEVANCE] {label} Skipping LLM scoring (p={probability:.3f} < "
+                    f"{threshold:.3f}): {article.get('source')}"
+                )
+                continue
+            kept.append(article)
+        if articles:
+            print(f"[RELEVANCE] {label} Sending {len(kept)}/{len(articles)} articles to the LLM")
+        return kept
+
+    def record(self, articles: list[dict], results: list[dict | None]):
+        """
+        @brief Stores the keyword counts and LLM score of scored articles as training samples.
+        @param articles Articles sent to the LLM.
+        @param results LLM responses with a 'news_score', in the same order (None if failed).
+        """
+        rows = []
+        with self._lock:
+            for article, result in zip(articles, results):
+                url = normalize_url(article.get('source'))
+                audit = url in self._audited
+                self._audited.discard(url)
+                if result and isinstance(result.get('news_score'), (int, float)) and url:
+                    counts = keyword_counts(article.get('title'), article.get('content') or article.get('body'))
+                    rows.append((url, json.dumps(counts), float(result['news_score']), int(audit)))
+        if not rows:
+            return
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO relevance_samples (url, counts, score, audit) VALUES (?, ?, ?, ?);",
+                    rows,
+                )
+
+        audits = [score for _, _, score, audit in rows if audit]
+        if audits:
+            missed = sum(score + MAX_TIME_SCORE >= ACCEPT_SCORE for score in audits)
+            audited_total, missed_total = self.audit_stats()
+            print(
+                f"[RELEVANCE] Audit: {missed}/{len(audits)} below-threshold articles would have been accepted "
+                f"({missed_total}/{audited_total} overall)"
+            )
+
+    def samples(self) -> list[tuple[str, Counter, bool]]:
+        """
+        @brief Labeled samples: an article is positive when its LLM score plus the best
+        recency score reaches ACCEPT_SCORE, so every possibly accepted article counts.
+        """
+        with self._lock:
+            rows = self._connection().execute("SELECT url, counts, score FROM relevance_samples;").fetchall()
+        return [
+            (url, Counter(json.loads(counts)), score + MAX_TIME_SCORE >= ACCEPT_SCORE)
+            for url, counts, score in rows
+        ]
+
+    def train(self, path: str = MODEL_PATH) -> RelevanceModel | None:
+        """
+        @brief Retrains the model on the stored samples and saves it.
+        @param path Where to write the model.
+        @return The new model, or None if there are not enough samples yet.
+        """
+        samples = self.samples()
+        model = RelevanceModel.fit(samples)
+        if model is None:
+            print(f"[RELEVANCE] Not enough labeled articles to train ({len(samples)}), keeping the current model")
+            return None
+        model.save(path)
+        self.model = model
+        audited, missed = self.audit_stats()
+        print(
+            f"[RELEVANCE] Trained on {len(samples)} articles, threshold {model.threshold:.3f}, "
+            f"audit misses {missed}/{audited}"
+        )
+        return model
+
+
+_FILTER = None
+
+
+def get_relevance_filter() -> RelevanceFilter:
+    """
+    Get the process-wide RelevanceFilter, loading the model on first use.
+
+    Returns:
+        RelevanceFilter: The shared filter.
+    """
+    global _FILTER
+    if _FILTER is None:
+        _FILTER = RelevanceFilter()
+    return _FILTER
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the local relevance pre-filter on LLM-scored articles")
+    parser.add_argument("--train", action="store_true", help="Retrain the model on the stored samples")
+    parser.add_argument("--db", type=str, default=CACHE_DB_PATH, help="Database holding the samples")
+    parser.add_argument("--model", type=str, default=MODEL_PATH, help="Path of the model file")
+    args = parser.parse_args()
+
+    relevance_filter = RelevanceFilter(RelevanceModel.load(args.model), args.db)
+    if args.train:
+        relevance_filter.train(args.model)
+    else:
+        model = relevance_filter.model
+        print(f"[RELEVANCE] Model trained on {model.trained_on} articles, threshold {model.threshold:.3f}")
+        for name, weight in zip(FEATURE_NAMES, model.weights):
+            print(f"  {name}: {weight:.3f}")
+        for site, threshold in model.site_thresholds.items():
+            print(f"  threshold {site}: {threshold:.3f}")
+        audited, missed = relevance_filter.audit_stats()
+        mode = "shadow (log only)" if relevance_filter.shadow_mode() else "skipping"
+        print(f"[RELEVANCE] Audit: {missed}/{audited} below-threshold articles would have been accepted, {mode}")
+
+
+if __name__ == "__main__":
+    '''
+    How to run:
+    python -m insider_news.preprocessing_llm.relevance_filter --train --db db.sqlite
+    '''
+    main()
@@ -0,0 +1,307 @@
+from collections import deque
+
+from .llm_cache import get_model_name
+
+import asyncio
+import random
+import re
+import time
+
+
+# Latency assumed for an endpoint that has not answered yet, in seconds
+DEFAULT_LATENCY = 5.0
+# Weight of the newest sample in the latency moving average
+LATENCY_ALPHA = 0.3
+# Outcomes kept per endpoint to compute its error rate
+HEALTH_WINDOW = 20
+
+# Circuit breaker: consecutive failures that open the circuit, and how long it stays open
+FAILURE_THRESHOLD = 3
+ERROR_RATE_THRESHOLD = 0.5
+BASE_COOLDOWN = 15.0
+MAX_COOLDOWN = 300.0
+# Models the provider removed or does not serve stay out of rotation much longer
+UNAVAILABLE_COOLDOWN = 3600.0
+# Default wait on a 429 without any reset hint
+RATE_LIMIT_COOLDOWN = 30.0
+
+# Longest a request waits for an open circuit to close when every endpoint is open
+MAX_CIRCUIT_WAIT = 30.0
+
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+RETRY_IN = re.compile(r"try again in ((?:\d+(?:\.\d+)?(?:ms|h|m|s))+)", re.IGNORECASE)
+UNAVAILABLE = re.compile(r"decommissioned|does not exist|model_not_found|not supported", re.IGNORECASE)
+
+
+def parse_duration(text: str | None) -> float | None:
+    """
+    Parse provider reset durations such as '7.66s', '2m59.56s' or '450ms'.
+
+    Args:
+        text (str | None): Duration text or plain seconds.
+
+    Returns:
+        float | None: Seconds, or None if nothing could be parsed.
+    """
+    if not text:
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    parts = DURATION_PART.findall(str(text))
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(value) * scale[unit] for value, unit in parts)
+
+
+def rate_limit_reset(error: Exception) -> float:
+    """
+    Seconds until a rate-limited endpoint may be used again, from the response headers
+    (retry-after, x-ratelimit-reset-*) or the 'try again in ...' hint of the message.
+
+    Args:
+        error (Exception): The 429 error raised by the provider client.
+
+    Returns:
+        float: Seconds to wait.
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    candidates = [
+        parse_duration(headers.get(name))
+        for name in ("retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+    ]
+    match = RETRY_IN.search(str(error))
+    if match:
+        candidates.append(parse_duration(match.group(1)))
+    candidates = [c for c in candidates if c is not None]
+    return max(candidates) if candidates else RATE_LIMIT_COOLDOWN
+
+
+def status_code(error: Exception) -> int | None:
+    """HTTP status of a provider client error, None for other errors."""
+    code = getattr(error, "status_code", None)
+    if code is None:
+        code = getattr(getattr(error, "response", None), "status_code", None)
+    return code
+
+
+class EndpointHealth:
+    """
+    @brief Health of one (model, API key) endpoint: latency moving average, recent
+    error rate, in-flight requests and a circuit breaker.
+    """
+
+    def __init__(self, key_id: str, llm, limiter, fallback: bool = False):
+        """
+        @brief Creates the health record of an endpoint.
+        @param key_id Id of the API key the LLM uses.
+        @param llm The LangChain chat model.
+        @param limiter KeyLimiter shared by every model of the key.
+        @param fallback True for the paid endpoint only used when no other one is healthy.
+        """
+        self.key_id = key_id
+        self.llm = llm
+        self.limiter = limiter
+        self.fallback = fallback
+        self.name = f"{get_model_name(llm)}@{key_id}"
+        self.latency = None
+        self.outcomes = deque(maxlen=HEALTH_WINDOW)
+        self.failures = 0
+        self.opened_until = 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def available(self, now: float) -> bool:
+        """
+        @brief Whether the circuit is closed (or half-open: its cooldown has elapsed).
+        """
+        return now >= self.opened_until
+
+    def open(self, seconds: float, reason: str):
+        self.opened_until = max(self.opened_until, time.monotonic() + seconds)
+        print(f"[ROUTER] {self.name} out of rotation for {seconds:.0f}s ({reason})")
+
+    def record_success(self, latency: float):
+        self.latency = latency if self.latency is None else (
+            LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * self.latency
+        )
+        self.outcomes.append(True)
+        self.failures = 0
+        self.opened_until = 0.0
+
+    def record_failure(self, error: Exception | None = None):
+        """
+        @brief Records a failed call and opens the circuit when needed: immediately on a
+        429 (until the provider's reset time) or an unavailable model, otherwise after
+        FAILURE_THRESHOLD consecutive failures or a high error rate, with a cooldown
+        that doubles on every further failure.
+        @param error The exception raised, None for an unusable (e.g. incomplete) answer.
+        """
+        self.outcomes.append(False)
+        self.failures += 1
+        code = status_code(error) if error is not None else None
+
+        if code == 429:
+            self.open(rate_limit_reset(error), "rate limited")
+        elif error is not None and (code == 404 or UNAVAILABLE.search(str(error))):
+            self.open(UNAVAILABLE_COOLDOWN, "model unavailable")
+        elif self.failures >= FAILURE_THRESHOLD or (
+            len(self.outcomes) >= FAILURE_THRESHOLD and self.error_rate > ERROR_RATE_THRESHOLD
+        ):
+            cooldown = min(BASE_COOLDOWN * 2 ** max(0, self.failures - FAILURE_THRESHOLD), MAX_COOLDOWN)
+            self.open(cooldown, f"{self.failures} consecutive failures, error rate {self.error_rate:.0%}")
+
+    def cost(self, key_inflight: int, default_latency: float) -> float:
+        """
+        @brief Expected time to an answer: latency inflated by the load already on the
+        key and by the recent error rate, plus the wait for a rate-limit token.
+        @param key_inflight Requests in flight on the endpoint's API key.
+        @param default_latency Latency assumed when the endpoint has no sample yet.
+        @return Lower is better.
+        """
+        latency = self.latency if self.latency is not None else default_latency
+        bucket = self.limiter.bucket
+        bucket._refill()
+        token_wait = max(0.0, (1 - bucket.tokens) / bucket.rate)
+        load = 1 + key_inflight / self.limiter.max_concurrency
+        return latency * load * (1 + 2 * self.error_rate) + token_wait
+
+
+class LLMRouter:
+    """
+    @brief Sends each request to the endpoint expected to answer fastest among the
+    healthy ones, instead of walking a fixed fallback list.
+    Endpoints whose circuit is open (rate limited, unavailable model, repeated errors)
+    are skipped until their cooldown ends, so a degraded provider costs one failed call
+    rather than a timeout on every article. Load on each API key counts against its
+    endpoints, which spreads concurrent requests across keys. The last endpoint (the
+    paid fallback) is only used when no other endpoint is healthy.
+    All state lives on the shared LLM event loop, so no locking is needed.
+    """
+
+    def __init__(self, endpoints: list):
+        """
+        @brief Creates a router over endpoints.
+        @param endpoints (key_id, llm, KeyLimiter) tuples; the last one is the paid fallback.
+        """
+        self.endpoints = [
+            EndpointHealth(key_id, llm, limiter, fallback=(idx == len(endpoints) - 1 and len(endpoints) > 1))
+            for idx, (key_id, llm, limiter) in enumerate(endpoints)
+        ]
+        self._key_inflight = {}
+
+    def _default_latency(self) -> float:
+        known = sorted(e.latency for e in self.endpoints if e.latency is not None)
+        return known[len(known) // 2] if known else DEFAULT_LATENCY
+
+    def pick(self, tried: set) -> EndpointHealth | None:
+        """
+        @brief Chooses the cheapest available endpoint not tried yet for this request.
+        @param tried Names of the endpoints already tried.
+        @return The endpoint, or None if none is available right now.
+        """
+        now = time.monotonic()
+        candidates = [e for e in self.endpoints if e.name not in tried and e.available(now)]
+        if not candidates:
+            return None
+        primary = [e for e in candidates if not e.fallback]
+        candidates = primary or candidates
+
+        default_latency = self._default_latency()
+        # Random tie-break so that idle endpoints with the same cost share the load
+        return min(
+            candidates,
+            key=lambda e: (e.cost(self._key_inflight.get(e.key_id, 0), default_latency), random.random()),
+        )
+
+    def _next_reopen(self, tried: set) -> float | None:
+        pending = [e.opened_until for e in self.endpoints if e.name not in tried]
+        return min(pending) - time.monotonic() if pending else None
+
+    async def ainvoke(self, build_chain, inputs: dict, is_valid, label: str = "") -> tuple[dict | None, object]:
+        """
+        @brief Runs one request on the best endpoint, failing over to the next best
+        until an endpoint returns a valid answer or every endpoint was tried.
+        @param build_chain Function returning the compiled chain for an LLM.
+        @param inputs Chain inputs.
+        @param is_valid Function telling whether a parsed response is usable.
+        @param label Text identifying the request in the logs.
+        @return (response, llm) of the first valid answer, or (None, None).
+        """
+        tried = set()
+        while len(tried) < len(self.endpoints):
+            endpoint = self.pick(tried)
+            if endpoint is None:
+                wait = self._next_reopen(tried)
+                if wait is None or wait > MAX_CIRCUIT_WAIT:
+                    print(f"[ROUTER] No healthy endpoint for {label}")
+                    return None, None
+                await asyncio.sleep(max(wait, 0))
+                continue
+
+            tried.add(endpoint.name)
+            self._key_inflight[endpoint.key_id] = self._key_inflight.get(endpoint.key_id, 0) + 1
+            try:
+                async with endpoint.limiter:
+                    if not endpoint.available(time.monotonic()):
+                        # The circuit opened while this request waited for the key's limits
+                        tried.discard(endpoint.name)
+                        continue
+                    started = time.monotonic()
+                    response = await build_chain(endpoint.llm).ainvoke(inputs)
+                    elapsed = time.monotonic() - started
+            except Exception as error:
+                endpoint.record_failure(error)
+                print(f"[ROUTER] {endpoint.name} failed for {label}: {error}")
+                continue
+            finally:
+                self._key_inflight[endpoint.key_id] -= 1
+
+            if not is_valid(response):
+                endpoint.record_failure()
+                print(f"[ROUTER] {endpoint.name} returned an incomplete answer for {label}")
+                continue
+
+            endpoint.record_success(elapsed)
+            return response, endpoint.llm
+
+        return None, None
+
+    def report(self) -> list[dict]:
+        """
+        @brief Current health of every endpoint, for logging.
+        @return One dict per endpoint.
+        """
+        now = time.monotonic()
+        return [
+            {
+                "endpoint": e.name,
+                "latency": None if e.latency is None else round(e.latency, 2),
+                "error_rate": round(e.error_rate, 2),
+                "open_for": round(max(0.0, e.opened_until - now), 1),
+            }
+            for e in self.endpoints
+        ]
+
+
+_ROUTER = None
+
+
+def get_router() -> LLMRouter:
+    """
+    Get the process-wide router over the LLMCollection endpoints, so health is shared
+    by every scraper and engine.
+
+    Returns:
+        LLMRouter: The shared router.
+    """
+    global _ROUTER
+    if _ROUTER is None:
+        from .llms import LLMCollection
+
+        _ROUTER = LLMRouter(LLMCollection().get_endpoints())
+    return _ROUTER
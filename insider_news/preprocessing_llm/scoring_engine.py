@@ -3,12 +3,13 @@ from langchain_core.output_parsers  import JsonOutputParser
 from langchain.prompts              import PromptTemplate 
 from langchain_core.runnables       import RunnableParallel
 
-from .llms import LLMCollection
+from .llm_cache import get_llm_cache, get_model_name, hash_text
+from .rate_limit import run_coroutine
+from .router    import LLMRouter, get_router
+from .prompt_builder import fit_article, log_prompt_tokens, static_tokens
 
-import json 
+import asyncio
 from operator import itemgetter
-from datetime import datetime
-import time 
 
 
 CRITERIA = """Revised Scoring System: Indonesian Coal, Metal & Mineral Market Intelligence
@@ -85,106 +86,222 @@ CRITERIA = """Revised Scoring System: Indonesian Coal, Metal & Mineral Market In
         Example: "Published within the last 24 hours by a top-tier source, this article details PT Freeport Indonesia's new copper smelter achieving 70% completion, provides the specific capex spent, analyzes the impact on global copper supply and local employment, includes forward-looking statements from the CEO on production targets, and references the latest LME copper prices and the IDR's performance.
     """
 
-LLMCOLLECTION = LLMCollection()
+
+# Static instructions, criteria and output format come first and the article last, so
+# every call shares one long prompt prefix that providers can cache
+SCORING_TEMPLATE = """
+    You are an expert at scoring system for an industry mining article. 
+    Your task is to score each article based only on 'Criteria Scoring'.
+
+    Criteria Scoring: 
+    {criteria}
+
+    Ensure the scoring is generated in the following JSON format:
+    {format_instructions}
+
+    Article Title:
+    {article_title}
+
+    Article Content:
+    {article_content}
+    """
 
 
 class ScoringNews(BaseModel):
     news_score: int = Field(description="Scoring system of a news based only on provided criteria")
 
 
-def get_scoring_news(article_title: str,
-                        article_content: str, 
-                        criteria: str = CRITERIA) -> ScoringNews:
-    """ 
-    Scoring system for news articles based on specific criteria.
+# Define the output parser and prompt template once, they are the same for every article
+SCORING_PARSER = JsonOutputParser(pydantic_object=ScoringNews)
+SCORING_PROMPT = PromptTemplate(
+    template=SCORING_TEMPLATE, 
+    input_variables=[
+        "article_title",
+        "article_content",
+        "criteria"
+    ],
+    partial_variables={
+        "format_instructions": SCORING_PARSER.get_format_instructions()
+    },
+)
+# Create a runnable scoring system that prepares the input for the LLM
+RUNNABLE_SCORING_SYSTEM = RunnableParallel(
+    {   
+        "article_title": itemgetter("article_title"),
+        "article_content": itemgetter("article_content"),
+        "criteria": itemgetter("criteria"),
+    }
+)
+
+# Compiled scoring chains, keyed by id() of the LLM they wrap
+_SCORING_CHAINS = {}
+
+
+def get_scoring_chain(llm):
+    """
+    Build the scoring chain for an LLM on first use and reuse it afterwards.
+
+    Args:
+        llm: A LangChain chat model.
+
+    Returns:
+        Runnable: The scoring chain (inputs -> prompt -> llm -> JSON parser).
+    """
+    cached = _SCORING_CHAINS.get(id(llm))
+    if cached is None:
+        chain = (
+            RUNNABLE_SCORING_SYSTEM 
+            | SCORING_PROMPT
+            | llm
+            | SCORING_PARSER 
+        )
+        # Keep a reference to the llm so its id() is never reused
+        cached = (llm, chain)
+        _SCORING_CHAINS[id(llm)] = cached
+    return cached[1]
+
+
+def get_prompt_version(criteria: str = CRITERIA) -> str:
+    """
+    Version of the scoring prompt, used in the cache key. Editing the template,
+    the criteria or the output format yields a new version.
 
     Args:
-        article_title (str): Title of the article.
-        article_content (str): Content of the article.
-        article_date (str): Publish date of the article in 'YYYY-MM-DD' format.
         criteria (str): Scoring criteria to evaluate the article.
-    
+
     Returns:
-        ScoringNews: A Pydantic model containing the scoring result.
+        str: Hex digest identifying the prompt.
     """
-    scoring_template = """
-    You are an expert at scoring system for an industry mining article. 
-    Your task is to score each article based only on 'Criteria Scoring'.
+    return hash_text(SCORING_TEMPLATE, criteria, SCORING_PARSER.get_format_instructions())
 
-    Article Title:
-    {article_title}
 
-    Article Content:
-    {article_content}
+async def ascore_article(article: dict, 
+                         router: LLMRouter, 
+                         criteria: str = CRITERIA,
+                         cache=None) -> dict | None:
+    """
+    Score one article on the healthiest endpoint, failing over until one returns a usable score.
+    Each call waits for the per-key concurrency and rate limits instead of sleeping.
+    Bodies over the token budget are reduced to their most salient paragraphs.
+    A cached score for the same URL, content and prompt version is returned without any LLM call.
 
-    Criteria Scoring: 
-    {criteria}
+    Args:
+        article (dict): Article with 'title', 'content' and optionally 'source' keys.
+        router (LLMRouter): Router choosing the endpoint of each call.
+        criteria (str): Scoring criteria to evaluate the article.
+        cache (LLMCache): Persistent result cache, None to disable it.
 
-    Ensure the scoring is generated in the following JSON format:
-    {format_instructions}
+    Returns:
+        dict | None: The parsed ScoringNews response, or None if every endpoint failed.
     """
+    # Long bodies are cut down to their most salient paragraphs
+    content = fit_article(article.get('content'), criteria)
+    content_hash = hash_text(article.get('title'), content)
+    prompt_version = get_prompt_version(criteria)
+    if cache:
+        cached = cache.get('score', article.get('source'), content_hash, prompt_version)
+        if cached:
+            print(f'[CACHE] Scoring for url: {article.get("title")}')
+            return cached
 
-    # Define the output parser and prompt template
-    scoring_parser = JsonOutputParser(pydantic_object=ScoringNews)
-    scoring_prompt = PromptTemplate(
-        template=scoring_template, 
-        input_variables=[
-            "article_title",
-            "article_content",
-            "criteria"
-        ],
-        partial_variables={
-            "format_instructions": scoring_parser.get_format_instructions()
+    prefix_tokens = static_tokens(SCORING_TEMPLATE, criteria, SCORING_PARSER.get_format_instructions())
+    log_prompt_tokens('score', article.get('source') or article.get('title'),
+                      prefix_tokens, article.get('title'), content)
+    response_scoring, llm = await router.ainvoke(
+        get_scoring_chain,
+        {
+            'article_title': article.get('title'),
+            'article_content': content,
+            'criteria': criteria,
         },
+        lambda response: isinstance(response, dict) and bool(response.get('news_score')),
+        article.get('source') or article.get('title'),
     )
-    # Create a runnable scoring system that prepares the input for the LLM
-    runnable_scoring_system = RunnableParallel(
-        {   
-            "article_title": itemgetter("article_title"),
-            "article_content": itemgetter("article_content"),
-            "criteria": itemgetter("criteria"),
-        }
-    )
+    if response_scoring is None:
+        return None
+
+    print(f'[SUCCES] Scoring for url: {article.get("title")}')
+    if cache:
+        cache.set(
+            'score', article.get('source'), content_hash, prompt_version,
+            get_model_name(llm), response_scoring
+        )
+    return response_scoring
+
+
+async def ascore_articles(articles: list[dict], 
+                          criteria: str = CRITERIA,
+                          endpoints: list = None,
+                          use_cache: bool = True) -> list[dict | None]:
+    """
+    Score many articles concurrently, fanning out across every model and API key
+    of the LLMCollection within each key's concurrency and rate limits.
+
+    Args:
+        articles (list[dict]): Articles with 'title', 'content' and optionally 'source' keys.
+        criteria (str): Scoring criteria to evaluate the articles.
+        endpoints (list): (key_id, llm, KeyLimiter) tuples, routed by a dedicated LLMRouter.
+            Defaults to the shared router over the LLMCollection; pass fake LLMs here for testing.
+        use_cache (bool): Consult and fill the persistent LLM cache.
+
+    Returns:
+        list[dict | None]: One ScoringNews response per article, in input order
+            (None where every endpoint failed).
+    """
+    router = LLMRouter(endpoints) if endpoints else get_router()
+    cache = get_llm_cache() if use_cache else None
+    return await asyncio.gather(*(
+        ascore_article(article, router, criteria, cache)
+        for article in articles
+    ))
+
+
+def score_articles(articles: list[dict], 
+                   criteria: str = CRITERIA,
+                   endpoints: list = None,
+                   use_cache: bool = True) -> list[dict | None]:
+    """
+    Synchronous entry point of ascore_articles() for the scrapers, safe to call
+    from several scraper threads at once.
+
+    Args:
+        articles (list[dict]): Articles with 'title', 'content' and optionally 'source' keys.
+        criteria (str): Scoring criteria to evaluate the articles.
+        endpoints (list): (key_id, llm, KeyLimiter) tuples. Defaults to the LLMCollection.
+        use_cache (bool): Consult and fill the persistent LLM cache.
+
+    Returns:
+        list[dict | None]: One ScoringNews response per article, in input order.
+    """
+    if not articles:
+        return []
+    return run_coroutine(ascore_articles(articles, criteria, endpoints, use_cache))
 
-    for llm in LLMCOLLECTION.get_llms():
-        try:
-            # Define the scoring chain
-            scoring_chain = (
-                runnable_scoring_system 
-                | scoring_prompt
-                | llm
-                | scoring_parser 
-            )
-        
-            # Invoke the scoring chain with the provided article details
-            response_scoring = scoring_chain.invoke({
-                'article_title': article_title,
-                'article_content': article_content,
-                'criteria': criteria,
-            })
-            time.sleep(1)
-            
-            if not response_scoring.get('news_score'):
-                print('Scoring response not complete')
-                continue 
-
-            print(f'[SUCCES] Scoring for url: {article_title}')
-            return response_scoring
-            
-        except json.JSONDecodeError as error: 
-            print(f"Failed to parse JSON responsee {error}")
-            continue
-        
-        except Exception as error:
-            print(f"[Scoring] LLM failed with error: {error}")
-            continue 
+
+def get_scoring_news(article_title: str,
+                        article_content: str, 
+                        criteria: str = CRITERIA) -> ScoringNews:
+    """ 
+    Scoring system for news articles based on specific criteria.
+    Prefer score_articles() when scoring more than one article.
+
+    Args:
+        article_title (str): Title of the article.
+        article_content (str): Content of the article.
+        criteria (str): Scoring criteria to evaluate the article.
+    
+    Returns:
+        ScoringNews: A Pydantic model containing the scoring result.
+    """
+    return score_articles(
+        [{'title': article_title, 'content': article_content}], criteria
+    )[0]
 
 
 if __name__ == "__main__":
     # Example usage
     article_title = "PT Adaro Energy Announces New Coking Coal Mine Acquisition"
     article_content = "PT Adaro Energy has officially announced the acquisition of a new coking coal mine in East Kalimantan, which is expected to boost its production capacity significantly."
-    article_date = "2024-10-01"
 
-    scoring_result = get_scoring_news(article_title, article_content, article_date)
+    scoring_result = get_scoring_news(article_title, article_content)
     print(scoring_result)
\ No newline at end of file
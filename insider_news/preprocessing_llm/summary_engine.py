@@ -4,28 +4,18 @@ from langchain.prompts              import PromptTemplate
 from langchain_core.runnables       import RunnableParallel
 from operator                       import itemgetter
 
-from .llms import LLMCollection
+from .llm_cache import get_llm_cache, get_model_name, hash_text
+from .rate_limit import run_coroutine
+from .router    import get_router
+from .prompt_builder import fit_article, log_prompt_tokens, static_tokens
+from .scoring_engine import CRITERIA
 
-import json 
-import time 
 
-
-LLMCOLLECTION = LLMCollection()
-
-
-class SummaryNews(BaseModel):
-    title: str = Field(description="Title from an article")
-    body: str = Field(description="Two sentences summary from an article")
-
-
-def get_summary(article_content: str, article_url: str) -> str:
-    summarize_template = """
+# Instructions first and the article last, so that calls share a cacheable prompt prefix
+SUMMARIZE_TEMPLATE = """
         You are a mining expert journalism,  
         Your task is to generate summary based on the full article content.
 
-        Article Content:
-        {article}
-
         Note:
         - For the body: Provide a concise, maximum 2 sentences summary highlighting main points, key events, and mining metrics 
           (production volumes, capex, reserves, grades, shipments, smelter/plant status, permits, ESG incidents). 
@@ -33,56 +23,94 @@ def get_summary(article_content: str, article_url: str) -> str:
           
         Ensure to return the title and summary in the following JSON format.
         {format_instructions}
+
+        Article Content:
+        {article}
     """
 
-    # Define the output parser and prompt template
-    summary_parser = JsonOutputParser(pydantic_object=SummaryNews)
-    summary_prompt = PromptTemplate(
-        template=summarize_template, 
-        input_variables=[
-            "article",
-        ],
-        partial_variables={
-            "format_instructions": summary_parser.get_format_instructions()
-        },
-    )
-    # Create a runnable summary system that prepares the input for the LLM
-    runnable_summary_system = RunnableParallel(
-        {   
-            "article": itemgetter("article"),
-        }
-    )
 
-    for llm in LLMCOLLECTION.get_llms():
-        try:
-            # Define the summary chain
-            summary_chain = (
-                runnable_summary_system 
-                | summary_prompt
-                | llm
-                | summary_parser 
-            )
-        
-            # Invoke the scoring chain with the provided article details
-            summary_result = summary_chain.invoke({
-                'article': article_content,
-            })
-            time.sleep(3)
-
-            if not summary_result.get('title') or not summary_result.get('body'):
-                print('Summary response not complete')
-                continue 
-
-            print(f'[SUCCES] Summarize for url {article_url}')
-            return summary_result
-            
-        except json.JSONDecodeError as error: 
-            print(f"Failed to parse JSON responsee {error}")
-            continue
-        
-        except Exception as error:
-            print(f"[Summary] LLM failed with error: {error}")
-            continue 
-
-    
+class SummaryNews(BaseModel):
+    title: str = Field(description="Title from an article")
+    body: str = Field(description="Two sentences summary from an article")
+
+
+# Define the output parser and prompt template
+SUMMARY_PARSER = JsonOutputParser(pydantic_object=SummaryNews)
+SUMMARY_PROMPT = PromptTemplate(
+    template=SUMMARIZE_TEMPLATE, 
+    input_variables=[
+        "article",
+    ],
+    partial_variables={
+        "format_instructions": SUMMARY_PARSER.get_format_instructions()
+    },
+)
+RUNNABLE_SUMMARY_SYSTEM = RunnableParallel(
+    {
+        "article": itemgetter("article"),
+    }
+)
+# Editing the template or output format invalidates cached summaries
+SUMMARY_PROMPT_VERSION = hash_text(SUMMARIZE_TEMPLATE, SUMMARY_PARSER.get_format_instructions())
+
+# Compiled summary chains, keyed by id() of the LLM they wrap
+_SUMMARY_CHAINS = {}
+
+
+def get_summary_chain(llm):
+    """
+    Build the summary chain for an LLM on first use and reuse it afterwards.
+
+    Args:
+        llm: A LangChain chat model.
 
+    Returns:
+        Runnable: The summary chain (inputs -> prompt -> llm -> JSON parser).
+    """
+    cached = _SUMMARY_CHAINS.get(id(llm))
+    if cached is None:
+        chain = (
+            RUNNABLE_SUMMARY_SYSTEM
+            | SUMMARY_PROMPT
+            | llm
+            | SUMMARY_PARSER
+        )
+        # Keep a reference to the llm so its id() is never reused
+        cached = (llm, chain)
+        _SUMMARY_CHAINS[id(llm)] = cached
+    return cached[1]
+
+
+def get_summary(article_content: str, article_url: str, use_cache: bool = True) -> str:
+    # Reuse a summary of the same article content if we already have one
+    cache = get_llm_cache() if use_cache else None
+    # Long bodies are cut down to their most salient paragraphs
+    article_content = fit_article(article_content, CRITERIA)
+    content_hash = hash_text(article_content)
+    if cache:
+        cached = cache.get('summary', article_url, content_hash, SUMMARY_PROMPT_VERSION)
+        if cached:
+            print(f'[CACHE] Summarize for url {article_url}')
+            return cached
+
+    log_prompt_tokens(
+        'summary', article_url,
+        static_tokens(SUMMARIZE_TEMPLATE, SUMMARY_PARSER.get_format_instructions()), article_content
+    )
+    # The router picks the healthiest endpoint and fails over on errors or incomplete answers
+    summary_result, llm = run_coroutine(get_router().ainvoke(
+        get_summary_chain,
+        {'article': article_content},
+        lambda response: isinstance(response, dict) and bool(response.get('title')) and bool(response.get('body')),
+        article_url,
+    ))
+    if summary_result is None:
+        return None
+
+    print(f'[SUCCES] Summarize for url {article_url}')
+    if cache:
+        cache.set(
+            'summary', article_url, content_hash, SUMMARY_PROMPT_VERSION,
+            get_model_name(llm), summary_result
+        )
+    return summary_result
@@ -5,7 +5,7 @@ from insider_news.models.scrape_mining       import MiningScraper
 from insider_news.models.scrape_ima          import IMANewsScraper
 from insider_news.models.scrape_nikel        import NikelCoIdScraper
 from insider_news.models.scrape_ruang_energi import RuangEnergiScraper
-from insider_news.base_model.scraper         import ScraperCollection
+from insider_news.base_model.scraper         import ScraperCollection, load_known_sources
 
 import sqlite3
 import json
@@ -249,8 +249,9 @@ def scrape_and_insert_daily_news(num_pages: int, db_path: str, output_filename:
     scraper_collection.add_scraper(scraper_ima)
     scraper_collection.add_scraper(scraper_ruangenergi)
 
-    # Run scraper
-    article_lists = scraper_collection.run_all(num_pages)
+    # Run scraper, skipping articles already stored before any body fetch or LLM call
+    known_sources = load_known_sources(db_path)
+    article_lists = scraper_collection.run_all(num_pages, known_sources)
     LOGGER.info(f"Scraped {len(article_lists)} articles.")
     
     if output_filename:
@@ -281,7 +282,11 @@ def scrape_and_insert_coalmetal_news(limit_articles: int, db_path: str,
         initial_run: If True, will only keep top 15 articles based on score
         score_limit: Minimum score to filter articles from coalmetal.com
     """
-    df_articles_coalmetal = run_coalmetal_scraping(initial_run=initial_run, limit_articles=limit_articles)
+    df_articles_coalmetal = run_coalmetal_scraping(
+        initial_run=initial_run, 
+        limit_articles=limit_articles,
+        known_sources=load_known_sources(db_path)
+    )
     if df_articles_coalmetal.empty:
         LOGGER.info("No articles found from coalmetal.com")
         return pd.DataFrame()
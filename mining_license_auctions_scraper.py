@@ -1,9 +1,8 @@
 from seleniumwire                       import webdriver
-from selenium.webdriver.chrome.service  import Service
-from webdriver_manager.chrome           import ChromeDriverManager
 
 from scrapper.esdm_minerba  import COMMODITY_MAP
 from scripts.fuzzy_matcher import match_company_by_name
+from scripts.browser_pool  import create_driver
 
 import logging
 import requests
@@ -30,7 +29,7 @@ DB_PATH = 'db.sqlite'
 
 def get_wire_driver(is_headless: bool = True) -> webdriver.Chrome:
     """
-    Initializes a selenium-wire WebDriver.
+    Initializes a selenium-wire WebDriver, reusing the cached chromedriver binary.
 
     Args:
         is_headless (bool): If True, runs the browser in headless mode. Default is True.
@@ -38,15 +37,7 @@ def get_wire_driver(is_headless: bool = True) -> webdriver.Chrome:
     Returns:
         webdriver.Chrome: An instance of the Chrome WebDriver configured with selenium-wire.
     """
-    options = webdriver.ChromeOptions()
-    if is_headless:
-        options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-    return driver
+    return create_driver(is_headless, module=webdriver)
 
 def get_jwt_auth() -> dict[str]:
     """ 
@@ -0,0 +1,170 @@
+import functools
+import json
+import logging
+import os
+import re
+import threading
+
+import pandas as pd
+
+from scrapper.normalization import normalize_admin
+from sheet_api.db.models    import province_constraints
+
+# Persisted raw variant -> canonical region table, shared by the licence scrapers
+ADMIN_REGIONS_PATH = os.getenv("ADMIN_REGIONS_PATH", os.path.join("datasets", "admin_regions.json"))
+
+# Entries kept by the in-memory LRU in front of the table
+LOOKUP_CACHE_SIZE = 4096
+
+# Official or historical province names that differ from the model constraints (folded keys)
+PROVINCE_ALIASES = {
+    "dki jakarta": "Jakarta",
+    "daerah khusus ibukota jakarta": "Jakarta",
+    "jakarta raya": "Jakarta",
+    "di yogyakarta": "Yogyakarta",
+    "daerah istimewa yogyakarta": "Yogyakarta",
+    "nanggroe aceh darussalam": "Aceh",
+    "daerah istimewa aceh": "Aceh",
+    "bangka belitung": "Kepulauan Bangka Belitung",
+    "ntb": "Nusa Tenggara Barat",
+    "ntt": "Nusa Tenggara Timur",
+    "irian jaya": "Papua",
+    "irian jaya barat": "Papua Barat",
+}
+
+FOLD_RULES = (
+    (re.compile(r"[.\s]+"), " "),
+    (re.compile(r"^(?:provinsi|prov) "), ""),
+    (re.compile(r"\bkep\b"), "kepulauan"),
+    (re.compile(r"\bsumatra\b"), "sumatera"),
+)
+# 'Kab.Paser' would otherwise normalize to 'Kabupatenpaser'
+FUSED_ABBREVIATION = re.compile(r"\b(kab|prov)\.(?=[^\W\d_])", re.IGNORECASE)
+
+
+def fold_province(name: str) -> str:
+    """Lookup key of a province name: lowercase, no dots, no 'Provinsi' prefix."""
+    key = str(name).lower().strip()
+    for pattern, replacement in FOLD_RULES:
+        key = pattern.sub(replacement, key).strip()
+    return key
+
+
+PROVINCE_KEYS = {fold_province(p): p for p in province_constraints}
+PROVINCE_KEYS.update(PROVINCE_ALIASES)
+
+
+class AdminRegions:
+    """
+    Canonical province / kabupaten names by raw variant.
+
+    Lookups go through an LRU in front of a dictionary persisted in `path`, so a
+    variant is normalized and matched only the first time it is ever seen.
+    Provinces resolve to the `province_constraints` values of the models;
+    provinces that match none of them, and kabupaten names that were not in the
+    table yet, are flagged in `unknown` (kept in the file for review) and keep
+    their normalize_admin() form.
+    """
+
+    def __init__(self, path: str = ADMIN_REGIONS_PATH, cache_size: int = LOOKUP_CACHE_SIZE):
+        self.path = path
+        self.table = {"province": {}, "kabupaten": {}}
+        self.unknown = {"province": [], "kabupaten": []}
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    stored = json.load(f)
+                for kind in self.table:
+                    self.table[kind].update(stored.get(kind, {}))
+                    self.unknown[kind].extend(stored.get("unknown", {}).get(kind, []))
+            except (OSError, json.JSONDecodeError) as error:
+                logging.warning(f"Ignoring unreadable admin region table {path}: {error}")
+
+        self._known_kabupaten = set(self.table["kabupaten"].values())
+        self.province = functools.lru_cache(maxsize=cache_size)(functools.partial(self._lookup, "province"))
+        self.kabupaten = functools.lru_cache(maxsize=cache_size)(functools.partial(self._lookup, "kabupaten"))
+
+    def _resolve(self, kind: str, normalized: str) -> tuple[str, bool]:
+        """Canonical name of an already normalized variant, and whether it is known."""
+        if kind == "province":
+            canonical = PROVINCE_KEYS.get(fold_province(normalized))
+            return (canonical, True) if canonical else (normalized, False)
+        return normalized, not self._known_kabupaten or normalized in self._known_kabupaten
+
+    def _learn(self, kind: str, raws: list):
+        """Normalize and resolve variants missing from the table in one vectorized pass."""
+        prepared = [FUSED_ABBREVIATION.sub(r"\1. ", raw) for raw in raws]
+        with self._lock:
+            for raw, normalized in zip(raws, normalize_admin(prepared)):
+                if raw in self.table[kind]:
+                    continue
+                canonical, known = self._resolve(kind, normalized)
+                self.table[kind][raw] = canonical
+                self._dirty = True
+                if not known and raw not in self.unknown[kind]:
+                    self.unknown[kind].append(raw)
+                    logging.warning(f"Unknown {kind} variant {raw!r} (kept as {canonical!r})")
+
+    def _lookup(self, kind: str, raw) -> str:
+        if raw is None or pd.isna(raw):
+            return ""
+        raw = str(raw)
+        if raw not in self.table[kind]:
+            self._learn(kind, [raw])
+        return self.table[kind][raw]
+
+    def canonicalize(self, kind: str, values) -> pd.Series:
+        """
+        Canonical names for a whole column.
+
+        Args:
+            kind (str): 'province' or 'kabupaten'.
+            values (array-like): Raw names.
+
+        Returns:
+            pd.Series: Canonical names aligned with `values`, '' for missing values.
+        """
+        values = pd.Series(values)
+        codes, uniques = pd.factorize(values)
+        uniques = [str(u) for u in uniques]
+
+        missing = [u for u in uniques if u not in self.table[kind]]
+        if missing:
+            self._learn(kind, missing)
+
+        lookup = self.province if kind == "province" else self.kabupaten
+        mapped = pd.Series([lookup(u) for u in uniques] + [""], dtype=object)
+        # factorize codes missing values as -1, which picks the trailing ''
+        return pd.Series(mapped.to_numpy()[codes], index=values.index)
+
+    def save(self):
+        """Persist the table if new variants were learned (atomic write)."""
+        with self._lock:
+            if not self._dirty or not self.path:
+                return
+            payload = {**self.table, "unknown": self.unknown}
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+        flagged = sum(len(v) for v in self.unknown.values())
+        logging.info(f"Saved admin region table to {self.path} ({flagged} unknown variants flagged)")
+
+
+_REGIONS = None
+_REGIONS_LOCK = threading.Lock()
+
+
+def get_admin_regions() -> AdminRegions:
+    """Process-wide AdminRegions loaded from ADMIN_REGIONS_PATH on first use."""
+    global _REGIONS
+    with _REGIONS_LOCK:
+        if _REGIONS is None:
+            _REGIONS = AdminRegions()
+        return _REGIONS
@@ -5,8 +5,15 @@ import time
 import random
 import logging
 import argparse
+import hashlib
+import importlib.util
+import io
+import os
 import sys
-import re
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from scrapper.normalization import clean_text, invalid_rows, normalize_admin, normalize_location
 
 # Configure logging with timestamp
 logging.basicConfig(
@@ -15,7 +22,7 @@ logging.basicConfig(
     datefmt="%Y-%m-%d %H:%M:%S",
 )
 
-BASE_URL = (
+BASE_URL = os.getenv("ESDM_WIUP_URL") or (
     "https://geoportal.esdm.go.id/monaresia/sharing/servers/"
     "48852a855c014a63acfd78bf06c2689a/rest/services/Pusat/WIUP_Publish/MapServer/0/query"
 )
@@ -42,6 +49,26 @@ DEFAULT_PARAMS = {
     "resultRecordCount": 90,
 }
 
+# Concurrent page downloads, and where finished pages are kept until a scrape completes
+DEFAULT_WORKERS = int(os.getenv("ESDM_WORKERS", "4"))
+CHECKPOINT_DIR = os.path.join("datasets", ".esdm_checkpoint")
+
+# Incremental refresh: fields that may carry ArcGIS editor tracking, page size of the
+# attributes-only scan, and the delta sanity limits
+EDIT_DATE_FIELDS = ("last_edited_date", "editdate", "tgl_update", "updated_at")
+ATTRIBUTE_PAGE_SIZE = 1000
+MAX_DELETED_FRACTION = 0.05
+MAX_CHANGED_FRACTION = 0.5
+# Minimum size of a full dataset before it may replace the existing CSV
+MIN_ROWS = 3500
+
+# ArcGIS date fields, delivered as epoch milliseconds
+DATE_COLUMNS = ["tgl_berlaku", "tgl_akhir"]
+# Cell values cleanse_df treats as missing (after the str cast, so None/NaN included)
+PLACEHOLDERS = ("", "-", "nan", "None")
+# Coordinates are requested in Web Mercator (outSR above)
+DATASET_CRS = "EPSG:3857"
+
 tasks = {
     "nickel": "LOWER(komoditas) LIKE '%nikel%'",
     "gold": "LOWER(komoditas) LIKE '%emas%'",
@@ -155,25 +182,38 @@ COMMODITY_MAP = {
 }
 
 
-def construct_url_and_params(extra_filters: dict):
+def construct_url_and_params(extra_filters: dict, base_url: str = None):
     params = DEFAULT_PARAMS.copy()
     params.update(extra_filters)
-    return BASE_URL, params
+    return base_url or BASE_URL, params
 
 
-def fetch_page(url: str, params: dict, max_retries: int = 10) -> dict:
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """Exponential backoff with full jitter for retry `attempt` (1-based)."""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+def fetch_page(
+    url: str, params: dict, max_retries: int = 10, expect: str = "features", label: str = None
+) -> dict:
+    label = label or f"offset={params.get('resultOffset')}"
     for attempt in range(1, max_retries + 1):
         try:
             logging.info(
-                f"Requesting offset={params.get('resultOffset')} (Attempt {attempt}/{max_retries})"
+                f"Requesting {label} (Attempt {attempt}/{max_retries})"
             )
-            response = requests.get(url, params=params, timeout=15, headers={
+            # POST keeps long objectIds lists out of the URL, where proxies cap the length
+            response = requests.post(url, data=params, timeout=15, headers={
                 "Referer": "https://geoportal.esdm.go.id/minerba/"
                 })
             response.raise_for_status()
             data = response.json()
+            # ArcGIS answers an invalid query with HTTP 200 and an error body; retrying cannot fix it
+            if isinstance(data, dict) and (data.get("error") or {}).get("code") == 400:
+                logging.error(f"Query rejected for {label}: {data['error'].get('message')}")
+                return {}
             # early check for broken base URL response
-            if not isinstance(data, dict) or "features" not in data:
+            if not isinstance(data, dict) or expect not in data:
                 raise ValueError(
                     "Unexpected response structure, possible broken URL or service down."
                 )
@@ -181,44 +221,164 @@ def fetch_page(url: str, params: dict, max_retries: int = 10) -> dict:
         except (requests.RequestException, json.JSONDecodeError, ValueError) as e:
             logging.warning(f"Failed on attempt {attempt}: {e}")
             if attempt < max_retries:
-                sleep_time = random.uniform(1, 3)
+                sleep_time = backoff_delay(attempt)
                 logging.info(f"Sleeping {sleep_time:.2f}s before retry")
                 time.sleep(sleep_time)
             else:
                 logging.error(
-                    f"Max retries reached for offset {params.get('resultOffset')}. Skipping further requests."
+                    f"Max retries reached for {label}, giving up on it."
                 )
                 return {}
 
 
-def scrape(where_clause: str = None) -> pd.DataFrame:
-    frames = []
-    offset = 0
+def features_to_records(page: dict) -> list:
+    records = []
+    for feat in page.get("features", []):
+        attr = feat.get("attributes", {})
+        geom = (feat.get("geometry") or {}).get("rings")
+        attr["geometry"] = geom
+        records.append(attr)
+    return records
+
+
+def fetch_object_ids(where_clause: str = None, base_url: str = None) -> list:
+    """Object IDs matching the query, sorted ascending (one request, no geometry)."""
+    extra = {"returnIdsOnly": "true", "returnGeometry": "false"}
+    extra["where"] = where_clause or "1=1"
+    url, params = construct_url_and_params(extra, base_url)
+    params.pop("resultRecordCount", None)
+    params.pop("orderByFields", None)
+
+    data = fetch_page(url, params, expect="objectIds", label="object ID list")
+    if not data:
+        raise RuntimeError("Could not fetch the object ID list")
+    return sorted(data.get("objectIds") or [])
+
+
+class PageCheckpoint:
+    """
+    Completed pages of one scrape, saved as JSON files under `directory`.
+    The manifest pins the query and its object IDs, so a rerun of the same
+    query only fetches the pages that are still missing.
+    """
+
+    def __init__(self, directory: str, where_clause: str, object_ids: list):
+        self.directory = directory
+        manifest = {"where": where_clause, "object_ids": object_ids}
+        manifest_path = os.path.join(directory, "manifest.json")
+
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                if json.load(f) != manifest:
+                    logging.info("Checkpoint is for another query or ID list, starting over")
+                    self.clear()
 
-    while True:
-        extra = {"resultOffset": offset}
-        if where_clause:
-            extra["where"] = where_clause
+        os.makedirs(directory, exist_ok=True)
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
 
-        url, params = construct_url_and_params(extra)
-        page = fetch_page(url, params)
+    def _path(self, page_no: int) -> str:
+        return os.path.join(self.directory, f"page_{page_no:05d}.json")
 
-        if not page or "features" not in page or not page["features"]:
-            logging.info(f"No more data at offset={offset}. Ending scrape.")
-            break
+    def load(self, page_no: int):
+        path = self._path(page_no)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            return None
+
+    def save(self, page_no: int, records: list):
+        # Write then rename, so a crash never leaves a half-written page behind
+        tmp_path = self._path(page_no) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(records, f)
+        os.replace(tmp_path, self._path(page_no))
+
+    def clear(self):
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                os.remove(os.path.join(self.directory, name))
+            os.rmdir(self.directory)
+
+
+def fetch_features(
+    object_ids: list,
+    where_clause: str = None,
+    workers: int = DEFAULT_WORKERS,
+    checkpoint_dir: str = None,
+    base_url: str = None,
+    with_geometry: bool = True,
+    page_size: int = None,
+) -> list:
+    """
+    Download the features with the given object IDs as records.
+
+    Pages of `page_size` IDs are downloaded concurrently by `workers` threads.
+    Completed pages are saved in `checkpoint_dir`, so a failed run resumes where
+    it stopped; the checkpoint is removed once every page is in. Raises
+    RuntimeError if pages are still missing after all retries.
+    """
+    page_size = page_size or DEFAULT_PARAMS["resultRecordCount"]
+    pages = [object_ids[i:i + page_size] for i in range(0, len(object_ids), page_size)]
+    logging.info(f"{len(object_ids)} features to fetch in {len(pages)} pages with {workers} workers")
 
-        records = []
-        for feat in page["features"]:
-            attr = feat.get("attributes", {})
-            geom = feat.get("geometry", {}).get("rings")
-            attr["geometry"] = geom
-            records.append(attr)
+    checkpoint = PageCheckpoint(checkpoint_dir, where_clause, object_ids) if checkpoint_dir else None
+    results = {}
+    if checkpoint:
+        for page_no in range(len(pages)):
+            records = checkpoint.load(page_no)
+            if records is not None:
+                results[page_no] = records
+        if results:
+            logging.info(f"Resuming: {len(results)}/{len(pages)} pages already fetched")
 
-        logging.info(f"Fetched {len(records)} records for offset={offset}")
-        frames.append(pd.DataFrame(records))
-        offset += DEFAULT_PARAMS["resultRecordCount"]
+    def fetch(page_no: int):
+        extra = {"objectIds": ",".join(str(i) for i in pages[page_no])}
+        if not with_geometry:
+            extra["returnGeometry"] = "false"
+        url, params = construct_url_and_params(extra, base_url)
+        params.pop("resultRecordCount", None)
+        page = fetch_page(url, params, label=f"page {page_no + 1}/{len(pages)}")
+        if not page:
+            return page_no, None
+        records = features_to_records(page)
+        if checkpoint:
+            checkpoint.save(page_no, records)
+        return page_no, records
 
-    result_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    pending = [page_no for page_no in range(len(pages)) if page_no not in results]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for page_no, records in executor.map(fetch, pending):
+            if records is None:
+                continue
+            results[page_no] = records
+            logging.info(f"Fetched {len(records)} records for page {page_no + 1}/{len(pages)}")
+
+    missing = len(pages) - len(results)
+    if missing:
+        raise RuntimeError(f"{missing} page(s) failed, rerun to resume from the checkpoint")
+
+    if checkpoint:
+        checkpoint.clear()
+    return [record for page_no in sorted(results) for record in results[page_no]]
+
+
+def scrape(
+    where_clause: str = None,
+    workers: int = DEFAULT_WORKERS,
+    checkpoint_dir: str = None,
+    base_url: str = None,
+) -> pd.DataFrame:
+    """
+    Download every feature matching `where_clause`: the object IDs are listed
+    first, then fetched with fetch_features().
+    """
+    object_ids = fetch_object_ids(where_clause, base_url)
+    records = fetch_features(object_ids, where_clause, workers, checkpoint_dir, base_url)
+    result_df = pd.DataFrame(records)
     logging.info(f"Total records scraped: {len(result_df)}")
     return result_df
 
@@ -231,103 +391,18 @@ def cleanse_df(df: pd.DataFrame) -> pd.DataFrame:
     - Removing embedded newlines in string fields
     - Standardizing 'komoditas' to mapped categories (fillna with 'Others')
     - Dropping rows where 'tgl_berlaku' equals 'tgl_akhir'
-    - Normalizing administrative names and locations
+    - Normalizing administrative names and locations (provinces and kabupaten through
+      the canonical admin region table, see scrapper/admin_regions.py)
     """
     exemptions = {"generasi", "kode_wil", "cnc", "lokasi"}
 
-    # Internal helper: normalize province or city names
-    def normalize_admin(name: str) -> str:
-        if pd.isna(name):
-            return ""
-        parts = [part.strip() for part in str(name).split(",") if part.strip()]
-        cleaned = []
-        for part in parts:
-            s = part
-            # expand abbreviations
-            exp = {
-                r"\bkab\.?\b": "kabupaten",
-                r"\bprov\.?\b": "provinsi",
-                r"\bkota\b": "kota",
-            }
-            for pat, sub in exp.items():
-                s = re.sub(pat, sub, s, flags=re.IGNORECASE)
-            # remove dots & collapse spaces
-            s = s.replace(".", "")
-            s = re.sub(r"\s{2,}", " ", s).strip()
-
-            # title-case words (except 'dan')
-            def _tc(w):
-                return w.lower() if w.lower() == "dan" else w.capitalize()
-
-            s = " ".join(_tc(w) for w in s.split())
-            cleaned.append(s)
-        return ", ".join(cleaned)
-
-    # Internal helper: normalize free-form location strings
-    def normalize_location(row) -> str:
-        raw = str(row.get("lokasi", "")).strip()
-        raw = re.sub(r"^[\.\s]+", "", raw)
-        # DIGIT-ONLY → fallback to kab/prov
-        if raw.isdigit():
-            return (
-                f"{row.get('nama_kab', '').title()}, {row.get('nama_prov', '').title()}"
-            )
-        # URLs → fallback
-        if re.search(r"https?://|goo\.gl/", raw, flags=re.IGNORECASE):
-            return f"{row.get('nama_kab', '')}, {row.get('nama_prov', '')}"
-        loc = raw
-        loc = re.sub(r"\bdesa/kelurahan\b", "Desa/Kelurahan", loc, flags=re.IGNORECASE)
-        # Expand Ds or Ds.
-        loc = re.sub(r"\bds\.?\b", "desa ", loc, flags=re.IGNORECASE)
-        # Ensure Jl. and No.
-        loc = re.sub(r"\bJl\.?\b", "Jl.", loc)
-        loc = re.sub(r"\bNo\.?\b", "No.", loc)
-        # Uppercase RT/RW
-        loc = re.sub(r"\bRt\b", "RT", loc, flags=re.IGNORECASE)
-        loc = re.sub(r"\bRw\b", "RW", loc, flags=re.IGNORECASE)
-        # Other expansions
-        expansions = {
-            r"\bkec\.?\s*": "kecamatan ",
-            r"\bkab\.?\s*": "kabupaten ",
-            r"\bprov\.?\s*": "provinsi ",
-            r"\bkel\.?\s*": "kelurahan ",
-            r"\bdesa/kel\.?\s*": "desa/kelurahan ",
-        }
-        for pat, sub in expansions.items():
-            loc = re.sub(pat, sub, loc, flags=re.IGNORECASE)
-        # Fix fused words
-        loc = re.sub(
-            r"(?i)(kecamatan|kabupaten|provinsi|kelurahan)([A-Za-z])",
-            lambda m: m.group(1) + " " + m.group(2),
-            loc,
-        )
-        # Normalize spacing
-        loc = re.sub(r"\s{2,}", " ", loc)
-        loc = re.sub(r"\s*,\s*", ", ", loc).strip(" ,")
-
-        def tc(w):
-            return w.lower() if w.lower() == "dan" else w.capitalize()
-
-        parts = [p.strip() for p in loc.split(",") if p.strip()]
-        cleaned = [" ".join(tc(w) for w in part.split()) for part in parts]
-        return ", ".join(cleaned)
-
     # 1) Trim and remove newlines in string fields
     for col in df.columns:
         if df[col].dtype == object:
-            df[col] = df[col].astype(str).str.strip()
-            df[col] = df[col].str.replace(r"[\r\n]+", " ", regex=True)
+            df[col] = clean_text(df[col])
     # 2) Filter invalid rows
-    valid = pd.Series(True, index=df.index)
-    for col in df.columns:
-        if col in exemptions:
-            continue
-        if df[col].dtype == object:
-            invalid = df[col].isin(["", "-", None, "nan", "None"])
-            valid &= ~invalid
-        else:
-            valid &= df[col].notnull()
-    df = df[valid]
+    checked = [col for col in df.columns if col not in exemptions]
+    df = df[~invalid_rows(df, checked, PLACEHOLDERS, strip=False)]
     # 3) Drop identical dates
     if "tgl_berlaku" in df.columns and "tgl_akhir" in df.columns:
         df = df[df["tgl_berlaku"] != df["tgl_akhir"]]
@@ -335,44 +410,364 @@ def cleanse_df(df: pd.DataFrame) -> pd.DataFrame:
     if "komoditas" in df.columns:
         cleaned = df["komoditas"].str.upper().str.replace(r"\s+DMP$", "", regex=True)
         df["komoditas_mapped"] = cleaned.map(COMMODITY_MAP).fillna("Others")
-    # 5) Normalize administrative names if present
-    if "nama_prov" in df.columns:
-        df["provinsi_norm"] = df["nama_prov"].apply(normalize_admin)
-    if "nama_kab" in df.columns:
-        df["kabupaten_norm"] = df["nama_kab"].apply(normalize_admin)
+    # 5) Canonical administrative names if present
+    if "nama_prov" in df.columns or "nama_kab" in df.columns:
+        from scrapper.admin_regions import get_admin_regions
+
+        regions = get_admin_regions()
+        if "nama_prov" in df.columns:
+            df["provinsi_norm"] = regions.canonicalize("province", df["nama_prov"])
+        if "nama_kab" in df.columns:
+            df["kabupaten_norm"] = regions.canonicalize("kabupaten", df["nama_kab"])
     if "kegiatan" in df.columns:
-        df["kegiatan_norm"] = df["kegiatan"].apply(normalize_admin)
+        df["kegiatan_norm"] = normalize_admin(df["kegiatan"])
     # 6) Normalize free-form locations
     if "lokasi" in df.columns:
-        df["lokasi_norm"] = df.apply(normalize_location, axis=1)
+        df["lokasi_norm"] = normalize_location(df["lokasi"], df.get("nama_kab"), df.get("nama_prov"))
+    return df
+
+
+def state_path(csv_path: str) -> str:
+    """Path of the incremental-refresh watermark file written next to a scraper CSV."""
+    return os.path.splitext(csv_path)[0] + ".state.json"
+
+
+def hash_attributes(record: dict) -> str:
+    """Stable hash of a feature's attributes (geometry excluded)."""
+    attributes = {k: v for k, v in record.items() if k != "geometry"}
+    payload = json.dumps(attributes, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def find_edit_field(columns) -> str | None:
+    """The layer's last-edit date field, if it has one."""
+    lowered = {c.lower(): c for c in columns}
+    return next((lowered[f] for f in EDIT_DATE_FIELDS if f in lowered), None)
+
+
+def build_state(records: list, previous: dict = None) -> dict:
+    """
+    Watermark of the dataset after a refresh: max objectid, max last-edit date
+    (if the layer tracks edits) and one attribute hash per objectid.
+    `records` are the raw features fetched in this run, merged over `previous`.
+    """
+    state = {"max_objectid": 0, "edit_field": None, "max_edit_date": None, "hashes": {}}
+    if previous:
+        state.update({k: previous[k] for k in state if k in previous})
+        state["hashes"] = dict(previous.get("hashes", {}))
+
+    if records:
+        state["edit_field"] = state["edit_field"] or find_edit_field(records[0].keys())
+    for record in records:
+        state["hashes"][str(record["objectid"])] = hash_attributes(record)
+
+    object_ids = [int(i) for i in state["hashes"]]
+    state["max_objectid"] = max(object_ids, default=0)
+
+    edit_field = state["edit_field"]
+    if edit_field:
+        dates = [r.get(edit_field) for r in records if r.get(edit_field) is not None]
+        state["max_edit_date"] = max([*dates, state["max_edit_date"] or 0]) or None
+    return state
+
+
+def load_state(path: str) -> dict | None:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(path: str, state: dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(state, f, separators=(",", ":"), sort_keys=True)
+
+
+def read_csv_as_text(source) -> pd.DataFrame:
+    """Read a scraper CSV keeping every cell as written, so a rewrite is byte-stable."""
+    df = pd.read_csv(source, index_col=0, dtype=str, keep_default_na=False, na_values=[""])
+    df.index = df.index.astype(int)
+    return df
+
+
+def arcgis_timestamp(epoch_ms) -> str:
+    """
+    ArcGIS standardized-query literal of an epoch-ms date, e.g. TIMESTAMP '2024-05-01 08:30:00'.
+    Date fields cannot be compared to a bare epoch number in a `where` clause. Seconds
+    are floored, so callers compare with >= to keep edits made within the same second.
+    """
+    moment = datetime.fromtimestamp(int(epoch_ms) // 1000, tz=timezone.utc)
+    return f"TIMESTAMP '{moment.strftime('%Y-%m-%d %H:%M:%S')}'"
+
+
+def check_delta(total: int, new: int, changed: int, deleted: int):
+    """
+    Delta sanity check: refuse a refresh that would delete or rewrite too much
+    of the dataset at once, which points at a broken or partial response.
+    """
+    if total and deleted > MAX_DELETED_FRACTION * total:
+        raise ValueError(
+            f"Delta check failed: {deleted}/{total} licences would be deleted "
+            f"(limit {MAX_DELETED_FRACTION:.0%})"
+        )
+    if total and changed > MAX_CHANGED_FRACTION * total:
+        raise ValueError(
+            f"Delta check failed: {changed}/{total} licences changed "
+            f"(limit {MAX_CHANGED_FRACTION:.0%}); run a full scrape instead."
+        )
+    logging.info(f"Delta: {new} new, {changed} changed, {deleted} deleted out of {total}")
+
+
+def scrape_incremental(
+    where_clause: str,
+    csv_path: str,
+    workers: int = DEFAULT_WORKERS,
+    checkpoint_dir: str = None,
+    base_url: str = None,
+) -> tuple[pd.DataFrame, dict] | None:
+    """
+    Refresh an existing dataset by fetching only new and changed licences.
+
+    New and deleted licences come from the object ID list. Changed ones come from
+    the last-edit date field when the layer has one, otherwise from comparing
+    attribute hashes of an attributes-only scan (no geometry). Only new and
+    changed features are downloaded with geometry, cleansed and merged into the
+    existing CSV rows.
+
+    Returns:
+        (merged text DataFrame, new state), or None when there is no usable
+        state yet and a full scrape is needed. Raises ValueError if the delta
+        check fails.
+    """
+    state = load_state(state_path(csv_path))
+    if not state or not os.path.exists(csv_path):
+        logging.info("No watermark yet, a full scrape is needed")
+        return None
+
+    known = {int(i) for i in state["hashes"]}
+    object_ids = fetch_object_ids(where_clause, base_url)
+    if not object_ids:
+        raise ValueError("Delta check failed: the layer returned no object IDs")
+
+    current = set(object_ids)
+    new_ids = sorted(current - known)
+    deleted_ids = sorted(known - current)
+
+    def hash_scan() -> list:
+        # Attributes-only scan of the known licences, compared against their stored hashes
+        scanned = fetch_features(
+            sorted(current & known), where_clause, workers, None, base_url,
+            with_geometry=False, page_size=ATTRIBUTE_PAGE_SIZE,
+        )
+        return sorted(
+            r["objectid"] for r in scanned
+            if state["hashes"].get(str(r["objectid"])) != hash_attributes(r)
+        )
+
+    edit_field = state.get("edit_field")
+    changed_ids = None
+    if edit_field and state.get("max_edit_date"):
+        # Editor tracking: ask the server which known licences were edited since the watermark
+        edited = f"{edit_field} >= {arcgis_timestamp(state['max_edit_date'])}"
+        where = f"({where_clause}) AND {edited}" if where_clause else edited
+        try:
+            changed_ids = sorted(set(fetch_object_ids(where, base_url)) & known)
+        except RuntimeError as e:
+            logging.warning(f"Edited-since query failed ({e}), comparing attribute hashes instead")
+    if changed_ids is None:
+        changed_ids = hash_scan()
+
+    check_delta(len(known), len(new_ids), len(changed_ids), len(deleted_ids))
+
+    records = fetch_features(new_ids + changed_ids, where_clause, workers, checkpoint_dir, base_url)
+    new_state = build_state(records, state)
+    for object_id in deleted_ids:
+        new_state["hashes"].pop(str(object_id), None)
+
+    existing = read_csv_as_text(csv_path)
+    stale = {str(i) for i in deleted_ids + changed_ids}
+    existing = existing[~existing["objectid"].isin(stale)]
+
+    if records:
+        # cleanse_df is row-wise, so cleansing only the delta equals cleansing everything
+        fresh = cleanse_df(pd.DataFrame(records))
+        start = int(existing.index.max()) + 1 if len(existing) else 0
+        fresh.index = range(start, start + len(fresh))
+        buffer = io.StringIO()
+        fresh.to_csv(buffer, index=True)
+        buffer.seek(0)
+        existing = pd.concat([existing, read_csv_as_text(buffer)])
+
+    # Re-resolve kept rows too, so the whole file follows the current admin region table
+    from scrapper.admin_regions import get_admin_regions
+
+    regions = get_admin_regions()
+    if "nama_prov" in existing.columns and "provinsi_norm" in existing.columns:
+        existing["provinsi_norm"] = regions.canonicalize("province", existing["nama_prov"]).to_numpy()
+    if "nama_kab" in existing.columns and "kabupaten_norm" in existing.columns:
+        existing["kabupaten_norm"] = regions.canonicalize("kabupaten", existing["nama_kab"]).to_numpy()
+
+    merged = existing.sort_values("objectid", key=lambda ids: pd.to_numeric(ids))
+    return merged, new_state
+
+
+def parquet_path(csv_path: str) -> str:
+    """Path of the GeoParquet dataset written next to a scraper CSV."""
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def typed_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Dtypes shared by every reader of the dataset: ArcGIS epoch-ms dates as
+    datetime, text columns as string. 'geometry' is left untouched.
+    """
+    typed = df.drop(columns=["geometry"], errors="ignore")
+    for col in DATE_COLUMNS:
+        if col in typed.columns:
+            typed[col] = pd.to_datetime(pd.to_numeric(typed[col], errors="coerce"), unit="ms")
+    typed = typed.convert_dtypes(convert_integer=False, convert_floating=False, convert_boolean=False)
+    if "geometry" in df.columns:
+        typed["geometry"] = df["geometry"]
+    return typed[list(df.columns)]
+
+
+def write_geoparquet(df: pd.DataFrame, path: str) -> bool:
+    """
+    Write the cleansed dataset as GeoParquet: WKB polygon geometry, datetime
+    dates, numeric and string dtypes, zstd compressed.
+    Needs geopandas and pyarrow; without them only the CSV is written.
+    """
+    try:
+        import geopandas as gpd
+        from sheet_api.geometry import polygons_from_rings
+    except ImportError as e:
+        logging.warning(f"GeoParquet output skipped, missing dependency: {e}")
+        return False
+
+    typed = typed_columns(df.drop(columns=["geometry"]))
+
+    # Keep the rings exactly as scraped; readers repair invalid polygons themselves
+    geometry = polygons_from_rings(df["geometry"], repair=False)
+    gdf = gpd.GeoDataFrame(typed, geometry=gpd.GeoSeries(geometry, index=df.index), crs=DATASET_CRS)
+    # Same column order as the CSV
+    gdf = gdf[list(df.columns)]
+    gdf.to_parquet(path, compression="zstd", index=True)
+    return True
+
+
+def read_wiup_dataset(csv_path: str, as_rings: bool = False, source: str | None = None) -> pd.DataFrame:
+    """
+    Load a WIUP dataset from the scraper CSV or the GeoParquet file next to it.
+    Both sources give the same index, columns and dtypes (see typed_columns()).
+
+    Args:
+        csv_path: Path of the scraper CSV, e.g. datasets/esdm_minerba_all.csv.
+        as_rings: Return 'geometry' as the CSV's JSON ring strings instead of shapely polygons.
+        source: "parquet" or "csv". Defaults to the GeoParquet file when it exists
+            and geopandas/pyarrow are installed, otherwise the CSV.
+
+    Returns:
+        A GeoDataFrame with shapely 'geometry', or with `as_rings` a DataFrame
+        with 'geometry' as ring strings.
+    """
+    pq_path = parquet_path(csv_path)
+    if source is None:
+        readable = all(importlib.util.find_spec(name) for name in ("geopandas", "pyarrow"))
+        source = "parquet" if readable and os.path.exists(pq_path) else "csv"
+    if source not in ("parquet", "csv"):
+        raise ValueError(f"Unknown WIUP dataset source: {source}")
+
+    if source == "csv":
+        df = typed_columns(pd.read_csv(csv_path, index_col=0))
+        logging.info(f"Loaded {len(df)} rows from {csv_path}")
+        if as_rings:
+            return df
+
+        import geopandas as gpd
+        from sheet_api.geometry import polygons_from_rings
+        from sheet_api.spatial_index import load_cached_geometries
+
+        # Parsing the JSON rings is slow, reuse the cached WKB while the CSV is unchanged
+        geometry = load_cached_geometries(
+            f"wiup_polygons_{os.path.splitext(os.path.basename(csv_path))[0]}",
+            df["geometry"],
+            lambda cells: polygons_from_rings(cells, repair=False),
+        )
+        df["geometry"] = gpd.GeoSeries(geometry, index=df.index)
+        return gpd.GeoDataFrame(df, geometry="geometry", crs=DATASET_CRS)
+
+    import geopandas as gpd
+
+    gdf = gpd.read_parquet(pq_path)
+    logging.info(f"Loaded {len(gdf)} rows from {pq_path}")
+    if not as_rings:
+        return gdf
+
+    from sheet_api.geometry import rings_from_polygons
+
+    df = pd.DataFrame(gdf)
+    df["geometry"] = rings_from_polygons(gdf.geometry.values)
     return df
 
 
 if __name__ == "__main__":
+    from scrapper.admin_regions import get_admin_regions
+
     parser = argparse.ArgumentParser(
         description="Scrape ESDM minerba data for a specific commodity or all."
     )
     parser.add_argument(
         "commodity", choices=tasks.keys(), help="Which dataset to scrape: %(choices)s"
     )
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent page downloads"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only fetch new and changed licences since the last run (full scrape if no watermark yet)",
+    )
     args = parser.parse_args()
 
     selected = args.commodity
     where_clause = tasks[selected]
+    filename = f"datasets/esdm_minerba_{selected}.csv"
+    checkpoint_dir = os.path.join(CHECKPOINT_DIR, selected)
 
     logging.info(f"Starting scrape for {selected}")
 
     try:
-        df = scrape(where_clause=where_clause)
-        df = cleanse_df(df)
-        if df.empty or len(df) < 3500:
-            logging.warning(
-                f"Scraped data is insufficient (row count = {len(df)}); existing CSV will not be overwritten."
+        refreshed = None
+        if args.incremental:
+            refreshed = scrape_incremental(
+                where_clause, filename, args.workers, checkpoint_dir
             )
+
+        if refreshed is not None:
+            df, state = refreshed
+            if len(df) < MIN_ROWS:
+                raise ValueError(f"Merged data is insufficient (row count = {len(df)})")
+            df.to_csv(filename, index=True)
         else:
-            filename = f"datasets/esdm_minerba_{selected}.csv"
+            object_ids = fetch_object_ids(where_clause)
+            records = fetch_features(object_ids, where_clause, args.workers, checkpoint_dir)
+            # Hash the raw records: cleanse_df rewrites the values
+            state = build_state(records)
+            df = cleanse_df(pd.DataFrame(records))
+            if df.empty or len(df) < MIN_ROWS:
+                raise ValueError(
+                    f"Scraped data is insufficient (row count = {len(df)})"
+                )
             df.to_csv(filename, index=True)
-            logging.info(f"Saved {len(df)} rows to {filename}")
+
+        save_state(state_path(filename), state)
+        get_admin_regions().save()
+        logging.info(f"Saved {len(df)} rows to {filename}")
+        # Written from the CSV just saved, so both files share the same dtypes
+        if write_geoparquet(pd.read_csv(filename, index_col=0), parquet_path(filename)):
+            logging.info(f"Saved {len(df)} rows to {parquet_path(filename)}")
+    except ValueError as e:
+        logging.warning(f"{e}; existing CSV will not be overwritten.")
     except Exception as e:
         logging.error(
             f"Scrape failed due to an unexpected error: {e}. Existing CSV remains unchanged."
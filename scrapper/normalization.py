@@ -0,0 +1,173 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Abbreviations expanded in province / kabupaten / activity names
+ADMIN_EXPANSIONS = (
+    (re.compile(r"\bkab\.?\b", re.IGNORECASE), "kabupaten"),
+    (re.compile(r"\bprov\.?\b", re.IGNORECASE), "provinsi"),
+    (re.compile(r"\bkota\b", re.IGNORECASE), "kota"),
+)
+
+# Rewrites applied, in order, to free-form location strings
+LOCATION_EXPANSIONS = (
+    (re.compile(r"\bdesa/kelurahan\b", re.IGNORECASE), "Desa/Kelurahan"),
+    (re.compile(r"\bds\.?\b", re.IGNORECASE), "desa "),
+    (re.compile(r"\bJl\.?\b"), "Jl."),
+    (re.compile(r"\bNo\.?\b"), "No."),
+    (re.compile(r"\bRt\b", re.IGNORECASE), "RT"),
+    (re.compile(r"\bRw\b", re.IGNORECASE), "RW"),
+    (re.compile(r"\bkec\.?\s*", re.IGNORECASE), "kecamatan "),
+    (re.compile(r"\bkab\.?\s*", re.IGNORECASE), "kabupaten "),
+    (re.compile(r"\bprov\.?\s*", re.IGNORECASE), "provinsi "),
+    (re.compile(r"\bkel\.?\s*", re.IGNORECASE), "kelurahan "),
+    (re.compile(r"\bdesa/kel\.?\s*", re.IGNORECASE), "desa/kelurahan "),
+    # Fused words, e.g. 'Kecamatanmook'
+    (re.compile(r"(kecamatan|kabupaten|provinsi|kelurahan)([A-Za-z])", re.IGNORECASE), r"\1 \2"),
+)
+
+NEWLINES = re.compile(r"[\r\n]+")
+LEADING_DOTS = re.compile(r"^[\.\s]+")
+URL = re.compile(r"https?://|goo\.gl/", re.IGNORECASE)
+WHITESPACE = re.compile(r"\s+")
+# Any run of commas and whitespace containing a comma separates two parts
+PART_SEPARATOR = re.compile(r"\s*,[\s,]*")
+OUTER_SEPARATORS = re.compile(r"^[\s,]+|[\s,]+$")
+# Words of a normalized string (parts are separated by ', ')
+WORD = re.compile(r"[^\s,]+")
+
+# Normalized admin names by raw value, shared by every call in the process
+_ADMIN_CACHE = {}
+
+
+def title_words(values: pd.Series) -> pd.Series:
+    """Capitalize every whitespace-separated word (rest lowercased), keeping 'dan' lowercase."""
+    return values.str.replace(WORD, _title_word, regex=True)
+
+
+def _title_word(match: re.Match) -> str:
+    word = match.group()
+    return word.lower() if word.lower() == "dan" else word.capitalize()
+
+
+def map_unique(values: pd.Series, func) -> pd.Series:
+    """Apply a vectorized string function to the distinct values of `values` only (missing values stay missing)."""
+    codes, uniques = pd.factorize(values)
+    mapped = np.append(func(pd.Series(uniques, dtype=object)).to_numpy(dtype=object), None)
+    return pd.Series(mapped[codes], index=values.index)
+
+
+def clean_text(values: pd.Series) -> pd.Series:
+    """Cast to str (missing values become 'nan'/'None'), strip and replace embedded newlines with a space."""
+    return map_unique(
+        values.astype(str),
+        lambda uniques: uniques.str.strip().str.replace(NEWLINES, " ", regex=True),
+    )
+
+
+def _normalize_admin_values(values: pd.Series) -> pd.Series:
+    # One row per comma-separated part, empty parts dropped
+    parts = values.astype(str).str.split(",").explode().str.strip()
+    parts = parts[parts != ""]
+    for pattern, replacement in ADMIN_EXPANSIONS:
+        parts = parts.str.replace(pattern, replacement, regex=True)
+    parts = parts.str.replace(".", "", regex=False).str.replace(WHITESPACE, " ", regex=True).str.strip()
+    parts = title_words(parts)
+
+    joined = parts.groupby(level=0).agg(", ".join)
+    return joined.reindex(values.index, fill_value="")
+
+
+def normalize_admin(values) -> pd.Series:
+    """
+    Normalize province / kabupaten / activity names of a whole column.
+
+    Each comma-separated part is stripped, 'kab.'/'prov.' are expanded, dots and
+    extra spaces removed and words title-cased (except 'dan'); parts are joined
+    with ', '. Missing values become ''. Every distinct raw value is normalized
+    only once per process.
+
+    Args:
+        values (array-like): Raw names.
+
+    Returns:
+        pd.Series: Normalized names, aligned with `values`.
+    """
+    values = pd.Series(values)
+    codes, uniques = pd.factorize(values)
+
+    uncached = [u for u in uniques if u not in _ADMIN_CACHE]
+    if uncached:
+        normalized = _normalize_admin_values(pd.Series(uncached, dtype=object))
+        _ADMIN_CACHE.update(zip(uncached, normalized))
+
+    lookup = np.array([_ADMIN_CACHE[u] for u in uniques] + [""], dtype=object)
+    # factorize codes missing values as -1, which picks the trailing ''
+    return pd.Series(lookup[codes], index=values.index)
+
+
+def normalize_location(lokasi, nama_kab=None, nama_prov=None) -> pd.Series:
+    """
+    Normalize free-form location strings of a whole column.
+
+    Abbreviations (Ds, Kec, Kab, Prov, Kel, Jl, No) are expanded, spacing and
+    commas are normalized and words title-cased (except 'dan'). Digit-only
+    locations fall back to 'Kabupaten, Provinsi' and URLs to the raw
+    'nama_kab, nama_prov'.
+
+    Args:
+        lokasi (pd.Series): Raw locations.
+        nama_kab (pd.Series): Kabupaten names used as fallback, '' if None.
+        nama_prov (pd.Series): Province names used as fallback, '' if None.
+
+    Returns:
+        pd.Series: Normalized locations, aligned with `lokasi`.
+    """
+    # map(str) rather than astype(str): missing values read as 'nan'/'None' like str() does
+    raw = lokasi.map(str).str.strip().str.replace(LEADING_DOTS, "", regex=True)
+    kab = nama_kab.map(str) if nama_kab is not None else pd.Series("", index=raw.index)
+    prov = nama_prov.map(str) if nama_prov is not None else pd.Series("", index=raw.index)
+
+    digits = raw.str.isdigit()
+    urls = ~digits & raw.str.contains(URL, regex=True)
+    text = ~(digits | urls)
+
+    loc = raw[text]
+    for pattern, replacement in LOCATION_EXPANSIONS:
+        loc = loc.str.replace(pattern, replacement, regex=True)
+    loc = (
+        loc.str.replace(PART_SEPARATOR, ", ", regex=True)
+        .str.replace(OUTER_SEPARATORS, "", regex=True)
+        .str.replace(WHITESPACE, " ", regex=True)
+    )
+
+    result = pd.Series("", index=raw.index)
+    result[text] = title_words(loc)
+    result[digits] = kab[digits].map(str.title) + ", " + prov[digits].map(str.title)
+    result[urls] = kab[urls] + ", " + prov[urls]
+    return result
+
+
+def invalid_rows(df: pd.DataFrame, columns, placeholders=("", "-"), strip: bool = True) -> pd.Series:
+    """
+    Flag rows where any of `columns` is missing, or holds a placeholder once stripped
+    (text columns only).
+
+    Args:
+        df (pd.DataFrame): Data to check.
+        columns (Iterable[str]): Columns to check.
+        placeholders (Iterable[str]): Values treated as empty.
+        strip (bool): Strip text before comparing, False if already stripped.
+
+    Returns:
+        pd.Series: Boolean mask, True for invalid rows.
+    """
+    invalid = pd.Series(False, index=df.index)
+    for col in columns:
+        values = df[col]
+        invalid |= values.isna()
+        if pd.api.types.is_string_dtype(values.dtype):
+            text = values.astype(str)
+            invalid |= (text.str.strip() if strip else text).isin(placeholders)
+    return invalid
@@ -0,0 +1,165 @@
+import atexit
+import functools
+import logging
+import os
+import queue
+import threading
+
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.support.ui import WebDriverWait
+from webdriver_manager.chrome import ChromeDriverManager
+
+LOGGER = logging.getLogger(__name__)
+
+# Number of warm browsers kept by the shared pool
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+
+# A browser is restarted after this many pages to keep memory in check
+MAX_PAGES_PER_BROWSER = 50
+
+
+@functools.lru_cache(maxsize=None)
+def get_driver_path() -> str:
+    """Resolve the chromedriver binary once per process (CHROMEDRIVER_PATH overrides the download)."""
+    return os.getenv("CHROMEDRIVER_PATH") or ChromeDriverManager().install()
+
+
+def get_chrome_options(headless: bool = True, module=webdriver) -> webdriver.ChromeOptions:
+    """Chrome options shared by every scraper. `module` may be seleniumwire.webdriver."""
+    options = module.ChromeOptions()
+    if headless:
+        options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    return options
+
+
+def create_driver(headless: bool = True, module=webdriver) -> webdriver.Chrome:
+    """Start a Chrome WebDriver using the cached driver binary."""
+    service = Service(get_driver_path())
+    return module.Chrome(service=service, options=get_chrome_options(headless, module))
+
+
+def wait_for_dom_ready(driver: webdriver.Chrome, timeout: float = 20.0):
+    """Block until the current document has finished loading."""
+    WebDriverWait(driver, timeout).until(
+        lambda d: d.execute_script("return document.readyState") == "complete"
+    )
+
+
+class BrowserPool:
+    """
+    Keeps up to `size` warm browsers and hands them out one at a time, so pages are
+    loaded in already running browsers instead of starting Chrome for every page.
+    Browsers that raised an error are discarded, the others are restarted after
+    `max_pages` pages. Thread safe.
+    """
+
+    def __init__(self, size: int = BROWSER_POOL_SIZE, headless: bool = True,
+                 factory=None, max_pages: int = MAX_PAGES_PER_BROWSER):
+        self.size = size
+        self.factory = factory or functools.partial(create_driver, headless)
+        self.max_pages = max_pages
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._drivers = {}
+        atexit.register(self.close)
+
+    @contextmanager
+    def browser(self):
+        """Borrow a browser, starting one only if no warm browser is idle."""
+        self._slots.acquire()
+        driver = None
+        try:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                LOGGER.info("Starting a new pooled browser...")
+                driver = self.factory()
+                with self._lock:
+                    self._drivers[id(driver)] = [driver, 0]
+
+            yield driver
+
+        except Exception:
+            self._discard(driver)
+            driver = None
+            raise
+
+        finally:
+            if driver is not None:
+                self._release(driver)
+            self._slots.release()
+
+    def _release(self, driver):
+        with self._lock:
+            entry = self._drivers.get(id(driver))
+            if entry is None:
+                return
+            entry[1] += 1
+            worn_out = entry[1] >= self.max_pages
+        if worn_out:
+            self._discard(driver)
+        else:
+            self._idle.put(driver)
+
+    def _discard(self, driver):
+        if driver is None:
+            return
+        with self._lock:
+            self._drivers.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as error:
+            LOGGER.warning(f"Failed to quit browser: {error}")
+
+    def get_page_source(self, url: str, ready=None, timeout: float = 20.0) -> str:
+        """
+        Load a URL in a pooled browser and return its HTML once the DOM is ready.
+
+        Args:
+            url (str): The URL to load.
+            ready: Optional extra condition for WebDriverWait (e.g. an expected_conditions locator).
+            timeout (float): Maximum seconds to wait for the conditions.
+
+        Returns:
+            str: The page source (whatever is loaded if `ready` timed out).
+        """
+        with self.browser() as driver:
+            driver.get(url)
+            wait_for_dom_ready(driver, timeout)
+            if ready is not None:
+                try:
+                    WebDriverWait(driver, timeout).until(ready)
+                except Exception:
+                    LOGGER.warning(f"Timed out waiting for content on {url}")
+            return driver.page_source
+
+    def close(self):
+        """Quit every browser of the pool."""
+        with self._lock:
+            drivers = [entry[0] for entry in self._drivers.values()]
+            self._drivers.clear()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        while not self._idle.empty():
+            self._idle.get_nowait()
+
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Get the process-wide headless BrowserPool, created on first use."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = BrowserPool()
+        return _POOL
@@ -1,20 +1,120 @@
 import pandas as pd
+import numpy as np
 import sqlite3
-import re
 
 from rapidfuzz import process, fuzz
-from typing import Optional
+from typing import NamedTuple, Optional
 
-def clean_company_name(name):
-    """Removes common corporate prefixes/suffixes and converts to lowercase."""
-    if pd.isna(name):
-        return None
+# Legal-form affixes stripped before matching
+COMPANY_AFFIXES = ("PT", "Tbk")
+COMPANY_AFFIXES_EXTENDED = ("PT", "Tbk", "CV", "UD", "PD", "KSU", "KUD")
+
+# Upper bound on query x choice scores held in memory per cdist call
+MAX_SCORES_PER_CHUNK = 20_000_000
+
+
+def clean_company_names(names, affixes: tuple = COMPANY_AFFIXES) -> pd.Series:
+    """Vectorized cleaning: strips `affixes`, collapses whitespace and lowercases ('' for missing names)."""
+    pattern = rf"\b(?:{'|'.join(affixes)})\b"
     return (
-        re.sub(r"\b(PT|Tbk|CV|UD|PD|KSU|KUD)\b", "", str(name), flags=re.IGNORECASE)
-        .lower()
-        .strip()
+        pd.Series(names, dtype="string")
+        .str.replace(pattern, "", regex=True, case=False)
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip()
+        .str.lower()
+        .fillna("")
+        .reset_index(drop=True)
     )
 
+
+class CompanyMatch(NamedTuple):
+    position: int
+    score: float
+    kind: str  # 'exact', 'nospace' or 'fuzzy'
+
+
+class CompanyMatcher:
+    """
+    Index over a list of company names for batched matching.
+
+    Names are cleaned once, exact and no-space keys go into hash maps, and only
+    queries without an exact hit are scored with one rapidfuzz.process.cdist call
+    (all cores) instead of one extractOne per row. Positions returned refer to
+    the order of `names`.
+    """
+
+    def __init__(self, names, affixes: tuple = COMPANY_AFFIXES, scorer=fuzz.token_sort_ratio):
+        self.affixes = affixes
+        self.scorer = scorer
+        self.cleaned = clean_company_names(names, affixes)
+        self.choices = self.cleaned.tolist()
+        self.exact_map = self._positions_by_key(self.cleaned)
+        self.nospace_map = self._positions_by_key(self.cleaned.str.replace(" ", "", regex=False))
+
+    @staticmethod
+    def _positions_by_key(keys: pd.Series) -> dict:
+        positions = {}
+        for position, key in enumerate(keys):
+            if key:
+                positions.setdefault(key, []).append(position)
+        return positions
+
+    def clean(self, names) -> pd.Series:
+        """Clean query names with the same rules as the index."""
+        return clean_company_names(names, self.affixes)
+
+    def _fuzzy_scores(self, queries: list, threshold: float):
+        """Yield (query offset, score row) for `queries` in memory-bounded cdist chunks."""
+        chunk_size = max(1, MAX_SCORES_PER_CHUNK // max(1, len(self.choices)))
+        for start in range(0, len(queries), chunk_size):
+            scores = process.cdist(
+                queries[start:start + chunk_size],
+                self.choices,
+                scorer=self.scorer,
+                score_cutoff=threshold,
+                dtype=np.float32,
+                workers=-1,
+            )
+            for offset, row in enumerate(scores):
+                yield start + offset, row
+
+    def _exact(self, key: str) -> list[CompanyMatch]:
+        if key in self.exact_map:
+            return [CompanyMatch(p, 100, "exact") for p in self.exact_map[key]]
+        nospace = key.replace(" ", "")
+        if nospace in self.nospace_map:
+            return [CompanyMatch(p, 100, "nospace") for p in self.nospace_map[nospace]]
+        return []
+
+    def match_all(self, names, threshold: float = 93, limit: Optional[int] = None) -> list[list[CompanyMatch]]:
+        """
+        Match every name against the index.
+
+        Exact matches on the cleaned name win, then matches on the no-space key,
+        then fuzzy matches scoring at least `threshold` (best first, at most `limit`).
+
+        Returns one list of CompanyMatch per query name, empty when nothing matched.
+        """
+        keys = self.clean(names).tolist()
+        results = [self._exact(key) if key else [] for key in keys]
+
+        # Score each distinct unmatched key only once
+        pending = sorted({key for key, found in zip(keys, results) if key and not found})
+        fuzzy = {}
+        if pending and self.choices:
+            for offset, row in self._fuzzy_scores(pending, threshold):
+                hits = np.flatnonzero(row >= threshold)
+                # Best score first, ties keep index order like process.extract
+                hits = hits[np.argsort(-row[hits], kind="stable")][:limit]
+                fuzzy[pending[offset]] = [CompanyMatch(int(p), float(row[p]), "fuzzy") for p in hits]
+
+        return [found or fuzzy.get(key, []) for key, found in zip(keys, results)]
+
+    def match_best(self, names, threshold: float = 93) -> list[Optional[CompanyMatch]]:
+        """Best single match per name (first exact hit, else best fuzzy), None when nothing matched."""
+        return [matches[0] if matches else None for matches in self.match_all(names, threshold, limit=1)]
+
+
 def query_company() -> pd.DataFrame:
     conn = sqlite3.connect("db.sqlite")
     company_df = pd.read_sql("SELECT id, name FROM company;", conn)
@@ -29,33 +129,19 @@ def match_company_by_name(
 ) -> pd.DataFrame:
 
     company_df = query_company()
+    matcher = CompanyMatcher(company_df["name"], affixes=COMPANY_AFFIXES_EXTENDED, scorer=fuzz.ratio)
 
-    company_df["cleaned_company_name"] = company_df["name"].apply(clean_company_name)
-    cleaned_company_name_list = company_df["cleaned_company_name"].tolist()
-
-    company_id_map = dict(zip(company_df["cleaned_company_name"], company_df["id"]))
-    company_name_map = dict(zip(company_df["cleaned_company_name"], company_df["name"]))
+    target_df["cleaned_company_name"] = matcher.clean(target_df[target_column]).replace("", None).to_numpy()
+    best = matcher.match_best(target_df[target_column], threshold=93)
 
-    target_df["cleaned_company_name"] = target_df[target_column].apply(clean_company_name)
+    company_ids = [company_df["id"].iat[m.position] if m else None for m in best]
+    company_names = [company_df["name"].iat[m.position] if m else None for m in best]
 
-    def match_sequence(row, scorer=fuzz.ratio, threshold=93):
-        name = row["cleaned_company_name"]
+    if fallback_column and fallback_column in target_df:
+        fallback = target_df[fallback_column].tolist()
+        company_names = [name if m else fb for m, name, fb in zip(best, company_names, fallback)]
 
-        if name in company_id_map:
-            return company_id_map[name], company_name_map[name]
-
-        match = process.extractOne(name, cleaned_company_name_list, scorer=scorer)
-        if match and match[1] >= threshold:
-            matched_name = match[0]
-            return company_id_map[matched_name], company_name_map[matched_name]
-        
-        company_id = None
-        company_name = row[fallback_column] if fallback_column and fallback_column in row else None
-        return company_id, company_name
-
-    target_df[["company_id", "company_name"]] = target_df.apply(
-        lambda row: pd.Series(match_sequence(row)),
-        axis=1
-    )
+    target_df["company_id"] = company_ids
+    target_df["company_name"] = company_names
 
-    return target_df
\ No newline at end of file
+    return target_df
@@ -1,14 +1,9 @@
 import pandas as pd
 import re
 
-from sheet_api.google_sheets.auth import createClient, createService
+from sheet_api.google_sheets.client import WRITE_QUEUE, getSheet
 
-client, spreadsheet_id = createClient()
-service = createService()
-ms_sheet = client.open_by_key(spreadsheet_id).worksheet('mining_site')
-
-ms_data = ms_sheet.get('A1:AG157')
-ms_df = pd.DataFrame(ms_data[1:], columns=ms_data[0])
+ms_sheet, ms_df = getSheet('mining_site', 'A1:AG157')
 
 # esdm_coal_df = pd.read_csv("coal_db - ESDM_coal.csv")
 esdm_coal_df = pd.read_csv("datasets/copper.csv")
@@ -57,14 +52,16 @@ def updateSheet(starts_from=0):
                 col_id = list(ms_df.columns).index(sheet_col)
                 
                 original_value = row[sheet_col]
-                new_value = str(q[csv_col].iloc[0])
+                new_value = q[csv_col].iloc[0]
 
                 to_use_value = new_value
 
-                ms_sheet.update_cell(2 + row_id, col_id + 1, to_use_value)
+                WRITE_QUEUE.updateCell(ms_sheet.id, 1 + row_id, col_id, to_use_value)
 
                 print("Updating row number, col number, value:", row_id, col_id, to_use_value)
 
+    WRITE_QUEUE.flush()
+
 def batchUpdateSheet(starts_from=0):
     col_start = list(ms_df.columns).index("*province")
     col_end = list(ms_df.columns).index("*reserves_probable")
@@ -80,38 +77,21 @@ def batchUpdateSheet(starts_from=0):
         original_value = row.iloc[col_start:col_end + 1]
 
         if esdm_row.empty:
-            to_use_value = original_value
+            to_use_value = list(original_value)
         else:
-            new_value = [esdm_row.get(merge_columns_hash.get(sheet_col, ""), "") for sheet_col in original_value.index]
-            to_use_value = new_value
+            to_use_value = [
+                esdm_row[merge_columns_hash[sheet_col]].iloc[0] if sheet_col in merge_columns_hash else value
+                for sheet_col, value in original_value.items()
+            ]
 
         print(to_use_value)
 
-        payload = ({"values": [{"userEnteredValue": {"stringValue": f"{to_use_value}"}}]})
-
-        requests = [
-            {
-                'updateCells': {
-                    'range': {
-                        'sheetId': 147673991,
-                        'startRowIndex': starts_from + 1,
-                        'endRowIndex': 240 + 1,
-                        'startColumnIndex': col_start,
-                        'endColumnIndex': col_end + 1
-                    },
-                    'rows': payload,
-                    'fields': 'userEnteredValue'
-                }
-            },
-        ]
-
-        response = (
-            service.spreadsheets()
-            .batchUpdate(spreadsheetId=spreadsheet_id, body={"requests": requests})
-            .execute()
+        WRITE_QUEUE.updateCells(
+            ms_sheet.id,
+            ((1 + row_id, col_start + offset, value) for offset, value in enumerate(to_use_value))
         )
 
-        print(f"Batch update response: {response}")
+    WRITE_QUEUE.flush()
 
 # batchUpdateSheet(starts_from=90)
 updateSheet(starts_from=152)
\ No newline at end of file
@@ -1,6 +1,8 @@
 import pandas as pd
 import json
 
+from scrapper.esdm_minerba import read_wiup_dataset
+
 df = pd.read_csv('datasets/modi_detailed_company_all.csv')
 
 cols = [
@@ -44,7 +46,7 @@ modi_df = modi_df[[t for t, o in cols]]
 modi_df = modi_df.sort_values(by=['nama_usaha', 'sk_iup'])
 modi_df = modi_df.drop_duplicates(keep='first')
 
-minerba_df = pd.read_csv('datasets/esdm_minerba_all.csv')
+minerba_df = read_wiup_dataset('datasets/esdm_minerba_all.csv', as_rings=True)
 minerba_cols = ['kode_wiup', 'objectid', 'pulau', 'pejabat', 'id_prov', 'nama_prov', 'id_kab', 
                 'nama_kab', 'kode_golongan', 'kode_jnskom', 'generasi', 'geometry',
                 'komoditas_mapped', 'provinsi_norm', 'kabupaten_norm', 'kegiatan_norm', 'lokasi_norm']
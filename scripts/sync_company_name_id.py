@@ -1,10 +1,8 @@
 import argparse
 
-from sheet_api.google_sheets.auth import createClient, createService
-from sheet_api.google_sheets.client import getSheetAll
+from sheet_api.google_sheets.client import WRITE_QUEUE, getSheetAll
 
-_, spreadsheet_id = createClient()
-service = createService()
+import pandas as pd
 
 def syncCompanyNameID(c_df, df, sheet, company_name_col, company_id_col, starts_from=0):
     for row_id, row in df.iterrows():
@@ -21,36 +19,15 @@ def syncCompanyNameID(c_df, df, sheet, company_name_col, company_id_col, starts_
             original_value = row[company_id_col]
             new_value = company_q['id2'].iloc[0]
 
-            to_use_value = new_value
+            # Ids read back as text; write them as numbers like a typed-in value
+            number = pd.to_numeric(new_value, errors='coerce')
+            to_use_value = new_value if pd.isna(number) else number
 
-            sheet.update_cell(2 + row_id, col_id + 1, to_use_value)
+            WRITE_QUEUE.updateCell(sheet.id, 1 + row_id, col_id, to_use_value)
 
             print("Updating row number, col number, col name, value:", row_id + 2, col_id, company_id_col, to_use_value)
 
-def sendRequest(sheet_id, start, end, col_id, rows):
-    requests = [
-        {
-            'updateCells': {
-                'range': {
-                    'sheetId': sheet_id,
-                    'startRowIndex': start + 1,
-                    'endRowIndex': end + 1,
-                    'startColumnIndex': col_id,
-                    'endColumnIndex': col_id + 1
-                },
-                'rows': rows,
-                'fields': 'userEnteredValue'
-            }
-        }
-    ]
-
-    response = service.spreadsheets().batchUpdate(
-        spreadsheetId=spreadsheet_id,
-        body={'requests': requests}
-    ).execute()
-
-    print(f"Batch update response: {response}")
-
+    WRITE_QUEUE.flush()
 
 def batchUpdate(c_df, df, company_name_col, company_id_col, sheet_id, starts_from=0, sync_name=False):
 
@@ -62,7 +39,7 @@ def batchUpdate(c_df, df, company_name_col, company_id_col, sheet_id, starts_fro
 
     target_col_id = df.columns.get_loc(target_col)
 
-    rows = []
+    values = {}
 
     for row_id, row in df.iterrows():
 
@@ -83,11 +60,9 @@ def batchUpdate(c_df, df, company_name_col, company_id_col, sheet_id, starts_fro
             to_use_value = {}
         
 
-        rows.append({
-            'values': [{'userEnteredValue': to_use_value}]
-            })
+        values[row_id] = to_use_value
 
-    sendRequest(sheet_id, starts_from, len(df), target_col_id, rows)
+    WRITE_QUEUE.updateCells(sheet_id, ((row_id + 1, target_col_id, v) for row_id, v in values.items()))
 
 class SyncCompanyId:
     def __init__(self):
@@ -96,9 +71,11 @@ class SyncCompanyId:
 
     def update_commodity_performance(self):
         commodities = ['coal', 'nickel', 'gold', 'copper', 'silver']
-        for commodity in commodities:
-            sheet, df = getSheetAll(f'{commodity}_performance')
+        # Read every tab before queueing, so that all of them go out in one flush
+        sheets = [getSheetAll(f'{commodity}_performance') for commodity in commodities]
+        for sheet, df in sheets:
             batchUpdate(self.c_df, df, '*company_name', 'company_id', sheet.id)
+        WRITE_QUEUE.flush()
 
     def update_target(self, target):
         target_map = {
@@ -120,6 +97,7 @@ class SyncCompanyId:
         sheet, df = getSheetAll(sheet_name)
         for col_name, id_field in updates:
             batchUpdate(self.c_df, df, col_name, id_field, sheet.id)
+        WRITE_QUEUE.flush()
 
     def update_all(self):
         for target in ['ccp', 'c', 'ms', 'mc', 'cp']:
@@ -1,16 +1,12 @@
 # %%
 from sheet_api.core.toolbox           import safeCast, clean_company_df
-from sheet_api.google_sheets.auth     import createClient, createService
-from sheet_api.google_sheets.client   import getSheetAll
+from sheet_api.google_sheets.client   import WRITE_QUEUE, getSheetAll
 from sheet_api.minerba_merge          import prepareMinerbaDf
-from rapidfuzz                        import process, fuzz
+from scripts.fuzzy_matcher            import CompanyMatcher
 
 import pandas as pd
 import json
 
-_, SPREADSHEET_ID = createClient()
-SERVICE = createService()
-
 # %%
 MINERAL_STATS = [
     ("unit", str),
@@ -119,7 +115,7 @@ RESERVES_RESOURCES_METAL = [
 def compileToJsonBatch(df, included_columns, target_col, sheet_id, starts_from=0):
     col_id = df.columns.get_loc(target_col)
 
-    rows = []
+    values = {}
 
     for row_id, row in df.iterrows():
 
@@ -134,34 +130,9 @@ def compileToJsonBatch(df, included_columns, target_col, sheet_id, starts_from=0
 
             data_dict[in_col_cleaned] = val
 
-        rr_cols_json = json.dumps(data_dict)
-        to_use_value = {"stringValue": f"{rr_cols_json}"}
-
-        rows.append({"values": [{"userEnteredValue": to_use_value}]})
-
-    requests = [
-        {
-            'updateCells': {
-                'range': {
-                    'sheetId': sheet_id,
-                    'startRowIndex': starts_from + 1,
-                    'endRowIndex': len(df) + 1,
-                    'startColumnIndex': col_id,
-                    'endColumnIndex': col_id + 1
-                },
-                'rows': rows,
-                'fields': 'userEnteredValue'
-            }
-        },
-    ]
+        values[row_id] = json.dumps(data_dict)
 
-    response = (
-        SERVICE.spreadsheets()
-        .batchUpdate(spreadsheetId=SPREADSHEET_ID, body={"requests": requests})
-        .execute()
-    )
-
-    print(f"Batch update response: {response}")
+    batchUpdateSheet(values, sheet_id, col_id)
 
 def default_key_formatter(col):
     return col.lstrip("*")
@@ -192,7 +163,7 @@ def renderNickelStats(row):
 
 def jsonifyCommodityStats(df: pd.DataFrame, sheet_id: int, starts_from: int = 0):
     col_id = df.columns.get_loc("commodity_stats")
-    rows = []
+    values = {}
 
     for row_id, row in df.iterrows():
 
@@ -204,40 +175,9 @@ def jsonifyCommodityStats(df: pd.DataFrame, sheet_id: int, starts_from: int = 0)
         else:
             data_dict = renderCoalStats(row)
             
-        rr_cols_json = json.dumps(data_dict)
-        to_use_value = {'stringValue':f'{rr_cols_json}'}
-
-        rows.append(
-            {
-                'values': 
-                    [
-                        {'userEnteredValue': to_use_value}
-                    ]
-            }
-        )
-
-    requests = [
-        {
-            'updateCells': {
-                'range': {
-                    'sheetId': sheet_id,
-                    'startRowIndex': starts_from + 1,
-                    'endRowIndex': len(df) + 1,
-                    'startColumnIndex': col_id,
-                    'endColumnIndex': col_id + 1
-                },
-                'rows': rows,
-                'fields': 'userEnteredValue'
-            }
-        }
-    ]
-
-    response = SERVICE.spreadsheets().batchUpdate(
-        spreadsheetId=SPREADSHEET_ID,
-        body={'requests': requests}
-    ).execute()
+        values[row_id] = json.dumps(data_dict)
 
-    print(f"Batch update response: {response}")
+    batchUpdateSheet(values, sheet_id, col_id)
 
 
 def renderGoldCopperMine(row):
@@ -254,7 +194,7 @@ def renderNickelMine(row):
 
 def jsonifyMineReservesAndResources(df: pd.DataFrame, sheet_id: int, starts_from: int = 0):
     col_id = df.columns.get_loc("resources_reserves")
-    rows = []
+    values = {}
 
     renderMap = {
         'Gold': renderGoldCopperMine,
@@ -271,90 +211,38 @@ def jsonifyMineReservesAndResources(df: pd.DataFrame, sheet_id: int, starts_from
         renderFunction = renderMap.get(row['mineral_type'], renderCoalMine)
         data_dict = renderFunction(row)
             
-        rr_cols_json = json.dumps(data_dict)
-        to_use_value = {'stringValue':f'{rr_cols_json}'}
-
-        rows.append(
-            {
-                'values': 
-                    [
-                        {'userEnteredValue': to_use_value}
-                    ]
-            }
-        )
-
-    requests = [
-        {
-            'updateCells': {
-                'range': {
-                    'sheetId': sheet_id,
-                    'startRowIndex': starts_from + 1,
-                    'endRowIndex': len(df) + 1,
-                    'startColumnIndex': col_id,
-                    'endColumnIndex': col_id + 1
-                },
-                'rows': rows,
-                'fields': 'userEnteredValue'
-            }
-        }
-    ]
-
-    response = SERVICE.spreadsheets().batchUpdate(
-        spreadsheetId=SPREADSHEET_ID,
-        body={'requests': requests}
-    ).execute()
+        values[row_id] = json.dumps(data_dict)
 
-    print(f"Batch update response: {response}")
+    batchUpdateSheet(values, sheet_id, col_id)
 
-def matchingSequence(license_df: pd.DataFrame, clean_list: list, key: str, key_no_space: str, 
+def matchingSequence(license_df: pd.DataFrame, names: pd.Series,
                      threshold: int = 93, is_debug: bool = False
-                     ) -> pd.DataFrame:
-    matches = license_df[license_df['name_cleaned'] == key]
-    if is_debug:
-        if not matches.empty: 
-            print(f"[EXACT] '{key}' matched '{matches.iloc[0]['name_cleaned']}'")
-    
-    # No space matching
-    if matches.empty:
-        matches = license_df[license_df['name_cleaned_no_space'] == key_no_space]
-        if is_debug:
-            if not matches.empty: 
-                print(f"[NOSPACE] '{key}' matched '{matches.iloc[0]['name_cleaned']}'")
-
-    # Fuzzy matching
-    if matches.empty: 
-        match, score, idx = process.extractOne(key, clean_list, scorer=fuzz.token_sort_ratio)
-        if score >= threshold:
-            matches = license_df.iloc[[idx]]
-            if is_debug:
-                print(f"[FUZZY] '{key}' → '{match}' (score: {score})")
-
-    return matches
-
-def batchUpdateSheet(rows: list, sheet_id: int, starts_from: int, length: int, col_id: int):
-    requests = [
-        {
-            'updateCells': {
-                'range': {
-                    'sheetId': sheet_id,
-                    'startRowIndex': starts_from + 1,
-                    'endRowIndex': length + 1,
-                    'startColumnIndex': col_id,
-                    'endColumnIndex': col_id + 1
-                },
-                'rows': rows,
-                'fields': 'userEnteredValue'
-            }
-        }
-    ]
-
-    response = SERVICE.spreadsheets().batchUpdate(
-        spreadsheetId=SPREADSHEET_ID,
-        body={'requests': requests}
-    ).execute()
-    print(f"Batch update response: {response}")
-
-    return response
+                     ) -> list[pd.DataFrame]:
+    # Exact, then no space, then best fuzzy match for every name in one batch
+    matcher = CompanyMatcher(license_df['company_name'])
+    all_matches = matcher.match_all(names, threshold=threshold, limit=1)
+
+    results = []
+    for key, matches in zip(matcher.clean(names), all_matches):
+        positions = [m.position for m in matches]
+        if is_debug and matches:
+            first = matches[0]
+            label = {'exact': 'EXACT', 'nospace': 'NOSPACE', 'fuzzy': 'FUZZY'}[first.kind]
+            print(f"[{label}] '{key}' → '{matcher.choices[first.position]}' (score: {first.score})")
+        results.append(license_df.iloc[positions])
+
+    return results
+
+def batchUpdateSheet(values: dict, sheet_id: int, col_id: int) -> None:
+    """
+    Queue one column on the shared write queue; it goes out with the next flush.
+
+    Args:
+        values (dict | pd.Series): Cell values by DataFrame row id (row id 0 is the first row under the header).
+        sheet_id (int): Worksheet id.
+        col_id (int): 0-based column index.
+    """
+    WRITE_QUEUE.updateCells(sheet_id, ((row_id + 1, col_id, value) for row_id, value in values.items()))
 
 def fillMiningLicense(df: pd.DataFrame, sheet_id: int, is_debug: bool =False,
                       starts_from: int = 0, threshold: int = 93
@@ -365,21 +253,15 @@ def fillMiningLicense(df: pd.DataFrame, sheet_id: int, is_debug: bool =False,
     df_company = clean_company_df(df, 'name')
     df_minerba = clean_company_df(minerba_df,'company_name')
 
-    # Pre-extract the list of normalized names for fuzzy matching
-    clean_list = df_minerba['name_cleaned'].tolist()
-    
     col_id = df.columns.get_loc("mining_license")
 
-    rows = []
-    for row_id, row in df_company.iterrows():
+    # Match every company against the license holders in one batch
+    all_matches = matchingSequence(df_minerba, df_company['name'], threshold, is_debug)
+
+    values = {}
+    for (row_id, row), matches in zip(df_company.iterrows(), all_matches):
         if (row_id + 2) < starts_from:
             continue
-        
-        key = row['name_cleaned']
-        key_no_space = row['name_cleaned_no_space'] 
-
-        # Exact matching
-        matches = matchingSequence(df_minerba, clean_list, key, key_no_space, threshold, is_debug)
 
         if not matches.empty:
             records = matches[included_columns].to_dict(orient="records")
@@ -390,19 +272,9 @@ def fillMiningLicense(df: pd.DataFrame, sheet_id: int, is_debug: bool =False,
         ### CHANGED: dump the list (even if empty) as your JSON array
         license_json = json.dumps(records, ensure_ascii=False)
         df_company.at[row_id, 'mining_license'] = license_json
+        values[row_id] = license_json
 
-        to_use_value = {"stringValue": license_json}
-
-        rows.append(
-            {
-                'values': 
-                    [
-                        {'userEnteredValue': to_use_value}
-                    ]
-            }
-        )
-    
-    response = batchUpdateSheet(rows, sheet_id, starts_from, len(df), col_id)
+    batchUpdateSheet(values, sheet_id, col_id)
 
     return df_company
 
@@ -447,11 +319,9 @@ def fillMiningContract(df: pd.DataFrame, sheet_id: int) -> pd.DataFrame:
     c_df["mining_contract"] = c_df["mining_contract"].fillna("[]")
     c_df.loc[c_df["mining_contract"].isnull(), "mining_contract"] = "[]"
 
-    rows = c_df["mining_contract"].tolist()
-    rows = [{"values": [{"userEnteredValue": {"stringValue": r}}]} for r in rows]
     col_id = c_df.columns.get_loc("mining_contract")
 
-    response = batchUpdateSheet(rows, sheet_id, 0, len(c_df), col_id)
+    batchUpdateSheet(c_df["mining_contract"], sheet_id, col_id)
 
     return c_df
 
@@ -1,7 +1,7 @@
 import json
 import pandas as pd
 
-from sheet_api.google_sheets.client import getSheetAll
+from sheet_api.google_sheets.client import WRITE_QUEUE, getSheetAll
 from sheet_api.core.toolbox import safeCast
 from gspread import Cell
 from typing import Optional
@@ -125,7 +125,8 @@ def updateProduct(commodity: str, commodity_sub_type: bool = False, starts_from
 			
     # Perform batch update
 	if cell_updates:
-		commodity_sheet.update_cells(cell_updates)
+		WRITE_QUEUE.updateGspreadCells(commodity_sheet.id, cell_updates)
+		WRITE_QUEUE.flush()
 		print(f"Batch updated {len(cell_updates)} cells.")
 
 if __name__ == '__main__':
@@ -1,7 +1,12 @@
 from tabulate import tabulate
+from peewee import Case, chunked
+import numpy as np
 import pandas as pd
 from typing import Callable
-from decimal import Decimal
+
+
+# Rows per INSERT / CASE UPDATE statement (keeps well under SQLite's bound-variable limit)
+BULK_BATCH_SIZE = 100
 
 
 def deleteID(model, id: int) -> None:
@@ -10,6 +15,96 @@ def deleteID(model, id: int) -> None:
     print(f"ID {id} has been deleted from {model.__name__} table")
 
 
+def loadTable(model) -> pd.DataFrame:
+    """
+    Load a whole table in one query, indexed by primary key. Foreign keys stay raw ids.
+    Values keep their Python types (object dtype), so NULL stays None and ints stay ints.
+    """
+    pk = model._meta.primary_key.name
+    columns = list(model._meta.fields)
+    table = pd.DataFrame(list(model.select().dicts()), columns=columns, dtype=object)
+    return table.set_index(pk, drop=False)
+
+
+def sheetByID(model, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sheet rows that carry an id, indexed by it (first row wins on duplicated ids).
+    """
+    pk = model._meta.primary_key.name
+    keyed = df[df[pk].notna()]
+    duplicated = keyed[pk].duplicated()
+    if duplicated.any():
+        print(f"Duplicated IDs in sheet for model {model.__name__}: {sorted(set(keyed.loc[duplicated, pk]))}")
+        keyed = keyed[~duplicated]
+    return keyed.set_index(keyed[pk].astype("int64"), drop=False)
+
+
+def coerceColumn(field, values: pd.Series) -> np.ndarray:
+    """
+    Turn sheet values into what the field would read back from the database
+    (Decimal for DecimalField, int for IntegerField, ...), None for missing values.
+    Every distinct value is converted once. Values the field cannot store are kept as is.
+    """
+    codes, uniques = pd.factorize(values)
+
+    def roundTrip(value):
+        try:
+            return field.python_value(field.db_value(value))
+        except (TypeError, ValueError, ArithmeticError):
+            return value
+
+    converted = np.array([roundTrip(u) for u in uniques] + [None], dtype=object)
+    return converted[codes]
+
+
+def diffFrames(model, db: pd.DataFrame, sheet: pd.DataFrame, ids) -> dict:
+    """
+    Compare DB and sheet values of `ids` for every model field at once.
+
+    Returns:
+        dict: field name -> (changed mask, DB values, sheet values), aligned with `ids`.
+    """
+    diffs = {}
+    for name, field in model._meta.fields.items():
+        db_vals = db.loc[ids, name].to_numpy(dtype=object)
+        # Missing DB values preview as None, like the row objects did
+        db_vals = np.where(pd.isna(db_vals), None, db_vals)
+        if name in sheet.columns:
+            sheet_vals = coerceColumn(field, sheet.loc[ids, name])
+        else:
+            sheet_vals = np.full(len(ids), None, dtype=object)
+
+        db_null = pd.isna(db_vals)
+        sheet_null = pd.isna(sheet_vals)
+        both = ~db_null & ~sheet_null
+        unequal = np.zeros(len(ids), dtype=bool)
+        if both.any():
+            # Object arrays compare element-wise, so Decimal == Decimal compares numerically
+            unequal[both] = db_vals[both] != sheet_vals[both]
+
+        diffs[name] = ((db_null != sheet_null) | unequal, db_vals, sheet_vals)
+    return diffs
+
+
+def bulkUpdate(model, changes: dict) -> int:
+    """
+    Apply {id: {field name: value}} with one CASE UPDATE per batch of rows.
+    Fields a row does not change keep their current value.
+    """
+    pk = model._meta.primary_key
+    items = list(changes.items())
+    updated = 0
+    for batch in chunked(items, BULK_BATCH_SIZE):
+        names = sorted({name for _, row in batch for name in row})
+        update = {}
+        for name in names:
+            field = model._meta.fields[name]
+            whens = [(row_id, field.db_value(row[name])) for row_id, row in batch if name in row]
+            update[field] = Case(pk, whens, field)
+        updated += model.update(update).where(pk.in_([row_id for row_id, _ in batch])).execute()
+    return updated
+
+
 def checkDeletedAndOrder(model, df, key="id", execute=False) -> bool:
     db_ids = list(
         model.select(getattr(model, key)).order_by(getattr(model, key)).scalars()
@@ -21,8 +116,11 @@ def checkDeletedAndOrder(model, df, key="id", execute=False) -> bool:
 
     if deleted_ids:
         if execute:
-            for di in deleted_ids:
-                deleteID(model, di)
+            with model._meta.database.atomic():
+                for batch in chunked(sorted(deleted_ids), BULK_BATCH_SIZE):
+                    model.delete().where(getattr(model, key).in_(batch)).execute()
+            for di in sorted(deleted_ids):
+                print(f"ID {di} has been deleted from {model.__name__} table")
 
             return False
 
@@ -38,56 +136,63 @@ def checkDeletedAndOrder(model, df, key="id", execute=False) -> bool:
 
 
 def compareDBSheet(model, df, execute=False) -> bool:
-    diff_exist = False
-    for model_row, (_, row) in zip(model.select(), df.iterrows()):
-        diff = []
-        for field in model._meta.fields:
-            db_val = getattr(model_row, field)
-            if hasattr(db_val, "id"):
-                db_val = db_val.id
-            sheet_val = row.get(field)
-            sheet_val = None if pd.isna(sheet_val) else sheet_val
-
-            if type(db_val) == Decimal:
-                sheet_val = Decimal(sheet_val) if sheet_val is not None else None
-
-            if db_val != sheet_val:
-                diff.append((field, db_val, sheet_val))
-
-        if diff:
-            diff_exist = True
-            if execute:
-                for field_name, old_val, new_val in diff:
-                    setattr(model_row, field_name, new_val)
-                model_row.save()
-                print(
-                    f"Updated for {model.__name__} at {model_row}, {field_name}: {old_val} -> {new_val} "
-                )
-            else:
-                c_name = row.get("name", row.get("*company_name"))
-                print(
-                    f"Different value at ID {row['id']} {c_name}:\n{tabulate(diff, headers=['Field', 'DB Value', 'Sheet Value'], tablefmt='grid')}"
-                )
-    return diff_exist
+    db = loadTable(model)
+    sheet = sheetByID(model, df)
+    ids = sheet.index[sheet.index.isin(db.index)]
+    if ids.empty:
+        return False
+
+    diffs = diffFrames(model, db, sheet, ids)
+    changed_rows = np.flatnonzero(np.any([mask for mask, _, _ in diffs.values()], axis=0))
+    if not len(changed_rows):
+        return False
+
+    changes = {}
+    for position in changed_rows:
+        row_id = int(ids[position])
+        diff = [
+            (name, db_vals[position], sheet_vals[position])
+            for name, (mask, db_vals, sheet_vals) in diffs.items()
+            if mask[position]
+        ]
+        changes[row_id] = {name: new_val for name, _, new_val in diff}
+
+        if not execute:
+            row = sheet.loc[row_id]
+            c_name = row.get("name", row.get("*company_name"))
+            print(
+                f"Different value at ID {row_id} {c_name}:\n{tabulate(diff, headers=['Field', 'DB Value', 'Sheet Value'], tablefmt='grid')}"
+            )
+
+    if execute:
+        with model._meta.database.atomic():
+            bulkUpdate(model, changes)
+        for row_id, row in changes.items():
+            print(f"Updated for {model.__name__} at ID {row_id}: {', '.join(row)}")
+    return True
 
 
 def checkNewData(model, df, field_types: dict, execute=False) -> bool:
-    found_new = False
-    for _, row in df.iterrows():
-        rowid = row.get("id", None)
-        rowid = None if pd.isna(rowid) else rowid
-        if model.get_or_none(model.id == rowid) is None:
-            found_new = True
-            if execute:
-                inputs = {
-                    ft: None if row[ft] is pd.NA else row[ft]
-                    for ft in field_types
-                    if ft != "id"
-                }
-                model(**inputs).save()
-            else:
-                print(f"New data to add: {row[[ft for ft in field_types]].to_dict()}")
-    return found_new
+    pk = model._meta.primary_key.name
+    db_ids = set(model.select(model._meta.primary_key).scalars())
+    ids = pd.to_numeric(df[pk], errors="coerce") if pk in df.columns else pd.Series(np.nan, index=df.index)
+    new_rows = df[ids.isna() | ~ids.isin(db_ids)]
+    if new_rows.empty:
+        return False
+
+    if execute:
+        inputs = [
+            {ft: None if pd.isna(row[ft]) else row[ft] for ft in field_types if ft != "id"}
+            for row in new_rows.to_dict(orient="records")
+        ]
+        with model._meta.database.atomic():
+            for batch in chunked(inputs, BULK_BATCH_SIZE):
+                model.insert_many(batch).execute()
+        print(f"Inserted {len(inputs)} new rows into {model.__name__}")
+    else:
+        for _, row in new_rows.iterrows():
+            print(f"New data to add: {row[[ft for ft in field_types]].to_dict()}")
+    return True
 
 
 def confirmChange(func: Callable, model, df, *args, **kwargs) -> None:
@@ -0,0 +1,145 @@
+from pyproj                             import Transformer
+
+import json
+
+import numpy as np
+import pandas as pd
+import shapely
+
+
+def points_from_lonlat(lon, lat, transformer: Transformer = None) -> np.ndarray:
+    """
+    Build projected points for whole coordinate columns at once.
+
+    Args:
+        lon (array-like): Longitudes, NaN or non-numeric for missing.
+        lat (array-like): Latitudes.
+        transformer (Transformer): Optional pyproj transformer applied to all points in one call.
+
+    Returns:
+        np.ndarray: Object array of shapely Points, None where a coordinate is missing.
+    """
+    lon = pd.to_numeric(pd.Series(lon), errors="coerce").to_numpy(dtype=float)
+    lat = pd.to_numeric(pd.Series(lat), errors="coerce").to_numpy(dtype=float)
+
+    valid = ~(np.isnan(lon) | np.isnan(lat))
+    points = np.full(len(lon), None, dtype=object)
+    if not valid.any():
+        return points
+
+    xs, ys = lon[valid], lat[valid]
+    if transformer is not None:
+        xs, ys = transformer.transform(xs, ys)
+    points[valid] = shapely.points(xs, ys)
+    return points
+
+
+def parse_rings(cell) -> list | None:
+    """
+    Parse one stored geometry cell (JSON / Python-list string or list) into a list of rings.
+
+    Args:
+        cell (Any): A `rings` value as written by the esdm_minerba scraper.
+
+    Returns:
+        list | None: List of rings (lists of [x, y]), or None if empty or malformed.
+    """
+    if cell is None or (isinstance(cell, float) and np.isnan(cell)) or not len(cell):
+        return None
+    try:
+        rings = json.loads(cell) if isinstance(cell, str) else cell
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+    if not isinstance(rings, list) or not rings:
+        return None
+    # A flat coordinate list is a single ring
+    if isinstance(rings[0], list) and len(rings[0]) == 2 and not isinstance(rings[0][0], list):
+        rings = [rings]
+    return rings
+
+
+def polygons_from_rings(cells, repair: bool = True) -> np.ndarray:
+    """
+    Build polygons for a whole column of ring cells with shapely's array constructors.
+    The first ring of a cell is the shell and the others are holes. Only invalid
+    polygons are repaired (buffer(0)), and unusable cells become None.
+
+    Args:
+        cells (array-like): Ring cells, see parse_rings().
+        repair (bool): Repair invalid polygons.
+
+    Returns:
+        np.ndarray: Object array of shapely Polygons/MultiPolygons or None.
+    """
+    coords, ring_index, polygon_index, owners = [], [], [], []
+    ring_id = 0
+
+    for position, cell in enumerate(cells):
+        rings = parse_rings(cell)
+        # linearrings need at least 3 points per ring
+        if not rings or any(not isinstance(r, list) or len(r) < 3 for r in rings):
+            continue
+        try:
+            ring_coords = [np.asarray(ring, dtype=float)[:, :2] for ring in rings]
+        except (ValueError, IndexError, TypeError):
+            continue
+
+        for ring in ring_coords:
+            coords.append(ring)
+            ring_index.append(np.full(len(ring), ring_id))
+            polygon_index.append(len(owners))
+            ring_id += 1
+        owners.append(position)
+
+    result = np.full(len(cells), None, dtype=object)
+    if not owners:
+        return result
+
+    rings = shapely.linearrings(np.concatenate(coords), indices=np.concatenate(ring_index))
+    polygons = shapely.polygons(rings, indices=np.asarray(polygon_index))
+
+    if repair:
+        polygons = repair_polygons(polygons)
+
+    polygons[shapely.is_empty(polygons)] = None
+    result[np.asarray(owners)] = polygons
+    return result
+
+
+def repair_polygons(polygons) -> np.ndarray:
+    """
+    Repair only the invalid polygons of an array with buffer(0); None stays None.
+
+    Args:
+        polygons (array-like): Shapely polygons or None.
+
+    Returns:
+        np.ndarray: Object array of valid geometries or None.
+    """
+    polygons = np.array(polygons, dtype=object)
+    invalid = ~shapely.is_valid(polygons) & ~shapely.is_missing(polygons)
+    if invalid.any():
+        polygons[invalid] = shapely.buffer(polygons[invalid], 0)
+    return polygons
+
+
+def rings_from_polygons(polygons) -> list[str]:
+    """
+    Serialize polygons back to the JSON ring lists the scraper CSV uses
+    (shell first, then holes), '[]' for missing geometries.
+
+    Args:
+        polygons (array-like): Shapely Polygons or None.
+
+    Returns:
+        list[str]: One JSON string per polygon.
+    """
+    result = []
+    for polygon in polygons:
+        if polygon is None or polygon.is_empty or polygon.geom_type != "Polygon":
+            result.append("[]")
+            continue
+        rings = [polygon.exterior, *polygon.interiors]
+        result.append(json.dumps([np.asarray(ring.coords)[:, :2].tolist() for ring in rings]))
+    return result
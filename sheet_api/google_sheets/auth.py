@@ -32,6 +32,11 @@ def createService():
 
     return service
 
+def createDriveService():
+    service = build('drive', 'v3', credentials=creds)
+
+    return service
+
 def createEntryClient():
     client = gspread.authorize(creds)
     spreadsheet_id = "1kRw7FGZ99v8a16EoOE0L02ltxoo39dgGhJqO2QAZ81g"
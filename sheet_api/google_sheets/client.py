@@ -1,21 +1,29 @@
 import pandas as pd
 from .auth import createClient, createEntryClient
+from .snapshot import SpreadsheetSnapshot
+from .write_queue import getWriteQueue
 
 client, spreadsheet_id = createClient()
 entry_client, entry_spreadsheet_id = createEntryClient()
 
+# Every tab of the main spreadsheet, read in one batchGet and reused until it is edited
+SNAPSHOT = SpreadsheetSnapshot(client, spreadsheet_id)
+# Cell writes to the main spreadsheet, merged and sent in a few batchUpdate calls on flush()
+WRITE_QUEUE = getWriteQueue(spreadsheet_id)
+
 def getSheet(sheet_name:str, sheet_range:str):
 
-    sheet = client.open_by_key(spreadsheet_id).worksheet(sheet_name)
-    data = sheet.get(sheet_range)
+    # Queued writes first, so that reads see them
+    WRITE_QUEUE.flush()
+    sheet, data = SNAPSHOT.read(sheet_name, sheet_range)
     df = pd.DataFrame(data[1:], columns=data[0])
 
     return sheet, df
 
 def getSheetAll(sheet_name: str):
     
-    sheet = client.open_by_key(spreadsheet_id).worksheet(sheet_name)
-    data = sheet.get_all_values()
+    WRITE_QUEUE.flush()
+    sheet, data = SNAPSHOT.read(sheet_name)
     df = pd.DataFrame(data[1:], columns=data[0])
 
     return sheet, df
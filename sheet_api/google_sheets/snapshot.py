@@ -0,0 +1,196 @@
+from gspread.exceptions import WorksheetNotFound
+from gspread.utils      import a1_range_to_grid_range, fill_gaps
+
+import json
+import os
+import threading
+
+# On-disk copy of the last snapshot per spreadsheet, reused while the revision is unchanged
+SHEETS_CACHE_DIR = os.getenv("SHEETS_CACHE_DIR", os.path.join("datasets", "cache", "sheets"))
+
+# googleapiclient retries 429 / 5xx responses with exponential backoff
+API_RETRIES = 5
+
+
+def quoteTitle(title: str) -> str:
+    """A1 notation for a whole tab."""
+    return "'" + title.replace("'", "''") + "'"
+
+
+def sliceRange(values: list, sheet_range: str) -> list:
+    """
+    Cut an A1 range (e.g. 'A1:S246') out of a tab's values the way the API would
+    return it: trailing empty cells and rows dropped, [[]] when nothing is left.
+    """
+    grid = a1_range_to_grid_range(sheet_range)
+    rows = values[grid.get("startRowIndex", 0):grid.get("endRowIndex")]
+    start_col, end_col = grid.get("startColumnIndex", 0), grid.get("endColumnIndex")
+
+    result = []
+    for row in rows:
+        cells = row[start_col:end_col]
+        while cells and cells[-1] == "":
+            cells = cells[:-1]
+        result.append(cells)
+    while result and not result[-1]:
+        result.pop()
+    return result or [[]]
+
+
+class LazyWorksheet:
+    """
+    Stand-in for a gspread Worksheet. `id`, `title` and `spreadsheet_id` come from the snapshot;
+    any other attribute opens the real worksheet (one API call, once).
+    """
+
+    def __init__(self, snapshot, title: str, sheet_id: int):
+        self.title = title
+        self.id = sheet_id
+        self.spreadsheet_id = snapshot.spreadsheet_id
+        self._snapshot = snapshot
+        self._worksheet = None
+
+    def __getattr__(self, name):
+        if self._worksheet is None:
+            self._worksheet = self._snapshot.spreadsheet().worksheet(self.title)
+        return getattr(self._worksheet, name)
+
+    def __repr__(self):
+        return f"<LazyWorksheet {self.title!r} id:{self.id}>"
+
+
+class SpreadsheetSnapshot:
+    """
+    Every tab of a spreadsheet read with one values:batchGet call and kept in memory
+    and on disk together with the file's Drive revision ('version').
+
+    Each read first asks Drive for the current revision, which is a Drive call and
+    does not count against the Sheets quota. The cached values are served while
+    that revision is unchanged. Any edit, including this codebase's own writes,
+    bumps the revision, and the next read fetches all tabs again in one call.
+    """
+
+    def __init__(self, client, spreadsheet_id: str, cache_dir: str = SHEETS_CACHE_DIR):
+        self.client = client
+        self.spreadsheet_id = spreadsheet_id
+        self.cache_path = os.path.join(cache_dir, f"{spreadsheet_id}.json") if cache_dir else None
+        self.api_calls = 0
+        self._lock = threading.Lock()
+        self._data = None
+        self._spreadsheet = None
+        self._sheets_service = None
+        self._drive_service = None
+
+    def _services(self):
+        if self._sheets_service is None:
+            from sheet_api.google_sheets.auth import createDriveService, createService
+
+            self._sheets_service = createService()
+            self._drive_service = createDriveService()
+        return self._sheets_service, self._drive_service
+
+    def spreadsheet(self):
+        """The gspread Spreadsheet, opened on first use only."""
+        with self._lock:
+            if self._spreadsheet is None:
+                self.api_calls += 1
+                self._spreadsheet = self.client.open_by_key(self.spreadsheet_id)
+            return self._spreadsheet
+
+    def revision(self) -> str:
+        _, drive = self._services()
+        self.api_calls += 1
+        response = drive.files().get(
+            fileId=self.spreadsheet_id, fields="version", supportsAllDrives=True
+        ).execute(num_retries=API_RETRIES)
+        return str(response["version"])
+
+    def _fetch(self, version: str) -> dict:
+        sheets, _ = self._services()
+        self.api_calls += 2
+        meta = sheets.spreadsheets().get(
+            spreadsheetId=self.spreadsheet_id, fields="sheets.properties(sheetId,title)"
+        ).execute(num_retries=API_RETRIES)
+        properties = [sheet["properties"] for sheet in meta.get("sheets", [])]
+
+        response = sheets.spreadsheets().values().batchGet(
+            spreadsheetId=self.spreadsheet_id,
+            ranges=[quoteTitle(p["title"]) for p in properties],
+            majorDimension="ROWS",
+        ).execute(num_retries=API_RETRIES)
+
+        tabs = {
+            p["title"]: {"id": p["sheetId"], "values": value_range.get("values", [])}
+            for p, value_range in zip(properties, response.get("valueRanges", []))
+        }
+        print(f"Fetched {len(tabs)} tabs in one batchGet (revision {version})")
+        return {"version": version, "tabs": tabs}
+
+    def _readDisk(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as error:
+            print(f"[snapshot] Ignoring unreadable cache {self.cache_path}: {error}")
+            return None
+
+    def _writeDisk(self, data: dict):
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as error:
+            print(f"[snapshot] Could not write cache {self.cache_path}: {error}")
+
+    def load(self) -> dict:
+        """Current snapshot: memory, then disk, then one batchGet when the revision moved."""
+        version = self.revision()
+        with self._lock:
+            if self._data is not None and self._data["version"] == version:
+                return self._data
+
+            data = self._readDisk()
+            if data is None or data.get("version") != version:
+                data = self._fetch(version)
+                self._writeDisk(data)
+            self._data = data
+            return data
+
+    def invalidate(self):
+        """Drop the in-memory snapshot (the revision check already catches edits)."""
+        with self._lock:
+            self._data = None
+
+    def _tab(self, title: str) -> dict:
+        tab = self.load()["tabs"].get(title)
+        if tab is None:
+            raise WorksheetNotFound(title)
+        return tab
+
+    def worksheet(self, title: str) -> LazyWorksheet:
+        return LazyWorksheet(self, title, self._tab(title)["id"])
+
+    def read(self, title: str, sheet_range: str = None) -> tuple[LazyWorksheet, list]:
+        """
+        Worksheet and values of a tab from the current snapshot.
+
+        Args:
+            title (str): Tab name.
+            sheet_range (str): Optional A1 range, sliced like Worksheet.get(range);
+                the whole tab padded to a rectangle like Worksheet.get_all_values() if None.
+
+        Returns:
+            tuple[LazyWorksheet, list]: The worksheet and its list-of-rows values.
+        """
+        tab = self._tab(title)
+        if sheet_range:
+            values = sliceRange(tab["values"], sheet_range)
+        else:
+            values = fill_gaps([list(row) for row in tab["values"]])
+        return LazyWorksheet(self, title, tab["id"]), values
@@ -0,0 +1,248 @@
+from googleapiclient.errors import HttpError
+from random                 import random
+
+import atexit
+import json
+import numbers
+import threading
+import time
+
+# Sheets allows 60 write requests per minute per user; stay just below it
+WRITES_PER_MINUTE = 55
+
+# Pending cells that trigger a flush without waiting for an explicit flush()
+FLUSH_THRESHOLD = 50_000
+
+# Upper bound of one batchUpdate body (the API rejects bodies far above ~10 MB)
+MAX_PAYLOAD_BYTES = 2_000_000
+
+MAX_RETRIES = 6
+MAX_BACKOFF = 64
+
+
+def cellData(value) -> dict:
+    """
+    CellData for a Python value, typed like gspread's RAW input.
+
+    Dicts are taken as an ExtendedValue as-is (e.g. {'numberValue': 3}), None / NaN
+    clear the cell, numbers and booleans keep their type and anything else is text.
+    """
+    if isinstance(value, dict):
+        return {"userEnteredValue": value}
+    if value is None or (isinstance(value, float) and value != value):
+        return {}
+    if hasattr(value, "item"):
+        # numpy scalars
+        value = value.item()
+        if isinstance(value, float) and value != value:
+            return {}
+    if isinstance(value, bool):
+        return {"userEnteredValue": {"boolValue": value}}
+    if isinstance(value, numbers.Number):
+        return {"userEnteredValue": {"numberValue": value}}
+    return {"userEnteredValue": {"stringValue": str(value)}}
+
+
+def coalesce(cells: dict) -> list[tuple[int, int, int, list]]:
+    """
+    Merge single cells into as few rectangles as possible.
+
+    Contiguous cells of a row become one segment, then segments spanning the same
+    columns on consecutive rows are stacked.
+
+    Args:
+        cells (dict): CellData by 0-based (row, col).
+
+    Returns:
+        list[tuple[int, int, int, list]]: (start_row, start_col, end_col, rows) per rectangle,
+            `rows` holding one list of CellData per row (end_col exclusive).
+    """
+    segments = []
+    for row, col in sorted(cells):
+        last = segments[-1] if segments else None
+        if last and last[0] == row and last[2] == col:
+            last[2] += 1
+            last[3].append(cells[(row, col)])
+        else:
+            segments.append([row, col, col + 1, [cells[(row, col)]]])
+
+    rectangles = []
+    open_by_span = {}
+    for row, start_col, end_col, values in segments:
+        rect = open_by_span.get((start_col, end_col))
+        if rect and rect[0] + len(rect[3]) == row:
+            rect[3].append(values)
+        else:
+            rect = [row, start_col, end_col, [values]]
+            open_by_span[(start_col, end_col)] = rect
+            rectangles.append(rect)
+    return [tuple(rect) for rect in rectangles]
+
+
+class SheetWriteQueue:
+    """
+    Write-behind queue for cell updates of one spreadsheet.
+
+    Updates from any caller are collected per cell (the last write of a cell wins)
+    and sent by flush() as updateCells requests over merged rectangles, packed into
+    as few batchUpdate calls as the payload limit allows. Calls are spaced to stay
+    within the per-minute write quota; a 429 backs off exponentially and slows the
+    pace down until calls succeed again.
+    """
+
+    def __init__(self, spreadsheet_id: str, service=None, writes_per_minute: int = WRITES_PER_MINUTE,
+                 flush_threshold: int = FLUSH_THRESHOLD):
+        self.spreadsheet_id = spreadsheet_id
+        self.service = service
+        self.flush_threshold = flush_threshold
+        self.api_calls = 0
+        self._min_interval = 60 / writes_per_minute
+        self._interval = self._min_interval
+        self._last_call = 0.0
+        self._pending = {}
+        self._lock = threading.RLock()
+        atexit.register(self.flush)
+
+    def __len__(self):
+        return sum(len(cells) for cells in self._pending.values())
+
+    def updateCell(self, sheet_id: int, row: int, col: int, value):
+        """Queue one cell, 0-based grid row/column."""
+        self.updateCells(sheet_id, [(row, col, value)])
+
+    def updateCells(self, sheet_id: int, cells):
+        """
+        Queue cell values.
+
+        Args:
+            sheet_id (int): Worksheet id (gid).
+            cells (Iterable[tuple[int, int, Any]]): (row, col, value), 0-based grid indices
+                (the header row is row 0). See cellData() for how values are typed.
+        """
+        with self._lock:
+            pending = self._pending.setdefault(sheet_id, {})
+            for row, col, value in cells:
+                pending[(row, col)] = cellData(value)
+            full = len(self) >= self.flush_threshold
+        if full:
+            self.flush()
+
+    def updateColumn(self, sheet_id: int, col: int, values, start_row: int = 1):
+        """Queue consecutive values of one column, starting below the header by default."""
+        self.updateCells(sheet_id, ((start_row + i, col, v) for i, v in enumerate(values)))
+
+    def updateGspreadCells(self, sheet_id: int, cells):
+        """Queue gspread Cell objects (1-based row/col)."""
+        self.updateCells(sheet_id, ((c.row - 1, c.col - 1, c.value) for c in cells))
+
+    def _requests(self, pending: dict) -> list[dict]:
+        requests = []
+        for sheet_id, cells in pending.items():
+            for start_row, start_col, end_col, rows in coalesce(cells):
+                # Split tall rectangles so that a single request fits one call
+                size = len(json.dumps(rows))
+                step = max(1, int(len(rows) * MAX_PAYLOAD_BYTES * 0.9) // size) if size else len(rows)
+                for offset in range(0, len(rows), step):
+                    chunk = rows[offset:offset + step]
+                    requests.append({
+                        "updateCells": {
+                            "range": {
+                                "sheetId": sheet_id,
+                                "startRowIndex": start_row + offset,
+                                "endRowIndex": start_row + offset + len(chunk),
+                                "startColumnIndex": start_col,
+                                "endColumnIndex": end_col,
+                            },
+                            "rows": [{"values": values} for values in chunk],
+                            "fields": "userEnteredValue",
+                        }
+                    })
+        return requests
+
+    def _send(self, requests: list[dict]):
+        if self.service is None:
+            from sheet_api.google_sheets.auth import createService
+
+            self.service = createService()
+
+        for attempt in range(MAX_RETRIES + 1):
+            wait = self._last_call + self._interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_call = time.monotonic()
+            self.api_calls += 1
+            try:
+                response = self.service.spreadsheets().batchUpdate(
+                    spreadsheetId=self.spreadsheet_id, body={"requests": requests}
+                ).execute()
+                # Recover the pace gradually after a rate limit
+                self._interval = max(self._min_interval, self._interval * 0.75)
+                return response
+            except HttpError as error:
+                status = getattr(error.resp, "status", None)
+                if status not in (429, 500, 502, 503) or attempt == MAX_RETRIES:
+                    raise
+                if status == 429:
+                    self._interval = min(self._interval * 2, 60)
+                backoff = min(2 ** attempt + random(), MAX_BACKOFF)
+                print(f"[write_queue] HTTP {status}, retry {attempt + 1}/{MAX_RETRIES} in {backoff:.1f}s")
+                time.sleep(backoff)
+
+    def _requeue(self, pending: dict, batches: list[list[dict]]):
+        # Put back the cells of unsent batches, keeping any newer write of the same cell
+        for batch in batches:
+            for request in batch:
+                grid = request["updateCells"]["range"]
+                cells = self._pending.setdefault(grid["sheetId"], {})
+                for row in range(grid["startRowIndex"], grid["endRowIndex"]):
+                    for col in range(grid["startColumnIndex"], grid["endColumnIndex"]):
+                        cells.setdefault((row, col), pending[grid["sheetId"]][(row, col)])
+
+    def flush(self) -> int:
+        """
+        Send every pending update. If a call still fails after its retries, the cells
+        of that call and of the calls after it go back to the queue (so a later flush()
+        or the exit hook can resume) and the error is raised.
+
+        Returns:
+            int: Number of cells written.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            cell_count = sum(len(cells) for cells in pending.values())
+            if not cell_count:
+                return 0
+
+            requests = self._requests(pending)
+            batches, batch, batch_size = [], [], 0
+            for request in requests:
+                size = len(json.dumps(request))
+                if batch and batch_size + size > MAX_PAYLOAD_BYTES:
+                    batches.append(batch)
+                    batch, batch_size = [], 0
+                batch.append(request)
+                batch_size += size
+            batches.append(batch)
+
+            for idx, batch in enumerate(batches):
+                try:
+                    self._send(batch)
+                except Exception:
+                    self._requeue(pending, batches[idx:])
+                    print(f"[write_queue] {len(self)} cells left queued after a failed batchUpdate")
+                    raise
+
+        print(f"[write_queue] Wrote {cell_count} cells as {len(requests)} ranges in {len(batches)} batchUpdate calls")
+        return cell_count
+
+
+_QUEUES = {}
+_QUEUES_LOCK = threading.Lock()
+
+
+def getWriteQueue(spreadsheet_id: str) -> SheetWriteQueue:
+    """Process-wide write queue of a spreadsheet, created on first use."""
+    with _QUEUES_LOCK:
+        if spreadsheet_id not in _QUEUES:
+            _QUEUES[spreadsheet_id] = SheetWriteQueue(spreadsheet_id)
+        return _QUEUES[spreadsheet_id]
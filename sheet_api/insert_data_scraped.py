@@ -1,12 +1,11 @@
-from rapidfuzz                          import process, fuzz
 from gspread                            import Cell
 
 from sheet_api.insert_site_name_scraped import merge_coal_databases, get_data_sheet
 from sheet_api.google_sheets.auth       import createClient
 from sheet_api.link_site_name           import safe_update
+from scripts.fuzzy_matcher              import CompanyMatcher
 
 import gspread
-import re 
 import json
 import pandas as pd 
 
@@ -18,47 +17,6 @@ COLS_TO_WRITE = ['company_id','*company_name' ,'*name_scraped',
                  '*total_reserve','*year_measured',
                  'location','resources_reserves', 'mineral_type']
 
-def clean_company_name(name: str) -> tuple[str, str]:
-    """
-    Clean a company name by removing 'PT' and 'Tbk', lowercasing, and stripping spaces.
-
-    Args:
-        name (str): Original company name.
-
-    Returns:
-        tuple[str, str]: (cleaned name, cleaned name with no spaces)
-    """
-    if pd.isna(name):
-        return "", ""
-
-    cleaned = re.sub(r"\b(PT|Tbk)\b", "", str(name), flags=re.IGNORECASE).strip()
-    cleaned = re.sub(r"\s+", " ", cleaned).lower().strip()
-    cleaned_no_space = cleaned.replace(" ", "")
-    return cleaned, cleaned_no_space
-
-def clean_company_df(df: pd.DataFrame, company_column: str) -> pd.DataFrame:
-    """
-    Add cleaned company name columns to a DataFrame and return the cleaned names list.
-
-    Args:
-        df (pd.DataFrame): DataFrame with a company name column.
-        company_column (str): Name of the column containing company names.
-
-    Returns:
-        pd.DataFrame: DataFrame with extra cleaning columns added.
-    """
-    df = df.copy()
-
-    # Apply cleaning function to get both cleaned versions
-    df[['name_cleaned', 'name_cleaned_no_space']] = (
-        pd.DataFrame(
-            df[company_column].apply(clean_company_name).tolist(),
-            index=df.index
-        )
-    )
-
-    return df
-
 def format_output(results:list, fuzzy_scores: dict,
                   src_idx: int, tgt_idx: int, 
                   df_company: pd.DataFrame, df_merged_filter: pd.DataFrame) -> None: 
@@ -117,50 +75,21 @@ def matching_company(df_merged_filter: pd.DataFrame,
             - company_id, *company_name, matched_name, *name_scraped, *province, etc.
             - matching_score obtained via exact or fuzzy matching.
     """
-    # Clean both DataFrames
-    df_company_clean    = clean_company_df(df_company,      'name')
-    df_merged_clean     = clean_company_df(df_merged_filter,'nama_usaha')
+    # Index the scraped names once, then match every company in one batch
+    matcher = CompanyMatcher(df_merged_filter['nama_usaha'])
+    all_matches = matcher.match_all(df_company['name'], threshold=threshold)
 
     results = []
-
-    # Pre-extract the list of normalized names for fuzzy matching
-    clean_list = df_merged_clean['name_cleaned'].tolist()
-
-    # Iterate through each source company
-    for src_idx, src_row in df_company_clean.iterrows():
-        key       = src_row['name_cleaned']
-        key_nospc = src_row['name_cleaned_no_space']
-
-        # Exact matches on cleaned-with-spaces
-        matches = df_merged_clean[df_merged_clean['name_cleaned'] == key]
-
-        # Fallback to exact on no-space
-        if matches.empty:
-            matches = df_merged_clean[df_merged_clean['name_cleaned_no_space'] == key_nospc]
-
-        # If still no exact matches, perform fuzzy matching
-        fuzzy_scores = {}
-        if matches.empty:
-            all_ext = process.extract(
-                query=key,
-                choices=clean_list,
-                scorer=fuzz.token_sort_ratio,
-                limit=None
-            )
-            # keep only those above threshold
-            for match_str, score, pos in all_ext:
-                if score < threshold:
-                    break
-                idx_in_df = df_merged_clean.index[pos]
-                fuzzy_scores[idx_in_df] = score
-
-            # slice df to just those indices
-            matches = df_merged_clean.loc[list(fuzzy_scores.keys())]
+    for src_idx, matches in zip(df_company.index, all_matches):
+        # Exact matches score 100, fuzzy ones keep their score
+        fuzzy_scores = {
+            df_merged_filter.index[m.position]: m.score for m in matches if m.kind == 'fuzzy'
+        }
 
         # Record every match by formatting into a result entry
-        for tgt_idx, tgt_row in matches.iterrows():
+        for match in matches:
             format_output(results, fuzzy_scores, 
-                          src_idx, tgt_idx, 
+                          src_idx, df_merged_filter.index[match.position], 
                           df_company, df_merged_filter)
 
     return pd.DataFrame(results)
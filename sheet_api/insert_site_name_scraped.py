@@ -1,14 +1,12 @@
-from shapely.geometry               import shape, Point, Polygon
-from pyproj                         import Transformer
 from gspread                        import Cell
 from pyproj                         import Transformer
-from typing                         import Optional, Any, Tuple
+from typing                         import Any, Tuple
 
 from sheet_api.google_sheets.auth   import createClient
 from sheet_api.link_site_name       import safe_update
+from sheet_api.geometry             import points_from_lonlat, repair_polygons
+from scrapper.esdm_minerba          import read_wiup_dataset
 
-import json 
-import time
 import pandas    as pd 
 import geopandas as gpd
 
@@ -51,63 +49,6 @@ def check_column_exists(sheet_name: str, column_header: str,
         print(f"Error ensuring column exists: {error}")
         raise
 
-def create_buffered_point(row: pd.Series, transformer: Transformer) -> Optional[Point]:
-    """
-    Converts latitude and longitude from a DataFrame row into a projected Point.
-
-    Args:
-        row (pd.Series): Row containing 'latitude' and 'longitude'.
-        transformer (Transformer): Pyproj transformer to convert coordinates.
-
-    Returns:
-        Optional[Point]: Shapely Point in projected coordinates or None if invalid.
-    """
-    try:
-        if pd.notna(row['latitude']) and pd.notna(row['longitude']):
-            x, y = transformer.transform(row['longitude'], row['latitude'])
-            point = Point(x, y)
-            return point   
-        return None
-    except Exception as error:
-        print(f"Error creating buffered point: {error}")
-        return None
-
-def coords_to_polygon(coords: Any) -> Optional[Polygon]:
-    """
-    Converts a list or JSON string of coordinates into a valid Shapely Polygon.
-    Repairs self-intersecting or invalid polygons if needed.
-
-    Args:
-        coords (Any): JSON string or Python list of polygon coordinates.
-
-    Returns:
-        Optional[Polygon]: Valid Shapely Polygon or None if input is invalid or conversion fails.
-    """
-    if pd.isna(coords) or not coords:
-        return None
-    
-    try:
-        if isinstance(coords, str):
-            coords = json.loads(coords)
-
-        if isinstance(coords, list) and len(coords) > 0:
-            if isinstance(coords[0], list) and len(coords[0]) == 2:
-                polygon = Polygon(coords)
-            else:
-                # GeoJSON-style nested list
-                polygon = shape({"type": "Polygon", "coordinates": coords})
-
-            # Attempt to fix invalid polygon geometries
-            if not polygon.is_valid:
-                polygon = polygon.buffer(0)
-
-            return polygon if not polygon.is_empty else None
-        return None
-
-    except Exception as error:
-        print(f"Error converting coordinates to polygon: {error}")
-        return None
-        
 def merge_coal_databases(path_esdm: str, path_minerba:str, komoditas: str,
                          is_saved: bool = False, is_insert_data: bool = False) -> pd.DataFrame:
     """
@@ -116,7 +57,8 @@ def merge_coal_databases(path_esdm: str, path_minerba:str, komoditas: str,
 
     Args:
         path_esdm (str): File path to the ESDM CSV containing point coordinates.
-        path_minerba (str): File path to the Minerba CSV containing polygon geometries.
+        path_minerba (str): File path to the Minerba CSV containing polygon geometries
+                            (the GeoParquet file next to it is used when available).
         komoditas (str): Commodity name used to filter results when insertion mode is enabled.
         is_saved (bool): If True, write the full merged GeoDataFrame to "merged_esdm_coal_and_minerba.csv".
         is_insert_data (bool): If True, filter out records without a matched company and by `komoditas`.
@@ -130,23 +72,24 @@ def merge_coal_databases(path_esdm: str, path_minerba:str, komoditas: str,
     
     # Load the datasets
     esdm = pd.read_csv(path_esdm)
-    minerba = pd.read_csv(path_minerba)
+    minerba = read_wiup_dataset(path_minerba)
 
     print(f"ESDM records: {len(esdm)}")
     print(f"Minerba records: {len(minerba)}")
 
-    # Convert ESDM coordinates into shapely Point using projected CRS
+    # Convert ESDM coordinates into shapely Point using projected CRS (one batched transform)
     transformer = Transformer.from_crs("EPSG:4326", "EPSG:3857", always_xy=True)
-    esdm['geometry'] = esdm.apply(lambda row: create_buffered_point(row, transformer), axis=1)
+    esdm['geometry'] = points_from_lonlat(esdm['longitude'], esdm['latitude'], transformer)
     esdm_gdf = gpd.GeoDataFrame(esdm, geometry='geometry', crs="EPSG:3857")
 
-    # Convert Minerba stringified polygons to valid Shapely geometries
-    minerba['geometry_shapely'] = minerba['geometry'].apply(coords_to_polygon)
+    # Polygons come straight from the dataset, only invalid ones need repair
+    minerba = pd.DataFrame(minerba.rename(columns={'geometry': 'geometry_shapely'}))
+    minerba['geometry_shapely'] = repair_polygons(minerba['geometry_shapely'].to_numpy())
     minerba_gdf = gpd.GeoDataFrame(minerba, geometry='geometry_shapely', crs="EPSG:3857")
 
     # Remove rows with no geometry
     esdm_gdf = esdm_gdf.dropna(subset=['geometry'])
-    minerba_gdf = minerba_gdf.dropna(subset=['geometry'])
+    minerba_gdf = minerba_gdf.dropna(subset=['geometry_shapely'])
 
     print(f"ESDM with valid geometry: {len(esdm_gdf)}")
     print(f"Minerba with valid geometry: {len(minerba_gdf)}")
@@ -166,9 +109,8 @@ def merge_coal_databases(path_esdm: str, path_minerba:str, komoditas: str,
         merged = merged[['object_name','nama_usaha','longitude', 
                         'latitude','geometry','badan_usaha']]
     
-    # Drop auto-generated index columns if present
-    if 'Unnamed: 0__esdm' in merged.columns or 'Unnamed: 0__minerba' in merged.columns:
-        merged.drop(columns=['Unnamed: 0__esdm', 'Unnamed: 0__minerba'], inplace=True)
+    # Drop the ESDM CSV's auto-generated index column if present
+    merged = merged.drop(columns=[c for c in merged.columns if str(c).startswith('Unnamed: 0')])
 
     # When insertion mode is on, filter to matched companies and by commodity
     if is_insert_data and komoditas is not None:
@@ -449,20 +391,8 @@ def write_into_sheet(final_df: pd.DataFrame,
         print("No updates to perform")
         return
     
-    # Perform batched API calls to update sheet
-    cell_batch = []
-    for row, col, val in updates:
-        # Create Cell object with sanitized value
-        cell_batch.append(Cell(row, col, val))
-        if len(cell_batch) >= 50:
-            # Flush batch when it reaches threshold
-            safe_update(mining_sheet, cell_batch)
-            cell_batch.clear()
-            time.sleep(0.3)
-    
-    # Flush any remaining cells
-    if cell_batch:
-        safe_update(mining_sheet, cell_batch)
+    # Merged into ranges and written in as few API calls as possible
+    safe_update(mining_sheet, [Cell(row, col, val) for row, col, val in updates])
     
     print(f"Successfully updated {len(updates)} name_scraped values")
     
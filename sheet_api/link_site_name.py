@@ -1,15 +1,14 @@
-from shapely.geometry                   import shape, Point, Polygon
+from shapely.geometry                   import shape, Polygon
 from pyproj                             import Transformer
-from random                             import random
-from gspread.exceptions                 import APIError
 from gspread                            import Cell
 from typing                             import Optional
 from shapely.ops                        import unary_union
 
 from sheet_api.google_sheets.client     import getSheet
+from sheet_api.google_sheets.write_queue import getWriteQueue
+from sheet_api.spatial_index            import PolygonIndex, load_cached_geometries
 
 import json 
-import time
 import gspread
 import pandas as pd 
 
@@ -77,36 +76,27 @@ def extract_geometry_from_license(lic_cell: str) -> Optional[Polygon]:
     combined = unary_union(valid_polygons)
     return combined
 
-def safe_update(sheet: gspread.Spreadsheet, cell_list: list[Cell], max_retries: int = 5) -> None:
+def safe_update(sheet: gspread.Worksheet, cell_list: list[Cell]) -> int:
     """
-    Perform batched cell updates with exponential backoff on rate limiting.
+    Write cells through the spreadsheet's write queue: adjacent cells are merged into
+    ranges and sent in as few batchUpdate calls as possible, paced to the write quota
+    with backoff on HTTP 429 errors.
 
     Args:
-        sheet (gspread.Spreadsheet): Gspread sheet instance to update.
+        sheet (gspread.Worksheet): Worksheet to update.
         cell_list (List[Cell]): List of Cell objects to write.
-        max_retries (int): Maximum retry attempts on HTTP 429 errors.
+
+    Returns:
+        int: Number of cells written.
     """
-    retries = 0
-    while True:
-        try:
-            sheet.update_cells(cell_list)
-            return
-        except APIError as error:
-            status = getattr(error.response, 'status_code', None)
-            # Handle rate limiting
-            if status == 429 and retries < max_retries:
-                wait = min((2 ** retries) + random(), 60)
-                print(f"Rate limited (429). Retry {retries + 1}/{max_retries} in {wait:.1f}s")
-                time.sleep(wait)
-                retries += 1
-            else:
-                # Unrecoverable or max retries reached
-                print(f"[safe_update] APIError after {retries} retries: {error}")
-                raise
+    queue = getWriteQueue(sheet.spreadsheet_id)
+    queue.updateGspreadCells(sheet.id, cell_list)
+    return queue.flush()
 
 def get_sheet_company(sheet_name: str, range_cells: str) -> pd.DataFrame:
     """
     Retrieve company sheet data and attach a 'polygon' column from 'mining_license'.
+    Polygons are reused from the on-disk cache while the license cells are unchanged.
 
     Args:
         sheet_name (str): Name of the Google sheet to read.
@@ -116,8 +106,12 @@ def get_sheet_company(sheet_name: str, range_cells: str) -> pd.DataFrame:
         pd.DataFrame: DataFrame with an additional 'polygon' column.
     """
     _, company_df = getSheet(sheet_name, range_cells)
-    # Apply geometry extraction for each mining_license entry
-    company_df["polygon"] = company_df["mining_license"].apply(extract_geometry_from_license)
+    # Apply geometry extraction for each mining_license entry (cached)
+    company_df["polygon"] = load_cached_geometries(
+        "company_license",
+        company_df["mining_license"],
+        lambda cells: [extract_geometry_from_license(cell) for cell in cells],
+    )
     return company_df
 
 def get_sheet_mining_site(sheet_name: str, range_cells: str) -> tuple[gspread.Spreadsheet, pd.DataFrame]:
@@ -148,44 +142,29 @@ def auto_link():
     # Transformer for coordinate projection
     transformer = Transformer.from_crs("EPSG:4326", "EPSG:3857", always_xy=True)
 
+    # Transform every site into WebMercator at once, then look all of them up in one query
+    xs, ys = transformer.transform(ms_df["lng"].to_numpy(), ms_df["lat"].to_numpy())
+    company_index = PolygonIndex(c_df["polygon"])
+    positions = company_index.locate(xs, ys)
+
     updates = []
+    col = ms_df.columns.get_loc("*company_name") + 1
     
-    # Iterate sites and match
-    for idx, site in ms_df.iterrows():
-        lat, lng = site["lat"], site["lng"]
-        if pd.isna(lat) or pd.isna(lng):
+    for idx, position in zip(ms_df.index, positions):
+        site = ms_df.loc[idx]
+        if pd.isna(site["lat"]) or pd.isna(site["lng"]):
             continue
 
-        # Transform the point into WebMercator
-        x, y = transformer.transform(lng, lat)
-        pt = Point(x, y)
-
-        # Only test contains if the polygon exists
-        matched = c_df[
-            c_df["polygon"]
-                .apply(lambda poly: poly.contains(pt) if poly is not None else False)
-        ]
-
-        if not matched.empty:
-            company_name = matched.iloc[0]["name"]
+        if position >= 0:
+            company_name = c_df.iloc[position]["name"]
             # sheet rows start at header row + 1
             row = idx + 2  
-            col = ms_df.columns.get_loc("*company_name") + 1
             updates.append((row, col, company_name))
         else:
             print(f"No company contains site '{site.get('name')}'")
 
-    # Batch write updates back to sheet
-    cell_batch = []
-    for row, col, val in updates:
-        cell_batch.append(Cell(row, col, val))
-        if len(cell_batch) >= 50:  
-            safe_update(ms_sheet, cell_batch)
-            cell_batch.clear()
-            time.sleep(0.3) 
-
-    if cell_batch:
-        safe_update(ms_sheet, cell_batch)
+    # Write all updates back to the sheet in one queued batch
+    safe_update(ms_sheet, [Cell(row, col, val) for row, col, val in updates])
 
     print(f"Wrote {len(updates)} company_id values to mining_site sheet.")
 
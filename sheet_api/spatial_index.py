@@ -0,0 +1,115 @@
+from shapely                            import STRtree
+
+import hashlib
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import shapely
+
+# On-disk cache of parsed license polygons, keyed by a hash of the source cells
+SPATIAL_CACHE_DIR = os.getenv("SPATIAL_CACHE_DIR", os.path.join("datasets", "cache"))
+
+
+def hash_cells(cells) -> str:
+    """
+    Hash a sequence of cell values into a short hex digest.
+
+    Args:
+        cells (Iterable): Cell values, e.g. a DataFrame column.
+
+    Returns:
+        str: Hex digest identifying the exact content.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for cell in cells:
+        digest.update(str(cell).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def load_cached_geometries(name: str, cells, build) -> list:
+    """
+    Return the geometries built from `cells`, reusing the on-disk WKB cache when the
+    cells did not change since the last build.
+
+    Args:
+        name (str): Cache name, e.g. 'company_license'.
+        cells (pd.Series): Source cells the geometries are built from.
+        build (Callable): Function turning the cells into a list of geometries (or None).
+
+    Returns:
+        list: One geometry (or None) per cell.
+    """
+    digest = hash_cells(cells)
+    path = os.path.join(SPATIAL_CACHE_DIR, f"{name}.pkl")
+
+    if os.path.exists(path):
+        try:
+            with open(path, "rb") as f:
+                cached = pickle.load(f)
+            if cached.get("digest") == digest:
+                return list(shapely.from_wkb(cached["wkb"]))
+        except Exception as error:
+            print(f"[spatial_index] Ignoring unreadable cache {path}: {error}")
+
+    geometries = list(build(cells))
+
+    try:
+        os.makedirs(SPATIAL_CACHE_DIR, exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump({"digest": digest, "wkb": shapely.to_wkb(np.array(geometries, dtype=object))}, f)
+    except OSError as error:
+        print(f"[spatial_index] Could not write cache {path}: {error}")
+
+    return geometries
+
+
+class PolygonIndex:
+    """
+    STRtree over a list of (possibly missing) polygons with prepared geometries,
+    answering point-in-polygon lookups for many points in one bulk query.
+    Positions returned refer to the order of the input list.
+    """
+
+    def __init__(self, polygons):
+        polygons = np.array(list(polygons), dtype=object)
+        present = np.array([p is not None and not p.is_empty for p in polygons], dtype=bool)
+
+        self.positions = np.flatnonzero(present)
+        self.geometries = polygons[present]
+        shapely.prepare(self.geometries)
+        self.tree = STRtree(self.geometries)
+
+    def __len__(self) -> int:
+        return len(self.geometries)
+
+    def locate(self, xs, ys) -> np.ndarray:
+        """
+        Find, for every point, the first polygon containing it.
+
+        Args:
+            xs (array-like): Point x coordinates (same CRS as the polygons), NaN to skip.
+            ys (array-like): Point y coordinates.
+
+        Returns:
+            np.ndarray: Input position of the first containing polygon per point, -1 if none.
+        """
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        result = np.full(len(xs), -1, dtype=np.int64)
+
+        valid = ~(np.isnan(xs) | np.isnan(ys))
+        if not valid.any() or not len(self):
+            return result
+
+        point_ids = np.flatnonzero(valid)
+        points = shapely.points(xs[valid], ys[valid])
+        hit_points, hit_trees = self.tree.query(points, predicate="within")
+
+        # Keep the lowest input position per point (first company in sheet order)
+        hits = pd.DataFrame({"point": point_ids[hit_points], "position": self.positions[hit_trees]})
+        first = hits.groupby("point")["position"].min()
+        result[first.index.to_numpy()] = first.to_numpy()
+        return result
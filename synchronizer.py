@@ -14,7 +14,7 @@ from sheet_api.db.models import (
     ExportDestination,
     GlobalCommodityData,
 )
-from sheet_api.google_sheets.client import getSheet, getSheetAll
+from sheet_api.google_sheets.client import WRITE_QUEUE, getSheet, getSheetAll
 from sheet_api.core.toolbox import castTypes, mapPeeweeToPandasFields
 from sheet_api.core.company_performance_restructure import (
     update_new_company_performance,
@@ -69,6 +69,7 @@ def companyPreprocess(df: pd.DataFrame, field_types: dict, sheet):
     # 3. Fill out mining contracts
     print("Filling out company's mining_contracts...")
     df = fillMiningContract(df, sheet.id)
+    WRITE_QUEUE.flush()
 
     return df, field_types, sheet
 
@@ -85,6 +86,7 @@ def miningSitePreprocess(df: pd.DataFrame, field_types: dict, sheet):
         ("*longitude", float),
     ]
     compileToJsonBatch(df, location, "location", sheet.id)
+    WRITE_QUEUE.flush()
 
     return df, field_types, sheet
 
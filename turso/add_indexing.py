@@ -1,25 +1,10 @@
 import os
+import re
 from dotenv import load_dotenv
 from libsql_client import create_client_sync
 
 load_dotenv()  # load variables from .env
 
-# Load Turso URL and auth token from environment
-raw_url = os.getenv("TURSO_DATABASE_URL", "")
-auth_token = os.getenv("TURSO_AUTH_TOKEN")
-
-if not raw_url or not auth_token:
-    print("Missing Turso credentials, exiting.")
-    exit(1)
-
-# Normalize URL for HTTP access
-if raw_url.startswith("wss://"):
-    db_url = "https://" + raw_url[len("wss://") :]
-elif raw_url.startswith("libsql://"):
-    db_url = "https://" + raw_url[len("libsql://") :]
-else:
-    db_url = raw_url
-
 # Index creation statements, sorted by impact ranking
 INDEX_STATEMENTS = [
     # --- Highest Impact ---
@@ -38,7 +23,40 @@ INDEX_STATEMENTS = [
 ]
 
 
+def get_index_statements(table: str) -> list[str]:
+    """
+    Get the index creation statements that target a given table.
+
+    Args:
+        table (str): The table name.
+
+    Returns:
+        list[str]: Matching statements from INDEX_STATEMENTS.
+    """
+    return [
+        sql
+        for sql in INDEX_STATEMENTS
+        if re.search(rf"\bON\s+{table}\s*\(", sql, re.IGNORECASE)
+    ]
+
+
 def main():
+    # Load Turso URL and auth token from environment
+    raw_url = os.getenv("TURSO_DATABASE_URL", "")
+    auth_token = os.getenv("TURSO_AUTH_TOKEN")
+
+    if not raw_url or not auth_token:
+        print("Missing Turso credentials, exiting.")
+        exit(1)
+
+    # Normalize URL for HTTP access
+    if raw_url.startswith("wss://"):
+        db_url = "https://" + raw_url[len("wss://") :]
+    elif raw_url.startswith("libsql://"):
+        db_url = "https://" + raw_url[len("libsql://") :]
+    else:
+        db_url = raw_url
+
     client = create_client_sync(url=db_url, auth_token=auth_token)
 
     try:
@@ -0,0 +1,403 @@
+from libsql_client import Statement
+
+import logging
+import time
+
+LOGGER = logging.getLogger(__name__)
+
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER (3.32+), also used by libsql
+MAX_PARAMS_PER_STATEMENT = 32766
+
+# Upper bound for one multi-row INSERT (SQL text + bound values, in bytes).
+# Kept below SQLite's default SQLITE_MAX_SQL_LENGTH so statements are never rejected
+MAX_STATEMENT_BYTES = 900_000
+
+# Smallest statement budget we shrink to before giving up on a table
+MIN_STATEMENT_BYTES = 8_000
+
+# Upper bound for the statements of one client.batch() request when a load may be
+# split across requests. The wire encoding adds per-value overhead on top of the
+# estimate, so this stays well below common HTTP body limits
+MAX_REQUEST_BYTES = 4_000_000
+
+# Smallest request budget we shrink to on HTTP 413 before giving up on a table
+MIN_REQUEST_BYTES = 64_000
+
+# OR-chained key matches per DELETE, kept well under SQLITE_MAX_EXPR_DEPTH (1000)
+MAX_OR_TERMS_PER_STATEMENT = 200
+
+# Fragments of error messages that mean "this statement is too large"
+SIZE_ERROR_MARKERS = (
+    "too many sql variables",
+    "too big",
+    "too large",
+)
+
+# Fragments meaning the whole client.batch() request body is too large (HTTP 413).
+# Smaller statements inside the same request do not help, so these are not retried
+REQUEST_SIZE_ERROR_MARKERS = (
+    "413",
+    "payload",
+    "entity too large",
+)
+
+
+def estimate_value_size(value) -> int:
+    """
+    Roughly estimate how many bytes a bound value adds to a statement.
+
+    Args:
+        value: A single column value fetched from SQLite.
+
+    Returns:
+        int: Estimated size in bytes.
+    """
+    if value is None:
+        return 4
+    if isinstance(value, (str, bytes)):
+        return len(value) + 8
+    return 16
+
+
+def estimate_row_size(row: dict, cols: list) -> int:
+    """
+    Roughly estimate how many bytes a row adds to a multi-row INSERT.
+
+    Args:
+        row (dict): The row.
+        cols (list): Column names, in insert order.
+
+    Returns:
+        int: Estimated size in bytes.
+    """
+    # Every row contributes "(?, ?, ...)," to the SQL text as well
+    return 3 * len(cols) + 3 + sum(estimate_value_size(row[c]) for c in cols)
+
+
+def chunk_rows(rows: list, cols: list, max_bytes: int) -> list:
+    """
+    Split rows into chunks that fit in a single multi-row INSERT.
+    A chunk is closed when it would exceed either the bound-parameter limit
+    or the statement byte budget.
+
+    Args:
+        rows (list): A list of dictionaries representing the rows.
+        cols (list): Column names, in insert order.
+        max_bytes (int): Byte budget for a single statement.
+
+    Returns:
+        list: A list of row chunks (each a list of dictionaries).
+    """
+    max_rows = max(1, MAX_PARAMS_PER_STATEMENT // max(1, len(cols)))
+
+    chunks = []
+    current = []
+    current_bytes = 0
+    for row in rows:
+        row_bytes = estimate_row_size(row, cols)
+        if current and (
+            len(current) >= max_rows or current_bytes + row_bytes > max_bytes
+        ):
+            chunks.append(current)
+            current = []
+            current_bytes = 0
+        current.append(row)
+        current_bytes += row_bytes
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def build_insert_sql(
+    table: str, cols: list, n_rows: int, conflict_cols: list | None = None
+) -> str:
+    """
+    Build a multi-row INSERT statement, optionally as an UPSERT.
+
+    Args:
+        table (str): Target table name.
+        cols (list): Column names, in insert order.
+        n_rows (int): Number of VALUES tuples in the statement.
+        conflict_cols (list | None): Primary-key columns for ON CONFLICT. Plain INSERT if None.
+
+    Returns:
+        str: The SQL statement with positional placeholders.
+    """
+    col_list = ", ".join(cols)
+    row_placeholder = "(" + ", ".join("?" for _ in cols) + ")"
+    values = ", ".join(row_placeholder for _ in range(n_rows))
+    sql = f"INSERT INTO {table} ({col_list}) VALUES {values}"
+
+    if conflict_cols:
+        conflict_clause = ", ".join(conflict_cols)
+        update_clause = ", ".join(
+            f"{c}=excluded.{c}" for c in cols if c not in conflict_cols
+        )
+        if update_clause:
+            sql += f" ON CONFLICT({conflict_clause}) DO UPDATE SET {update_clause}"
+        else:
+            sql += f" ON CONFLICT({conflict_clause}) DO NOTHING"
+
+    return sql + ";"
+
+
+def build_insert_statements(
+    table: str,
+    rows: list,
+    conflict_cols: list | None = None,
+    max_bytes: int = MAX_STATEMENT_BYTES,
+) -> list[Statement]:
+    """
+    Turn rows into as few multi-row INSERT statements as the size limits allow.
+
+    Args:
+        table (str): Target table name.
+        rows (list): A list of dictionaries representing the rows.
+        conflict_cols (list | None): Primary-key columns for ON CONFLICT. Plain INSERT if None.
+        max_bytes (int): Byte budget for a single statement.
+
+    Returns:
+        list[Statement]: Statements ready for client.batch().
+    """
+    if not rows:
+        return []
+
+    cols = list(rows[0].keys())
+    statements = []
+    for chunk in chunk_rows(rows, cols, max_bytes):
+        sql = build_insert_sql(table, cols, len(chunk), conflict_cols)
+        params = [row[c] for row in chunk for c in cols]
+        statements.append(Statement(sql, params))
+    return statements
+
+
+def take_request_rows(rows: list, cols: list, max_bytes: int) -> list:
+    """
+    Leading rows that fit in one client.batch() request (at least one row).
+
+    Args:
+        rows (list): A list of dictionaries representing the rows.
+        cols (list): Column names, in insert order.
+        max_bytes (int): Byte budget for a single request.
+
+    Returns:
+        list: The first rows of `rows`.
+    """
+    total = 0
+    for idx, row in enumerate(rows):
+        total += estimate_row_size(row, cols)
+        if idx and total > max_bytes:
+            return rows[:idx]
+    return rows
+
+
+def is_request_size_error(error: Exception) -> bool:
+    """
+    Check whether a whole client.batch() request was rejected as too large (HTTP 413).
+
+    Args:
+        error (Exception): The error raised by the client.
+
+    Returns:
+        bool: True if sending fewer statements per request might fix the error.
+    """
+    message = str(error).lower()
+    return any(marker in message for marker in REQUEST_SIZE_ERROR_MARKERS)
+
+
+def is_size_error(error: Exception) -> bool:
+    """
+    Check whether an error was caused by a single statement being too large.
+    A request rejected as a whole (HTTP 413) is not a statement size error.
+
+    Args:
+        error (Exception): The error raised by the client.
+
+    Returns:
+        bool: True if shrinking the statements might fix the error.
+    """
+    if is_request_size_error(error):
+        return False
+    message = str(error).lower()
+    return any(marker in message for marker in SIZE_ERROR_MARKERS)
+
+
+def build_delete_statements(table: str, key_cols: list, keys: list) -> list[Statement]:
+    """
+    Build DELETE statements removing every row whose key is in `keys`.
+    Keys without NULLs use an (optionally row-value) IN list; keys containing
+    NULLs are matched with IS so they are not silently skipped.
+
+    Args:
+        table (str): Target table name.
+        key_cols (list): Key columns, e.g. CONFLICT_TARGET[table].
+        keys (list): Key tuples, one value per key column.
+
+    Returns:
+        list[Statement]: Statements ready for client.batch().
+    """
+    statements = []
+    keys_per_statement = max(1, MAX_PARAMS_PER_STATEMENT // len(key_cols))
+
+    plain_keys = [k for k in keys if None not in k]
+    null_keys = [k for k in keys if None in k]
+
+    if len(key_cols) == 1:
+        target = key_cols[0]
+        row_placeholder = "?"
+    else:
+        target = "(" + ", ".join(key_cols) + ")"
+        row_placeholder = "(" + ", ".join("?" for _ in key_cols) + ")"
+
+    for i in range(0, len(plain_keys), keys_per_statement):
+        chunk = plain_keys[i : i + keys_per_statement]
+        values = ", ".join(row_placeholder for _ in chunk)
+        if len(key_cols) > 1:
+            values = f"VALUES {values}"
+        sql = f"DELETE FROM {table} WHERE {target} IN ({values});"
+        statements.append(Statement(sql, [v for k in chunk for v in k]))
+
+    match_one = "(" + " AND ".join(f"{c} IS ?" for c in key_cols) + ")"
+    for i in range(0, len(null_keys), MAX_OR_TERMS_PER_STATEMENT):
+        chunk = null_keys[i : i + MAX_OR_TERMS_PER_STATEMENT]
+        where = " OR ".join(match_one for _ in chunk)
+        sql = f"DELETE FROM {table} WHERE {where};"
+        statements.append(Statement(sql, [v for k in chunk for v in k]))
+
+    return statements
+
+
+def run_batch(
+    client,
+    table: str,
+    build_statements,
+    n_rows: int,
+    max_bytes: int = MAX_STATEMENT_BYTES,
+) -> int:
+    """
+    Execute the statements produced by `build_statements(max_bytes)` as a single
+    client.batch() call, i.e. one transaction. If the server rejects a statement for
+    being too large, the statement budget is halved and the statements are rebuilt
+    and retried. A request body rejected as too large (HTTP 413) is raised at once,
+    since smaller statements in the same request would not make it any smaller.
+    Only use it directly when the statements must commit together (e.g. a CDC delta
+    and its ledger); loads that may span requests go through bulk_load(atomic=False).
+
+    Works with any client exposing libsql_client's `batch()`, including the local
+    `file:` client, so it can be exercised against a plain SQLite file.
+
+    Args:
+        client (libsql_client): The Turso client to execute SQL commands.
+        table (str): Table name, used for logging.
+        build_statements (callable): Takes a byte budget and returns a list of statements.
+        n_rows (int): Number of rows written, used for the rows/sec report.
+        max_bytes (int): Initial byte budget for a single statement.
+
+    Returns:
+        int: Number of rows written.
+    """
+    while True:
+        statements = build_statements(max_bytes)
+        start = time.perf_counter()
+        try:
+            client.batch(statements)
+            break
+        except Exception as error:
+            if not is_size_error(error) or max_bytes // 2 < MIN_STATEMENT_BYTES:
+                raise
+            max_bytes //= 2
+            LOGGER.warning(
+                f"[{table}] statement too large ({error}), retrying with {max_bytes} byte budget."
+            )
+
+    elapsed = time.perf_counter() - start
+    rate = n_rows / elapsed if elapsed > 0 else float("inf")
+    LOGGER.info(
+        f"[{table}] wrote {n_rows} rows in {len(statements)} statement(s), "
+        f"{elapsed:.2f}s ({rate:,.0f} rows/sec)."
+    )
+    return n_rows
+
+
+def bulk_load(
+    client,
+    table: str,
+    rows: list,
+    conflict_cols: list | None = None,
+    before: list | None = None,
+    after: list | None = None,
+    max_bytes: int = MAX_STATEMENT_BYTES,
+    atomic: bool = True,
+    max_request_bytes: int = MAX_REQUEST_BYTES,
+) -> int:
+    """
+    Load rows into a table using batched multi-row INSERTs.
+
+    With `atomic`, everything goes out as one client.batch() request, i.e. one
+    transaction: `before` and `after` statements (e.g. DROP/CREATE) run in the same
+    transaction, so a failure leaves the table untouched, but a large table can exceed
+    the request size limit (HTTP 413). Use it only when the whole load must commit
+    together.
+
+    Otherwise the rows are sent in requests of about `max_request_bytes`, each its own
+    transaction, with `before` in the first one and `after` in the last one. A request
+    rejected as too large is retried with half the budget. A failure can leave the
+    earlier requests applied, so this fits idempotent upserts and tables nobody reads
+    yet (e.g. a shadow table).
+
+    Args:
+        client (libsql_client): The Turso client to execute SQL commands.
+        table (str): Target table name.
+        rows (list): A list of dictionaries representing the rows.
+        conflict_cols (list | None): Primary-key columns for UPSERT. Plain INSERT if None.
+        before (list | None): Statements to run before the inserts.
+        after (list | None): Statements to run after the inserts.
+        max_bytes (int): Initial byte budget for a single statement.
+        atomic (bool): Load everything in one request and transaction.
+        max_request_bytes (int): Initial byte budget for a single request when not atomic.
+
+    Returns:
+        int: Number of rows loaded.
+    """
+    before = before or []
+    after = after or []
+
+    if atomic:
+        def build_statements(budget: int) -> list:
+            inserts = build_insert_statements(table, rows, conflict_cols, budget)
+            return [*before, *inserts, *after]
+
+        return run_batch(client, table, build_statements, len(rows), max_bytes)
+
+    cols = list(rows[0].keys()) if rows else []
+    sent = 0
+    while True:
+        group = take_request_rows(rows[sent:], cols, max_request_bytes)
+        first = sent == 0
+        last = sent + len(group) == len(rows)
+
+        def build_group(budget: int, group=group, first=first, last=last) -> list:
+            inserts = build_insert_statements(
+                table, group, conflict_cols, min(budget, max_request_bytes)
+            )
+            return [*(before if first else []), *inserts, *(after if last else [])]
+
+        try:
+            run_batch(client, table, build_group, len(group), max_bytes)
+        except Exception as error:
+            if (
+                not is_request_size_error(error)
+                or len(group) <= 1
+                or max_request_bytes // 2 < MIN_REQUEST_BYTES
+            ):
+                raise
+            max_request_bytes //= 2
+            LOGGER.warning(
+                f"[{table}] request too large ({error}), retrying with {max_request_bytes} byte budget."
+            )
+            continue
+
+        sent += len(group)
+        if last:
+            return len(rows)
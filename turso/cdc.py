@@ -0,0 +1,269 @@
+from libsql_client import Statement
+from bulk import build_delete_statements, build_insert_statements, run_batch
+from shadow import replace_via_shadow
+from datetime import datetime
+
+import hashlib
+import json
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+# Bookkeeping tables kept in the Turso database itself, so the ledger always
+# describes what the remote side actually holds (the CI runner is stateless)
+LEDGER_STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS _sync_state (
+        table_name TEXT PRIMARY KEY NOT NULL,
+        columns TEXT NOT NULL,
+        digest TEXT NOT NULL,
+        row_count INTEGER NOT NULL,
+        synced_at TEXT NOT NULL
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS _sync_ledger (
+        table_name TEXT NOT NULL,
+        row_key TEXT NOT NULL,
+        row_hash TEXT NOT NULL,
+        PRIMARY KEY (table_name, row_key)
+    );
+    """,
+]
+
+LEDGER_KEY = ["table_name", "row_key"]
+
+
+def ensure_ledger(client):
+    """
+    Create the sync bookkeeping tables on Turso if they do not exist yet.
+
+    Args:
+        client (libsql_client): The Turso client to execute SQL commands.
+    """
+    for statement in LEDGER_STATEMENTS:
+        client.execute(statement)
+
+
+def get_sync_state(client) -> dict:
+    """
+    Fetch the last successful sync state of every table.
+
+    Args:
+        client (libsql_client): The Turso client to execute SQL commands.
+
+    Returns:
+        dict: Mapping of table name to a (columns, digest) tuple.
+    """
+    res = client.execute("SELECT table_name, columns, digest FROM _sync_state;")
+    return {row[0]: (row[1], row[2]) for row in res.rows}
+
+
+def get_remote_ledger(client, table: str) -> dict:
+    """
+    Fetch the row-hash ledger of a table as it was after the last successful sync.
+
+    Args:
+        client (libsql_client): The Turso client to execute SQL commands.
+        table (str): The table name.
+
+    Returns:
+        dict: Mapping of row key to row hash.
+    """
+    res = client.execute(
+        "SELECT row_key, row_hash FROM _sync_ledger WHERE table_name = ?;", [table]
+    )
+    return {row[0]: row[1] for row in res.rows}
+
+
+def encode_key(row: dict, key_cols: list) -> str:
+    """
+    Encode the key columns of a row as a stable string, composite keys included.
+
+    Args:
+        row (dict): A row fetched from SQLite.
+        key_cols (list): Key columns, e.g. CONFLICT_TARGET[table].
+
+    Returns:
+        str: JSON-encoded list of the key values.
+    """
+    return json.dumps([row[c] for c in key_cols], default=str)
+
+
+def hash_rows(rows: list, key_cols: list) -> dict:
+    """
+    Group rows by key and hash every group.
+    Keys are not guaranteed unique in every table (e.g. `nomor` in
+    mining_license_auctions), so all rows sharing a key are hashed and shipped together.
+
+    Args:
+        rows (list): A list of dictionaries representing the rows.
+        key_cols (list): Key columns, e.g. CONFLICT_TARGET[table].
+
+    Returns:
+        dict: Mapping of row key to a (row_hash, rows) tuple.
+    """
+    groups = {}
+    for row in rows:
+        groups.setdefault(encode_key(row, key_cols), []).append(row)
+
+    hashed = {}
+    for key, group in groups.items():
+        digest = hashlib.blake2b(digest_size=16)
+        for value in sorted(repr(tuple(row.values())) for row in group):
+            digest.update(value.encode("utf-8"))
+        hashed[key] = (digest.hexdigest(), group)
+    return hashed
+
+
+def table_digest(hashes: dict) -> str:
+    """
+    Summarize a whole table as a single hash of its row hashes.
+
+    Args:
+        hashes (dict): Mapping of row key to row hash.
+
+    Returns:
+        str: Hex digest of the table.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for key in sorted(hashes):
+        digest.update(f"{key}\t{hashes[key]}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def build_state_statement(table: str, columns: str, digest: str, row_count: int) -> Statement:
+    """
+    Build the statement recording a successful sync of a table.
+
+    Args:
+        table (str): The table name.
+        columns (str): JSON-encoded column list of the table.
+        digest (str): Table digest after the sync.
+        row_count (int): Number of rows in the table after the sync.
+
+    Returns:
+        Statement: The UPSERT statement for _sync_state.
+    """
+    synced_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return Statement(
+        """
+        INSERT INTO _sync_state (table_name, columns, digest, row_count, synced_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(table_name) DO UPDATE SET
+            columns=excluded.columns,
+            digest=excluded.digest,
+            row_count=excluded.row_count,
+            synced_at=excluded.synced_at;
+        """.strip(),
+        [table, columns, digest, row_count, synced_at],
+    )
+
+
+def sync_table_incremental(
+    client,
+    table: str,
+    rows: list,
+    key_cols: list,
+    sync_state: dict,
+    sql_create: str | None = None,
+):
+    """
+    Ship only the rows of a table that were inserted, updated or deleted since the
+    last successful sync.
+
+    Local rows are hashed per key and compared against the ledger on Turso:
+    - unchanged table digest: nothing is sent at all;
+    - changed or new keys: upserted with INSERT ... ON CONFLICT(key) DO UPDATE on tables
+      that are never dropped (no `sql_create`), so parent rows referenced by foreign keys
+      are updated in place like upsert_table() does. Tables that may be rebuilt, and keys
+      shared by several rows, are deleted and re-inserted instead;
+    - keys in the ledger but no longer local: their rows are deleted.
+    The data changes, ledger and state are written in one batch (one transaction),
+    so the ledger never disagrees with the table.
+
+    If the table has never been synced in this mode and `sql_create` is given,
+    the table is rebuilt in full once through a shadow-table swap, since its
+    remote content is unknown.
+
+    Args:
+        client (libsql_client): The Turso client to execute SQL commands.
+        table (str): The name of the table to sync.
+        rows (list): A list of dictionaries representing the local rows.
+        key_cols (list): Key columns, e.g. CONFLICT_TARGET[table].
+        sync_state (dict): Result of get_sync_state().
+        sql_create (str | None): CREATE statement for a first full rebuild. None to never drop.
+    """
+    previous = sync_state.get(table)
+    if not rows and previous is None:
+        LOGGER.info(f"[{table}] no rows, skipping.")
+        return
+
+    columns = json.dumps(list(rows[0].keys())) if rows else previous[0]
+    hashed = hash_rows(rows, key_cols)
+    local_hashes = {key: row_hash for key, (row_hash, _) in hashed.items()}
+    digest = table_digest(local_hashes)
+
+    if previous == (columns, digest):
+        LOGGER.info(f"[{table}] unchanged since last sync, skipping.")
+        return
+
+    state = build_state_statement(table, columns, digest, len(rows))
+    clear_ledger = Statement("DELETE FROM _sync_ledger WHERE table_name = ?;", [table])
+
+    def ledger_rows(keys) -> list:
+        return [
+            {"table_name": table, "row_key": key, "row_hash": local_hashes[key]}
+            for key in keys
+        ]
+
+    # First sync of a replaced table or a schema change: rebuild once
+    if sql_create and (previous is None or previous[0] != columns):
+        LOGGER.info(f"[{table}] no usable ledger, rebuilding table in full.")
+
+        # The ledger is reset in the same transaction as the shadow-table swap
+        replace_via_shadow(
+            client,
+            table,
+            rows,
+            sql_create,
+            after=[
+                clear_ledger,
+                *build_insert_statements("_sync_ledger", ledger_rows(local_hashes)),
+                state,
+            ],
+        )
+        return
+
+    remote_hashes = get_remote_ledger(client, table) if previous else {}
+    if previous and previous[0] != columns:
+        remote_hashes = {}
+
+    changed = [key for key, row_hash in local_hashes.items() if remote_hashes.get(key) != row_hash]
+    deleted = [key for key in remote_hashes if key not in local_hashes]
+    # ON CONFLICT needs the key to identify one row, which only holds on upserted tables
+    upsert_keys = [key for key in changed if sql_create is None and len(hashed[key][1]) == 1]
+    upsert_set = set(upsert_keys)
+    reinsert_keys = [key for key in changed if key not in upsert_set]
+    upsert_rows = [hashed[key][1][0] for key in upsert_keys]
+    reinsert_rows = [row for key in reinsert_keys for row in hashed[key][1]]
+    changed_rows = [*upsert_rows, *reinsert_rows]
+
+    LOGGER.info(
+        f"[{table}] delta: {len(changed)} inserted/updated key(s), {len(deleted)} deleted key(s)."
+    )
+
+    def build_delta(budget: int) -> list:
+        stale_keys = [tuple(json.loads(key)) for key in [*reinsert_keys, *deleted]]
+        return [
+            *build_delete_statements(table, key_cols, stale_keys),
+            *build_insert_statements(table, upsert_rows, conflict_cols=key_cols, max_bytes=budget),
+            *build_insert_statements(table, reinsert_rows, max_bytes=budget),
+            *build_delete_statements("_sync_ledger", LEDGER_KEY, [(table, key) for key in deleted]),
+            *build_insert_statements(
+                "_sync_ledger", ledger_rows(changed), conflict_cols=LEDGER_KEY, max_bytes=budget
+            ),
+            state,
+        ]
+
+    run_batch(client, table, build_delta, len(changed_rows) + len(deleted))
@@ -0,0 +1,110 @@
+from add_indexing import get_index_statements
+from bulk import bulk_load
+
+import logging
+import re
+import time
+
+LOGGER = logging.getLogger(__name__)
+
+SHADOW_SUFFIX = "__new"
+
+
+def shadow_name(table: str) -> str:
+    """
+    Name of the shadow table a replacement is loaded into.
+
+    Args:
+        table (str): The live table name.
+
+    Returns:
+        str: The shadow table name, e.g. `mining_license__new`.
+    """
+    return f"{table}{SHADOW_SUFFIX}"
+
+
+def retarget_statement(sql: str, table: str, target: str) -> str:
+    """
+    Point a CREATE TABLE or CREATE INDEX statement for `table` at another table.
+
+    Args:
+        sql (str): The CREATE statement.
+        table (str): The table name used in the statement.
+        target (str): The table name to use instead.
+
+    Returns:
+        str: The rewritten statement.
+    """
+    sql = re.sub(
+        rf"(CREATE TABLE IF NOT EXISTS\s+){table}\b", rf"\g<1>{target}", sql, flags=re.IGNORECASE
+    )
+    return re.sub(rf"(\bON\s+){table}(\s*\()", rf"\g<1>{target}\g<2>", sql, flags=re.IGNORECASE)
+
+
+def build_swap_statements(table: str) -> list[str]:
+    """
+    Build the statements that swap a loaded shadow table in for the live one.
+    The old table is dropped first so its index names are free, the indexes from
+    add_indexing.py are built on the shadow table, and the shadow table is renamed.
+    Run as one batch, readers see either the old table or the new indexed one.
+
+    Args:
+        table (str): The live table name.
+
+    Returns:
+        list[str]: Statements for client.batch().
+    """
+    shadow = shadow_name(table)
+    return [
+        f"DROP TABLE IF EXISTS {table};",
+        *[retarget_statement(sql, table, shadow) for sql in get_index_statements(table)],
+        f"ALTER TABLE {shadow} RENAME TO {table};",
+    ]
+
+
+def load_shadow_table(client, table: str, rows: list, sql_create: str) -> int:
+    """
+    (Re)create the shadow table of `table` and load all rows into it, in as many
+    request-sized transactions as needed. Nothing reads the shadow table until the
+    swap, so a failed load only leaves a shadow table the next load drops again.
+    The live table is not touched.
+
+    Args:
+        client (libsql_client): The Turso client to execute SQL commands.
+        table (str): The live table name.
+        rows (list): A list of dictionaries representing the rows.
+        sql_create (str): CREATE statement of the live table.
+
+    Returns:
+        int: Number of rows loaded.
+    """
+    shadow = shadow_name(table)
+    return bulk_load(
+        client,
+        shadow,
+        rows,
+        before=[
+            f"DROP TABLE IF EXISTS {shadow};",
+            retarget_statement(sql_create, table, shadow),
+        ],
+        atomic=False,
+    )
+
+
+def replace_via_shadow(client, table: str, rows: list, sql_create: str, after: list | None = None):
+    """
+    Replace a table without readers ever seeing it empty or half loaded:
+    load into `<table>__new`, then index it and swap it in with an atomic rename.
+
+    Args:
+        client (libsql_client): The Turso client to execute SQL commands.
+        table (str): The live table name.
+        rows (list): A list of dictionaries representing the rows.
+        sql_create (str): CREATE statement of the live table.
+        after (list | None): Extra statements committed together with the swap.
+    """
+    load_shadow_table(client, table, rows, sql_create)
+
+    start = time.perf_counter()
+    client.batch([*build_swap_statements(table), *(after or [])])
+    LOGGER.info(f"[{table}] swapped in shadow table in {time.perf_counter() - start:.2f}s.")
@@ -1,7 +1,11 @@
 from libsql_client import create_client_sync
 from dotenv import load_dotenv
 from create import TABLE_STATEMENTS
+from bulk import bulk_load
+from shadow import replace_via_shadow
+from cdc import ensure_ledger, get_sync_state, sync_table_incremental
 
+import argparse
 import os
 import sqlite3
 import logging
@@ -59,6 +63,8 @@ CONFLICT_TARGET = {
     "mining_news": ["source"],
     "sales_destination": ["id"],
     "company_financials": ["idx_ticker", "year"],
+    "mineral_company_report": ["id"],
+    "commodity_report": ["commodity_id"],
 }
 
 
@@ -66,6 +72,8 @@ def get_turso_credentials() -> tuple[str, str]:
     """
     Retrieve Turso database URL and auth token from environment variables.
     If not set, print an error message and exit.
+    A local `file:` URL (e.g. `file:turso_local.sqlite`) needs no auth token,
+    which allows running the sync against a plain SQLite stand-in.
 
     Returns:
         tuple[str, str]: A tuple containing the raw database URL and auth token.
@@ -73,6 +81,9 @@ def get_turso_credentials() -> tuple[str, str]:
     raw_url = os.getenv("TURSO_DATABASE_URL", "")
     auth_token = os.getenv("TURSO_AUTH_TOKEN")
 
+    if raw_url.startswith("file:"):
+        return raw_url, auth_token
+
     if not raw_url or not auth_token:
         LOGGER.info("Missing Turso credentials, exiting.")
         exit(1)
@@ -127,9 +138,27 @@ def get_sqlite_rows(conn: sqlite3.Connection, table: str) -> list:
     return [dict(zip(cols, row)) for row in data_table.fetchall()]
 
 
+def get_create_statement(table: str) -> str | None:
+    """
+    Find the CREATE statement of a table in the imported TABLE_STATEMENTS list.
+
+    Args:
+        table (str): The table name.
+
+    Returns:
+        str | None: The CREATE statement, or None if the table is unknown.
+    """
+    for statement in TABLE_STATEMENTS:
+        # Use regex to find a statement that creates the current table
+        if re.search(f"CREATE TABLE IF NOT EXISTS {table}\\b", statement, re.IGNORECASE):
+            return statement
+    return None
+
+
 def upsert_table(client, table: str, rows: list):
     """
-    Build and execute an UPSERT statement for every row.
+    Upsert every row using batched multi-row UPSERT statements, sent in request-sized
+    transactions. Upserts can be replayed, so a failed sync is fixed by the next run.
 
     Args:
         client (libsql_client): The Turso client to execute SQL commands.
@@ -140,32 +169,16 @@ def upsert_table(client, table: str, rows: list):
         LOGGER.info(f"[{table}] no rows, skipping.")
         return
 
-    cols = list(rows[0].keys())
-    col_list = ", ".join(cols)
-    placeholders = ", ".join("?" for _ in cols)
-
-    pk_cols = CONFLICT_TARGET[table]
-    conflict_clause = ", ".join(pk_cols)
-    update_clause = ", ".join(f"{c}=excluded.{c}" for c in cols if c not in pk_cols)
-
-    sql = f"""
-            INSERT INTO {table} ({col_list})
-            VALUES ({placeholders})
-            ON CONFLICT({conflict_clause})
-            DO UPDATE SET {update_clause};
-        """.strip()
-
-    for row in rows:
-        params = [row[c] for c in cols]
-        turso_execute(client, sql, *params)
+    bulk_load(client, table, rows, conflict_cols=CONFLICT_TARGET[table], atomic=False)
 
     LOGGER.info(f"[{table}] upserted {len(rows)} rows.")
 
 
 def replace_table(client, table: str, rows: list):
     """
-    Completely replaces all data in a specified table by dropping the existing table, recreating it,
-    and then inserting the provided new rows.
+    Completely replaces all data in a specified table. The new rows are loaded into a
+    shadow table (`<table>__new`), which is then indexed and swapped in with an atomic
+    rename, so readers never see an empty or partially loaded table.
 
     Args:
         client (libsql_client): The Turso client to execute SQL commands.
@@ -176,50 +189,53 @@ def replace_table(client, table: str, rows: list):
         LOGGER.info(f"[{table}] no rows, skipping.")
         return
 
-    # Find the correct CREATE statement from the imported TABLE_STATEMENTS list
-    sql_create = None
-    for statement in TABLE_STATEMENTS:
-        # Use regex to find a statement that creates the current table
-        if re.search(f"CREATE TABLE IF NOT EXISTS {table}", statement, re.IGNORECASE):
-            sql_create = statement
-            break
-
+    sql_create = get_create_statement(table)
     if not sql_create:
         LOGGER.error(
             f"Could not find a CREATE statement for table '{table}'. Skipping replace."
         )
         return
 
-    cols = list(rows[0].keys())
-    col_list = ", ".join(cols)
-    placeholders = ", ".join("?" for _ in cols)
-
-    # 1) Drop table
-    client.execute(f"DROP TABLE IF EXISTS {table};")
-    LOGGER.info(f"[{table}] dropped table.")
+    replace_via_shadow(client, table, rows, sql_create)
 
-    # 2) Create table using the statement we found
-    client.execute(sql_create)
-    LOGGER.info(f"[{table}] created new table.")
+    LOGGER.info(f"[{table}] replaced table with {len(rows)} rows.")
 
-    # 3) Insert data
-    sql_insert = f"""
-        INSERT INTO {table} ({col_list})
-        VALUES ({placeholders})
-    """.strip()
-
-    for row in rows:
-        params = [row[c] for c in cols]
-        turso_execute(client, sql_insert, *params)
-
-    LOGGER.info(f"[{table}] inserted {len(rows)} rows.")
 
+def sync_incremental(client, conn: sqlite3.Connection, upsert_tables: list, replace_tables: list):
+    """
+    Sync every table in change-data-capture mode: only rows inserted, updated or
+    deleted since the last successful sync are sent to Turso.
 
-def main():
+    Args:
+        client (libsql_client): The Turso client to execute SQL commands.
+        conn (sqlite3.Connection): The SQLite connection object.
+        upsert_tables (list): Tables that are never dropped on Turso.
+        replace_tables (list): Tables that may be rebuilt in full on their first sync.
+    """
+    ensure_ledger(client)
+    sync_state = get_sync_state(client)
+
+    for tbl in [*upsert_tables, *replace_tables]:
+        try:
+            LOGGER.info(f"\nSyncing (incremental) {tbl}…")
+            rows = get_sqlite_rows(conn, tbl)
+            sql_create = get_create_statement(tbl) if tbl in replace_tables else None
+            sync_table_incremental(
+                client, tbl, rows, CONFLICT_TARGET[tbl], sync_state, sql_create
+            )
+        except Exception as table_err:
+            LOGGER.error(f"Error syncing (incremental) '{tbl}': {table_err}")
+
+
+def main(incremental: bool = False):
     """
     Main function to sync data from SQLite to Turso.
     This function retrieves the database URL and auth token from environment variables,
     normalizes the URL, and then creates a synchronous client to execute the sync operations.
+
+    Args:
+        incremental (bool): If True, only ship rows changed since the last successful sync
+            (see cdc.py) instead of replacing whole tables.
     """
     db_url, auth_token = get_turso_credentials()
     db_url_normalized = normalize_db_url(db_url)
@@ -265,6 +281,10 @@ def main():
         conn = sqlite3.connect(LOCAL_DB_PATH)
         LOGGER.info(f"Connected to SQLite at {LOCAL_DB_PATH}")
 
+        if incremental:
+            sync_incremental(client, conn, TO_UPSERT_TABLES, TO_REPLACE_TABLES)
+            return
+
         # 4) Sync: upsert table
         for tbl in TO_UPSERT_TABLES:
             try:
@@ -294,4 +314,12 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Sync db.sqlite to Turso")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only ship rows inserted, updated or deleted since the last successful sync",
+    )
+    args = parser.parse_args()
+
+    main(incremental=args.incremental)